@@ -0,0 +1,244 @@
+"""
+Benchmark of Lamoda read endpoints queries.
+
+Builds synthetic catalogue in temporary database in two layouts: previous one
+with products nested in categories documents and current one with products
+collection. Compares previous reads, which loaded whole documents and trimmed
+them in Python, with current server-side projections and aggregations
+by latency and size of database replies.
+
+Requires MongoDB from MONGO_DSN. Documents of previous layout must fit 16 MB,
+so catalogue of one category is limited to about 70000 products.
+
+Usage:
+    python -m benchmarks.bench_lamoda_reads [--subcategories 10] [--low-subcategories 10] [--products 200] [--rounds 50]
+"""
+import argparse
+import asyncio
+import time
+
+import bson
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+from src.config import settings
+from src.lamoda import repository
+from src.resources.indexes import get_declared_indexes
+
+
+CATEGORIES = ("men", "women", "kids")
+
+
+class ReplySize(monitoring.CommandListener):
+    """
+    Sums size of database replies in bytes.
+    """
+
+    def __init__(self):
+        self.bytes = 0
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self.bytes += len(bson.encode(event.reply))
+
+    def failed(self, event):
+        pass
+
+
+def make_catalogue(subcategories: int, low_subcategories: int, products: int):
+    """
+    Returns categories documents with nested products (previous layout),
+    categories documents and products documents (current layout).
+    """
+    nested, catalogue, items = [], [], []
+    for category in CATEGORIES:
+        nested_categories, catalogue_categories = [], []
+        for i in range(subcategories):
+            nested_low, catalogue_low = [], []
+            for j in range(low_subcategories):
+                low = {
+                    "_id": ObjectId(),
+                    "name": f"Subcategory {i}-{j}",
+                    "link": f"https://www.lamoda.by/c/{i}{j}/low-{j}/",
+                    "amount": str(products),
+                    "slug": f"low-{j}",
+                }
+                low_products = [
+                    {
+                        "link": f"https://www.lamoda.by/p/{category}{i}x{j}x{k}/",
+                        "product_number": f"{category}{i}x{j}x{k}",
+                        "product_name": f"Product {k}",
+                        "brand_name": "Brand",
+                        "single_price": "389",
+                        "image": f"https://a.lmcdn.ru/img236x341/{i}/{j}/{k}.jpg",
+                    }
+                    for k in range(products)
+                ]
+                nested_low.append({**low, "products": low_products})
+                catalogue_low.append(low)
+                items.extend(
+                    {
+                        **product,
+                        "subcategory_id": low["_id"],
+                        "category": category,
+                        "subcategory_slug": f"sub-{i}",
+                        "low_subcategory_slug": f"low-{j}",
+                        "page": position // 60 + 1,
+                        "position": position % 60,
+                    }
+                    for position, product in enumerate(low_products)
+                )
+            subcategory = {
+                "_id": ObjectId(),
+                "name": f"Subcategory {i}",
+                "link": f"https://www.lamoda.by/c/{i}/sub-{i}/",
+                "amount": str(products * low_subcategories),
+                "slug": f"sub-{i}",
+            }
+            nested_categories.append({**subcategory, "categories": nested_low})
+            catalogue_categories.append({**subcategory, "categories": catalogue_low})
+
+        document = {"_id": ObjectId(), "category": category, "link": category}
+        nested.append({**document, "categories": nested_categories})
+        catalogue.append({**document, "categories": catalogue_categories})
+    return nested, catalogue, items
+
+
+async def previous_specific_category(db, category, *_):
+    result = await db.find_one({"category": category})
+    for subcategory in result["categories"]:
+        del subcategory["categories"]
+    return result
+
+
+async def previous_subcategories(db, category, subcategory_slug, *_):
+    parent = await db.find_one(
+        {"category": category, "categories.slug": subcategory_slug},
+        {"categories.$": 1},
+    )
+    subcategories = parent["categories"][0]["categories"]
+    for subcategory in subcategories:
+        del subcategory["products"]
+    return subcategories
+
+
+async def previous_lowest_subcategories(db, category, subcategory_slug, low_slug, *_):
+    parent = await db.find_one(
+        {"category": category, "categories.slug": subcategory_slug},
+        {"categories.$": 1},
+    )
+    for subcategory in parent["categories"][0]["categories"]:
+        if subcategory["slug"] == low_slug:
+            return subcategory
+
+
+async def previous_product_info(db, category, subcategory_slug, low_slug, product):
+    subcategory = await previous_lowest_subcategories(
+        db, category, subcategory_slug, low_slug
+    )
+    for item in subcategory["products"]:
+        if item["product_number"] == product:
+            return item
+
+
+async def current_specific_category(db, category, *_):
+    return await repository.get_specific_category(category)
+
+
+async def current_subcategories(db, category, subcategory_slug, *_):
+    return await repository.get_subcategories(category, subcategory_slug)
+
+
+async def current_lowest_subcategories(db, category, subcategory_slug, low_slug, *_):
+    return await repository.get_lowest_subcategories(
+        category, subcategory_slug, low_slug
+    )
+
+
+async def current_product_info(db, category, subcategory_slug, low_slug, product):
+    return await repository.get_product_info(
+        category, subcategory_slug, low_slug, product
+    )
+
+
+async def bench(name, function, db, args, rounds, reply_size):
+    reply_size.bytes = 0
+    started_at = time.perf_counter()
+    for _ in range(rounds):
+        await function(db, *args)
+    elapsed = (time.perf_counter() - started_at) / rounds * 1000
+    print(
+        f"{name:<32} latency={elapsed:8.2f} ms  "
+        f"reply={reply_size.bytes / rounds / 1024:10.1f} KiB"
+    )
+
+
+async def run(subcategories, low_subcategories, products, rounds):
+    reply_size = ReplySize()
+    client = AsyncIOMotorClient(str(settings.mongo_dsn), event_listeners=[reply_size])
+    database = client[f"bench_lamoda_reads_{ObjectId()}"]
+    previous_db = database.lamoda_previous
+
+    try:
+        nested, catalogue, items = make_catalogue(
+            subcategories, low_subcategories, products
+        )
+        await previous_db.insert_many(nested)
+        await database.lamoda.insert_many(catalogue)
+        await database.lamoda_products.insert_many(items)
+        indexes = {
+            collection.name: indexes for collection, indexes in get_declared_indexes()
+        }
+        await previous_db.create_indexes(indexes["lamoda"])
+        await database.lamoda.create_indexes(indexes["lamoda"])
+        await database.lamoda_products.create_indexes(indexes["lamoda_products"])
+
+        repository.db = database.lamoda
+        repository.db_lamoda_products = database.lamoda_products
+
+        middle = subcategories // 2, low_subcategories // 2
+        args = (
+            "women",
+            f"sub-{middle[0]}",
+            f"low-{middle[1]}",
+            f"women{middle[0]}x{middle[1]}x{products // 2}",
+        )
+        print(
+            f"categories={len(CATEGORIES)} subcategories={subcategories} "
+            f"low-subcategories={low_subcategories} products={products} "
+            f"rounds={rounds}"
+        )
+        for endpoint in (
+            "specific_category",
+            "subcategories",
+            "lowest_subcategories",
+            "product_info",
+        ):
+            for layout, db in (("previous", previous_db), ("current", None)):
+                function = globals()[f"{layout}_{endpoint}"]
+                await bench(
+                    f"{endpoint} ({layout})", function, db, args, rounds, reply_size
+                )
+    finally:
+        await client.drop_database(database.name)
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subcategories", type=int, default=10)
+    parser.add_argument("--low-subcategories", type=int, default=10)
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    asyncio.run(
+        run(args.subcategories, args.low_subcategories, args.products, args.rounds)
+    )
+
+
+if __name__ == "__main__":
+    main()
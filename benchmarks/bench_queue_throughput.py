@@ -0,0 +1,80 @@
+"""
+Benchmark of tasks queue throughput without broker.
+
+Enqueues fan-out of tasks with simulated I/O through in-process queue backend
+and measures time until all of them are executed.
+
+Usage:
+    python -m benchmarks.bench_queue_throughput [--tasks 10000] [--concurrency 64] [--io-ms 5]
+"""
+import argparse
+import asyncio
+import time
+
+from src.config import settings
+from src.resources.memory_queue import MemoryQueueBackend
+from src.resources.tasks import encode_task, task
+
+
+IO_DELAY = 0.0
+completed = 0
+
+
+@task("benchmarks.io_task")
+async def io_task(item: dict):
+    """
+    Task which simulates page fetch.
+    """
+    global completed
+    await asyncio.sleep(IO_DELAY)
+    completed += 1
+
+
+async def run(tasks: int, concurrency: int):
+    backend = MemoryQueueBackend()
+    consumer = asyncio.create_task(backend.consume(concurrency))
+
+    started_at = time.perf_counter()
+    await backend.send_many(
+        settings.kafka_topic,
+        [
+            (
+                encode_task("benchmarks.io_task", ({"id": i},)),
+                str(i).encode(),
+            )
+            for i in range(tasks)
+        ],
+    )
+    enqueued_at = time.perf_counter()
+
+    while completed < tasks:
+        await asyncio.sleep(0.001)
+    finished_at = time.perf_counter()
+
+    consumer.cancel()
+    await asyncio.gather(consumer, return_exceptions=True)
+
+    print(
+        f"tasks={tasks} concurrency={concurrency} io={IO_DELAY * 1000:.1f} ms  "
+        f"enqueue={(enqueued_at - started_at) * 1000:.1f} ms  "
+        f"total={finished_at - started_at:.2f} s  "
+        f"throughput={tasks / (finished_at - started_at):.0f} tasks/s"
+    )
+    print(f"send latency: {backend.stats()['latency_ms']}")
+
+
+def main():
+    global IO_DELAY
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--io-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    IO_DELAY = args.io_ms / 1000
+    asyncio.run(run(args.tasks, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Benchmark of API responses encoding.
+
+Compares previous encoding, which replaced ObjectId by str in Python
+(recursive async `prepare_response_data` for Lamoda, loop in Twitch routers),
+then ran FastAPI `jsonable_encoder` and json encoding,
+with one pass of orjson with ObjectId hook (`MongoJSONResponse`).
+
+Usage:
+    python -m benchmarks.bench_responses [--streams 100000] [--products 50000] [--rounds 5]
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+
+from src.routers.responses import MongoJSONResponse
+
+
+def make_streams(amount: int) -> list:
+    created_at = datetime.now().isoformat()
+    return [
+        {
+            "_id": ObjectId(),
+            "id": str(40000000000 + i),
+            "user_id": str(100000 + i),
+            "user_login": f"user_{i}",
+            "user_name": f"User {i}",
+            "game_id": str(i % 500),
+            "game_name": f"Game {i % 500}",
+            "type": "live",
+            "title": f"Stream title number {i}",
+            "viewer_count": i % 10000,
+            "started_at": "2024-01-01T00:00:00Z",
+            "language": "en",
+            "thumbnail_url": f"https://static-cdn.jtvnw.net/previews-ttv/{i}.jpg",
+            "tags": ["English", "Gaming"],
+            "is_mature": False,
+            "created_at": created_at,
+        }
+        for i in range(amount)
+    ]
+
+
+def make_product_tree(products: int, subcategories: int = 50) -> dict:
+    per_subcategory = products // subcategories
+    return {
+        "_id": ObjectId(),
+        "category": "women",
+        "categories": [
+            {
+                "_id": ObjectId(),
+                "name": f"Subcategory {i}",
+                "slug": f"sub-{i}",
+                "categories": [
+                    {
+                        "_id": ObjectId(),
+                        "name": f"Low subcategory {i}",
+                        "slug": f"low-{i}",
+                        "products": [
+                            {
+                                "_id": ObjectId(),
+                                "link": f"https://www.lamoda.by/p/{i}x{k}/",
+                                "product_number": f"{i}x{k}",
+                                "product_name": f"Product {k}",
+                                "brand_name": "Brand",
+                                "single_price": "389",
+                                "image": f"https://a.lmcdn.ru/img236x341/{i}/{k}.jpg",
+                            }
+                            for k in range(per_subcategory)
+                        ],
+                    }
+                ],
+            }
+            for i in range(subcategories)
+        ],
+    }
+
+
+async def prepare_response_data(data):
+    """
+    Previous recursive replacement of ObjectId of Lamoda responses.
+    """
+    if isinstance(data, list):
+        for item in data:
+            await prepare_response_data(item)
+
+    elif isinstance(data, dict):
+        data["_id"] = str(data["_id"])
+
+        if data.get("categories"):
+            await prepare_response_data(data.get("categories"))
+        if data.get("products"):
+            await prepare_response_data(data.get("products"))
+
+
+async def previous_streams(data):
+    for item in data:
+        item["_id"] = str(item["_id"])
+    return JSONResponse(jsonable_encoder(data)).body
+
+
+async def previous_product_tree(data):
+    await prepare_response_data(data)
+    return JSONResponse(jsonable_encoder({"data": data})).body
+
+
+async def current_streams(data):
+    return MongoJSONResponse(data).body
+
+
+async def current_product_tree(data):
+    return MongoJSONResponse({"data": data}).body
+
+
+async def bench(name, encode, make_data, rounds):
+    elapsed = 0.0
+    for _ in range(rounds):
+        data = make_data()
+        started_at = time.perf_counter()
+        body = await encode(data)
+        elapsed += time.perf_counter() - started_at
+    print(
+        f"{name:<28} size={len(body) / 1024 / 1024:6.1f} MiB  "
+        f"encode={elapsed / rounds * 1000:9.1f} ms"
+    )
+
+
+async def run(streams, products, rounds):
+    for layout in ("previous", "current"):
+        await bench(
+            f"{streams} streams ({layout})",
+            globals()[f"{layout}_streams"],
+            lambda: make_streams(streams),
+            rounds,
+        )
+    for layout in ("previous", "current"):
+        await bench(
+            f"{products} products ({layout})",
+            globals()[f"{layout}_product_tree"],
+            lambda: make_product_tree(products),
+            rounds,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--streams", type=int, default=100000)
+    parser.add_argument("--products", type=int, default=50000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.streams, args.products, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark of Kafka task message encoding.
+
+Compares pickled function objects with full category payloads (previous format)
+against registry-based msgpack envelope with fields each task needs.
+
+Usage:
+    python -m benchmarks.bench_task_envelope
+"""
+import pickle
+import timeit
+from datetime import datetime
+
+from bson import ObjectId
+
+from src.resources.tasks import decode_task, encode_task
+
+
+ROUNDS = 20000
+
+
+async def parse_subcategory(data: dict):
+    """
+    Stand-in for pickled task function.
+    """
+
+
+def make_subcategory() -> dict:
+    return {
+        "_id": ObjectId(),
+        "name": "Кроссовки и кеды",
+        "link": "https://www.lamoda.by/c/5971/shoes-muzhskie-krossovki/",
+        "amount": "12 345",
+        "slug": "shoes-muzhskie-krossovki",
+        "created_at": datetime.now().isoformat(),
+        "categories": [
+            {
+                "_id": ObjectId(),
+                "name": f"Subcategory {i}",
+                "link": f"https://www.lamoda.by/c/{i}/shoes-subcategory-{i}/",
+                "amount": str(i * 10),
+                "slug": f"shoes-subcategory-{i}",
+            }
+            for i in range(20)
+        ],
+    }
+
+
+def bench(name: str, encode, decode):
+    message = encode()
+    encode_time = timeit.timeit(encode, number=ROUNDS) / ROUNDS * 1e6
+    decode_time = timeit.timeit(lambda: decode(message), number=ROUNDS) / ROUNDS * 1e6
+    print(
+        f"{name:<28} size={len(message):>5} B  "
+        f"encode={encode_time:6.2f} us  decode={decode_time:6.2f} us"
+    )
+
+
+def main():
+    subcategory = make_subcategory()
+    task_fields = {"_id": subcategory["_id"], "link": subcategory["link"]}
+
+    pickle_payload = {
+        "function": parse_subcategory,
+        "args": (subcategory,),
+        "kwargs": {},
+    }
+    bench(
+        "pickle, full payload",
+        lambda: pickle.dumps(pickle_payload),
+        pickle.loads,
+    )
+    bench(
+        "msgpack, full payload",
+        lambda: encode_task("lamoda.parse_subcategory", (subcategory,)),
+        decode_task,
+    )
+    bench(
+        "msgpack, task fields",
+        lambda: encode_task("lamoda.parse_subcategory", (task_fields,)),
+        decode_task,
+    )
+
+
+if __name__ == "__main__":
+    main()
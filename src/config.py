@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import Field, MongoDsn, RedisDsn, HttpUrl
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -19,6 +20,47 @@ class DatabasebSettings(BaseSettings):
     )
 
 
+class QueueSettings(BaseSettings):
+    """
+    Configuration for tasks queue, its producer and consumer.
+
+    Attributes:
+    - queue_backend (str) - queue backend: `kafka` or in-process `memory`.
+    - kafka_topic (str) - topic with parsing tasks.
+    - kafka_linger_ms (int) - time producer waits to fill a batch before sending it.
+    - kafka_max_batch_size (int) - max size of a batch per partition in bytes.
+    - kafka_compression_type (str, optional) - batch compression (gzip, snappy, lz4, zstd).
+    - kafka_group_id (str) - consumer group of parsing workers.
+    - kafka_consumer_concurrency (int) - max amount of tasks executed concurrently by consumer.
+    - kafka_ordered_partitions (bool) - execute tasks of same partition one by one.
+    - kafka_retry_topic (str) - topic with failed tasks waiting for retry.
+    - kafka_retry_max_waiting (int) - max amount of retried tasks held in memory
+        until their delay is over, fetching of retry topic is paused above it.
+    - kafka_dead_letter_topic (str) - topic with tasks which exceeded retry attempts.
+    - task_max_attempts (int) - max amount of task executions.
+    - task_retry_base_delay (float) - delay in seconds before first retry,
+        doubled for every next attempt.
+    - task_retry_max_delay (float) - max delay in seconds before retry.
+    - task_dedup_ttl (int) - seconds during which same task sent by API is dropped.
+    """
+
+    queue_backend: str = "kafka"
+    kafka_topic: str = "parsing-topic"
+    kafka_linger_ms: int = 10
+    kafka_max_batch_size: int = 65536
+    kafka_compression_type: Optional[str] = None
+    kafka_group_id: str = "parsing-group"
+    kafka_consumer_concurrency: int = 8
+    kafka_ordered_partitions: bool = False
+    kafka_retry_topic: str = "parsing-retry-topic"
+    kafka_retry_max_waiting: int = 10000
+    kafka_dead_letter_topic: str = "parsing-dead-letter-topic"
+    task_max_attempts: int = 5
+    task_retry_base_delay: float = 5.0
+    task_retry_max_delay: float = 240.0
+    task_dedup_ttl: int = 600
+
+
 class TwitchCredentials(BaseSettings):
     """
     Configuration for TwitchAPIClient.
@@ -32,6 +74,72 @@ class TwitchCredentials(BaseSettings):
     twitch_client_secret: str
 
 
+class TwitchRateLimitSettings(BaseSettings):
+    """
+    Settings of Twitch API requests rate limiter.
+
+    Limiter is seeded from rate limit headers of Twitch responses,
+    settings are used until the first response.
+
+    Attributes:
+    - twitch_rate_limit (int) - amount of requests per window.
+    - twitch_rate_limit_window (float) - seconds to refill all requests.
+    - twitch_rate_limit_max_retries (int) - max retries of throttled (429) request.
+    """
+
+    twitch_rate_limit: int = 800
+    twitch_rate_limit_window: float = 60.0
+    twitch_rate_limit_max_retries: int = 3
+
+
+class TwitchTokenSettings(BaseSettings):
+    """
+    Settings of Twitch app access token refresh.
+
+    Attributes:
+    - twitch_token_cache (bool) - share token by all processes through Redis.
+    - twitch_token_refresh_margin (float) - seconds before expiration to refresh token.
+    - twitch_token_lock_timeout (float) - seconds to hold and to wait for Redis lock of refresh.
+    - twitch_token_max_retries (int) - max retries of failed token request.
+    - twitch_token_retry_delay (float) - seconds before first retry, doubled on every retry.
+    """
+
+    twitch_token_cache: bool = True
+    twitch_token_refresh_margin: float = 300.0
+    twitch_token_lock_timeout: float = 30.0
+    twitch_token_max_retries: int = 5
+    twitch_token_retry_delay: float = 1.0
+
+
+class TwitchHttpSettings(BaseSettings):
+    """
+    Configuration for HTTP client of Twitch API.
+
+    Attributes:
+    - twitch_http_max_connections (int) - max amount of open connections.
+    - twitch_http_max_keepalive (int) - max amount of idle connections kept alive.
+    - twitch_http_keepalive_expiry (float) - seconds idle connection is kept alive.
+    - twitch_http_connect_timeout (float) - connect timeout in seconds.
+    - twitch_http_read_timeout (float) - read timeout in seconds.
+    - twitch_http_write_timeout (float) - write timeout in seconds.
+    - twitch_http_pool_timeout (float) - seconds to wait for free connection of pool.
+    - twitch_http2 (bool) - use HTTP/2 if server supports it.
+    - twitch_http_max_retries (int) - max retries of request on timeouts, network errors and 5xx.
+    - twitch_http_retry_delay (float) - seconds before first retry, doubled on every retry.
+    """
+
+    twitch_http_max_connections: int = 100
+    twitch_http_max_keepalive: int = 20
+    twitch_http_keepalive_expiry: float = 30.0
+    twitch_http_connect_timeout: float = 20.0
+    twitch_http_read_timeout: float = 20.0
+    twitch_http_write_timeout: float = 10.0
+    twitch_http_pool_timeout: float = 10.0
+    twitch_http2: bool = True
+    twitch_http_max_retries: int = 3
+    twitch_http_retry_delay: float = 0.5
+
+
 class LamodaUrls(BaseSettings):
     """
     Configuration with Lamoda links.
@@ -49,11 +157,126 @@ class LamodaUrls(BaseSettings):
     LAMODA_URL_KIDS_BREADCRUMB: HttpUrl
 
 
-class Settings(DatabasebSettings, TwitchCredentials, LamodaUrls):
+class LamodaHttpSettings(BaseSettings):
+    """
+    Configuration for HTTP client fetching Lamoda pages.
+
+    Attributes:
+    - lamoda_http_max_connections (int) - max amount of open connections.
+    - lamoda_http_max_keepalive (int) - max amount of idle connections kept alive.
+    - lamoda_http_keepalive_expiry (float) - seconds idle connection is kept alive.
+    - lamoda_http_connect_timeout (float) - connect timeout in seconds.
+    - lamoda_http_read_timeout (float) - read timeout in seconds.
+    - lamoda_http2 (bool) - use HTTP/2 if server supports it.
+    - lamoda_pagination_window (int) - amount of subcategory pages fetched concurrently.
+    - lamoda_page_size (int) - amount of products per subcategory page.
+    """
+
+    lamoda_http_max_connections: int = 100
+    lamoda_http_max_keepalive: int = 20
+    lamoda_http_keepalive_expiry: float = 30.0
+    lamoda_http_connect_timeout: float = 10.0
+    lamoda_http_read_timeout: float = 20.0
+    lamoda_http2: bool = True
+    lamoda_pagination_window: int = 4
+    lamoda_page_size: int = 60
+
+
+class HostLimiterSettings(BaseSettings):
+    """
+    Settings of adaptive limiters of concurrent requests per host.
+
+    Limit grows by one request per window of successful requests
+    and is multiplied by backoff ratio on throttling, errors or slow responses.
+
+    Attributes:
+    - host_limiter_initial_limit (int) - initial amount of concurrent requests.
+    - host_limiter_min_limit (int) - min amount of concurrent requests.
+    - host_limiter_max_limit (int) - max amount of concurrent requests.
+    - host_limiter_backoff_ratio (float) - multiplier of limit on backoff.
+    - host_limiter_max_latency (float) - seconds, slower responses cause backoff.
+    """
+
+    host_limiter_initial_limit: int = 4
+    host_limiter_min_limit: int = 1
+    host_limiter_max_limit: int = 64
+    host_limiter_backoff_ratio: float = 0.5
+    host_limiter_max_latency: float = 5.0
+
+
+class LamodaParserSettings(BaseSettings):
+    """
+    Settings of Lamoda pages parsing.
+
+    Attributes:
+    - lamoda_html_parser (str) - HTML parser of pages: `selectolax`, `soup`
+        or `auto` (selectolax if it's installed).
+    - lamoda_parse_processes (int, optional) - amount of processes parsing pages
+        out of event loop, amount of CPUs by default, 0 to parse in event loop.
+    - lamoda_page_cache_dir (str, optional) - directory of cache of raw pages,
+        cache is disabled if not set.
+    - lamoda_page_cache_ttl (int) - seconds page is stored in cache.
+    - lamoda_page_cache_max_size (int) - max size of cached pages in bytes.
+    - lamoda_page_cache_level (int) - zstd compression level of cached pages.
+    """
+
+    lamoda_html_parser: str = "auto"
+    lamoda_parse_processes: Optional[int] = None
+    lamoda_page_cache_dir: Optional[str] = None
+    lamoda_page_cache_ttl: int = 7 * 24 * 60 * 60
+    lamoda_page_cache_max_size: int = 1024 * 1024 * 1024
+    lamoda_page_cache_level: int = 3
+
+
+class BulkWriterSettings(BaseSettings):
+    """
+    Configuration for buffers coalescing writes to MongoDB collections.
+
+    Attributes:
+    - bulk_writer_batch_size (int) - max amount of write requests in one bulk write.
+    - bulk_writer_flush_interval (float) - seconds buffered requests wait for batch.
+    - bulk_writer_max_pending (int) - max amount of buffered and in-flight requests
+        of collection, writers wait for free space above it.
+    """
+
+    bulk_writer_batch_size: int = 1000
+    bulk_writer_flush_interval: float = 0.05
+    bulk_writer_max_pending: int = 10000
+
+
+class ExportSettings(BaseSettings):
+    """
+    Configuration for streaming export of collections.
+
+    Attributes:
+    - export_batch_size (int) - amount of documents read from database
+        and sent to client at once.
+    """
+
+    export_batch_size: int = 1000
+
+
+class Settings(
+    DatabasebSettings,
+    QueueSettings,
+    TwitchCredentials,
+    TwitchRateLimitSettings,
+    TwitchTokenSettings,
+    TwitchHttpSettings,
+    LamodaUrls,
+    LamodaHttpSettings,
+    LamodaParserSettings,
+    HostLimiterSettings,
+    BulkWriterSettings,
+    ExportSettings,
+):
     """
     Configuration for project.
 
-    Inherits from DatabasebSettings, TwitchCredentials, LamodaUrls.
+    Inherits from DatabasebSettings, QueueSettings, TwitchCredentials,
+    TwitchRateLimitSettings, TwitchTokenSettings, TwitchHttpSettings, LamodaUrls,
+    LamodaHttpSettings, LamodaParserSettings, HostLimiterSettings, BulkWriterSettings,
+    ExportSettings.
     """
 
     model_config = SettingsConfigDict(
@@ -0,0 +1,301 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from src.config import settings
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class PageCache:
+    """
+    On-disk cache of raw html pages.
+
+    Pages are compressed with zstd and stored by hash of their content,
+    so same pages of different urls are stored once.
+    Index of urls is kept in sqlite database shared by all processes.
+    Pages older than `ttl` are expired, least recently used pages are evicted
+    when total size of stored pages exceeds `max_size`.
+
+    Attributes:
+    - directory (str) - cache directory.
+    - ttl (int) - seconds page is stored.
+    - max_size (int) - max total size of compressed pages in bytes.
+    """
+
+    # amount of stored pages between eviction checks
+    EVICTION_INTERVAL = 100
+
+    def __init__(self, directory: str, ttl: int, max_size: int, level: int = 3):
+        if zstandard is None:
+            raise ValueError("zstandard must be installed to use page cache.")
+
+        self.directory = directory
+        self.ttl = ttl
+        self.max_size = max_size
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressor = zstandard.ZstdDecompressor()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+        self._puts = 0
+
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+        self._db = sqlite3.connect(
+            os.path.join(directory, "index.sqlite"),
+            timeout=30,
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pages "
+            "(url TEXT PRIMARY KEY, hash TEXT, stored_at REAL, accessed_at REAL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS objects (hash TEXT PRIMARY KEY, size INTEGER)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS pages_hash ON pages (hash)")
+
+    def _object_path(self, content_hash: str) -> str:
+        return os.path.join(
+            self.directory, "objects", content_hash[:2], f"{content_hash}.zst"
+        )
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Runs queries in transaction locked against other threads and processes.
+        """
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def _write_object(self, path: str, compressed: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(compressed)
+        os.replace(tmp_path, path)
+
+    def get(self, url: str) -> Optional[str]:
+        """
+        Returns cached page of url or None if page isn't cached or expired.
+        """
+        with self._transaction():
+            row = self._db.execute(
+                "SELECT hash, stored_at FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if row and time.time() - row[1] > self.ttl:
+                self._delete_pages([url])
+                row = None
+
+            if row:
+                try:
+                    with open(self._object_path(row[0]), "rb") as file:
+                        data = self._decompressor.decompress(file.read())
+                except FileNotFoundError:
+                    self._delete_pages([url])
+                    row = None
+
+            if not row:
+                self._counters["misses"] += 1
+                return None
+
+            self._db.execute(
+                "UPDATE pages SET accessed_at = ? WHERE url = ?", (time.time(), url)
+            )
+            self._counters["hits"] += 1
+        return data.decode()
+
+    def put(self, url: str, text: str):
+        """
+        Stores page of url.
+        """
+        data = text.encode()
+        content_hash = hashlib.sha256(data).hexdigest()
+        path = self._object_path(content_hash)
+
+        compressed = None
+        if not os.path.exists(path):
+            compressed = self._compressor.compress(data)
+            self._write_object(path, compressed)
+
+        with self._transaction():
+            # object could be evicted by other process after it was written
+            if not os.path.exists(path):
+                compressed = compressed or self._compressor.compress(data)
+                self._write_object(path, compressed)
+            size = len(compressed) if compressed else os.path.getsize(path)
+            self._db.execute(
+                "INSERT OR REPLACE INTO objects (hash, size) VALUES (?, ?)",
+                (content_hash, size),
+            )
+
+            now = time.time()
+            previous = self._db.execute(
+                "SELECT hash FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages (url, hash, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (url, content_hash, now, now),
+            )
+            if previous and previous[0] != content_hash:
+                self._delete_unused_objects([previous[0]])
+
+            self._counters["stored"] += 1
+            self._puts += 1
+            if self._puts % self.EVICTION_INTERVAL == 1:
+                self._evict()
+
+    def touch(self, url: str):
+        """
+        Renews stored time of page of url, e.g. when page isn't modified on site.
+        """
+        with self._transaction():
+            now = time.time()
+            self._db.execute(
+                "UPDATE pages SET stored_at = ?, accessed_at = ? WHERE url = ?",
+                (now, now, url),
+            )
+
+    def _delete_pages(self, urls):
+        hashes = set()
+        for url in urls:
+            row = self._db.execute(
+                "SELECT hash FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if row:
+                hashes.add(row[0])
+                self._db.execute("DELETE FROM pages WHERE url = ?", (url,))
+        self._delete_unused_objects(hashes)
+
+    def _delete_unused_objects(self, hashes):
+        for content_hash in hashes:
+            used = self._db.execute(
+                "SELECT 1 FROM pages WHERE hash = ? LIMIT 1", (content_hash,)
+            ).fetchone()
+            if not used:
+                self._db.execute("DELETE FROM objects WHERE hash = ?", (content_hash,))
+                try:
+                    os.remove(self._object_path(content_hash))
+                except FileNotFoundError:
+                    pass
+
+    def _evict(self):
+        """
+        Deletes expired pages and then least recently used pages
+        until total size fits `max_size`.
+        """
+        expired = [
+            row[0]
+            for row in self._db.execute(
+                "SELECT url FROM pages WHERE stored_at < ?", (time.time() - self.ttl,)
+            )
+        ]
+        self._delete_pages(expired)
+        self._counters["evicted"] += len(expired)
+
+        total_size = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM objects"
+        ).fetchone()[0]
+        if total_size <= self.max_size:
+            return
+
+        for url, _ in self._db.execute(
+            "SELECT pages.url, objects.size FROM pages "
+            "JOIN objects ON pages.hash = objects.hash "
+            "ORDER BY pages.accessed_at"
+        ).fetchall():
+            if total_size <= self.max_size:
+                break
+            self._delete_pages([url])
+            self._counters["evicted"] += 1
+            total_size = self._db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM objects"
+            ).fetchone()[0]
+
+    def evict(self):
+        """
+        Deletes expired and least recently used pages.
+        """
+        with self._transaction():
+            self._evict()
+
+    def stats(self) -> Dict:
+        """
+        Returns amount of cache hits, misses, stored and evicted pages of process.
+        """
+        return dict(self._counters)
+
+
+_page_cache: Optional[PageCache] = None
+
+
+def get_page_cache() -> Optional[PageCache]:
+    """
+    Function to get page cache of process.
+
+    Returns None if cache is disabled (`lamoda_page_cache_dir` isn't set).
+    """
+    global _page_cache
+
+    if _page_cache is None and settings.lamoda_page_cache_dir:
+        _page_cache = PageCache(
+            settings.lamoda_page_cache_dir,
+            ttl=settings.lamoda_page_cache_ttl,
+            max_size=settings.lamoda_page_cache_max_size,
+            level=settings.lamoda_page_cache_level,
+        )
+    return _page_cache
+
+
+async def get_cached_page(url: str) -> Optional[str]:
+    """
+    Function to get cached page of url.
+
+    Returns None if page isn't cached or cache is disabled.
+    """
+    cache = get_page_cache()
+    if cache is None:
+        return None
+    return await asyncio.to_thread(cache.get, url)
+
+
+async def cache_page(url: str, text: str):
+    """
+    Function to store page of url in cache if cache is enabled.
+    """
+    cache = get_page_cache()
+    if cache is not None:
+        await asyncio.to_thread(cache.put, url, text)
+
+
+async def touch_cached_page(url: str):
+    """
+    Function to renew stored time of cached page of url if cache is enabled.
+    """
+    cache = get_page_cache()
+    if cache is not None:
+        await asyncio.to_thread(cache.touch, url)
+
+
+def get_page_cache_stats() -> Dict:
+    """
+    Function to get statistics of page cache of process.
+    """
+    cache = get_page_cache()
+    return cache.stats() if cache else {}
@@ -0,0 +1,297 @@
+from typing import Dict, List, Optional
+from bs4 import BeautifulSoup, SoupStrainer
+
+from src.config import settings
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+
+CATEGORY_CLASS = "x-tree-view-catalog-navigation__category"
+SUBTREE_CLASS = "x-tree-view-catalog-navigation__subtree"
+FOUND_CLASS = "x-tree-view-catalog-navigation__found"
+PRODUCT_CARD_CLASS = "x-product-card__card"
+
+
+def _price(text: str) -> str:
+    return text.strip().replace(" р.", "")
+
+
+class SoupParser:
+    """
+    Lamoda pages parser on BeautifulSoup.
+
+    Builds trees only of elements which contain parsed data (SoupStrainer),
+    the rest of page is skipped by tokenizer.
+    """
+
+    name = "soup"
+
+    def parse_categories(self, page: str) -> List[Dict]:
+        """
+        Parses categories from navigation of main category page.
+        """
+        soup = BeautifulSoup(
+            page, "html.parser", parse_only=SoupStrainer("div", class_=CATEGORY_CLASS)
+        )
+
+        categories = []
+        for category in soup.find_all("div", class_=CATEGORY_CLASS):
+            elem = category.find("a", class_="x-link__label")
+            if elem:
+                link = elem["href"]
+                categories.append(
+                    {
+                        "name": elem.text.strip(),
+                        "link": str(settings.LAMODA_URL_BASE) + link,
+                        "amount": category.find(
+                            "span", class_=FOUND_CLASS
+                        ).text.strip(),
+                        "slug": link.split("/")[-2],
+                    }
+                )
+        return categories
+
+    def parse_subcategories(self, page: str) -> List[Dict]:
+        """
+        Parses subcategories from navigation subtree of category page.
+        """
+        soup = BeautifulSoup(
+            page, "html.parser", parse_only=SoupStrainer("ul", class_=SUBTREE_CLASS)
+        )
+        ul = soup.find("ul", class_=SUBTREE_CLASS)
+        if not ul:
+            return []
+
+        subcategories = []
+        for li in ul.find_all("li"):
+            category = li.find("div", class_=CATEGORY_CLASS)
+            if not category:
+                continue
+            a = category.find("a", class_="x-link x-link__label")
+            link = str(settings.LAMODA_URL_BASE) + a["href"]
+
+            subcategories.append(
+                {
+                    "name": a.text,
+                    "link": link,
+                    "amount": category.find("span", class_=FOUND_CLASS).text.strip(),
+                    "slug": link.split("/")[-2],
+                }
+            )
+        return subcategories
+
+    def parse_products(self, page: str) -> List[Dict]:
+        """
+        Parses products from product cards of subcategory page.
+        """
+        soup = BeautifulSoup(
+            page,
+            "html.parser",
+            parse_only=SoupStrainer("div", class_=PRODUCT_CARD_CLASS),
+        )
+
+        products = []
+        for product in soup.find_all("div", class_=PRODUCT_CARD_CLASS):
+            data = {}
+
+            link = product.find(
+                "a", class_="x-product-card__link x-product-card__hit-area"
+            )
+            if link:
+                data["link"] = str(settings.LAMODA_URL_BASE) + link["href"]
+                data["product_number"] = link["href"].split("/")[-3]
+
+            product_name = product.find(
+                "div", class_="x-product-card-description__product-name"
+            )
+            if product_name:
+                data["product_name"] = product_name.text.strip()
+
+            brand_name = product.find(
+                "div", class_="x-product-card-description__brand-name"
+            )
+            if brand_name:
+                data["brand_name"] = brand_name.text.strip()
+
+            single_price = product.find(
+                "span", class_="x-product-card-description__price-single"
+            )
+            if single_price:
+                data["single_price"] = _price(single_price.text)
+
+            new_price = product.find(
+                "span", class_="x-product-card-description__price-new"
+            )
+            if new_price:
+                data["new_price"] = _price(new_price.text)
+
+            old_price = product.find(
+                "span", class_="x-product-card-description__price-old"
+            )
+            if old_price:
+                data["old_price"] = _price(old_price.text)
+
+            image = product.find("img", class_="x-product-card__pic-img")
+            if image:
+                data["image"] = "https:" + image["src"]
+
+            products.append(data)
+        return products
+
+
+class SelectolaxParser:
+    """
+    Lamoda pages parser on selectolax (lexbor) with CSS selectors.
+    """
+
+    name = "selectolax"
+
+    def parse_categories(self, page: str) -> List[Dict]:
+        """
+        Parses categories from navigation of main category page.
+        """
+        tree = LexborHTMLParser(page)
+
+        categories = []
+        for category in tree.css(f"div.{CATEGORY_CLASS}"):
+            elem = category.css_first("a.x-link__label")
+            if elem:
+                link = elem.attributes["href"]
+                categories.append(
+                    {
+                        "name": elem.text().strip(),
+                        "link": str(settings.LAMODA_URL_BASE) + link,
+                        "amount": category.css_first(f"span.{FOUND_CLASS}")
+                        .text()
+                        .strip(),
+                        "slug": link.split("/")[-2],
+                    }
+                )
+        return categories
+
+    def parse_subcategories(self, page: str) -> List[Dict]:
+        """
+        Parses subcategories from navigation subtree of category page.
+        """
+        tree = LexborHTMLParser(page)
+        ul = tree.css_first(f"ul.{SUBTREE_CLASS}")
+        if not ul:
+            return []
+
+        subcategories = []
+        for li in ul.css("li"):
+            category = li.css_first(f"div.{CATEGORY_CLASS}")
+            if not category:
+                continue
+            a = category.css_first("a.x-link.x-link__label")
+            link = str(settings.LAMODA_URL_BASE) + a.attributes["href"]
+
+            subcategories.append(
+                {
+                    "name": a.text(),
+                    "link": link,
+                    "amount": category.css_first(f"span.{FOUND_CLASS}").text().strip(),
+                    "slug": link.split("/")[-2],
+                }
+            )
+        return subcategories
+
+    def parse_products(self, page: str) -> List[Dict]:
+        """
+        Parses products from product cards of subcategory page.
+        """
+        tree = LexborHTMLParser(page)
+
+        products = []
+        for product in tree.css(f"div.{PRODUCT_CARD_CLASS}"):
+            data = {}
+
+            link = product.css_first("a.x-product-card__link.x-product-card__hit-area")
+            if link:
+                href = link.attributes["href"]
+                data["link"] = str(settings.LAMODA_URL_BASE) + href
+                data["product_number"] = href.split("/")[-3]
+
+            product_name = product.css_first(
+                "div.x-product-card-description__product-name"
+            )
+            if product_name:
+                data["product_name"] = product_name.text().strip()
+
+            brand_name = product.css_first("div.x-product-card-description__brand-name")
+            if brand_name:
+                data["brand_name"] = brand_name.text().strip()
+
+            single_price = product.css_first(
+                "span.x-product-card-description__price-single"
+            )
+            if single_price:
+                data["single_price"] = _price(single_price.text())
+
+            new_price = product.css_first("span.x-product-card-description__price-new")
+            if new_price:
+                data["new_price"] = _price(new_price.text())
+
+            old_price = product.css_first("span.x-product-card-description__price-old")
+            if old_price:
+                data["old_price"] = _price(old_price.text())
+
+            image = product.css_first("img.x-product-card__pic-img")
+            if image:
+                data["image"] = "https:" + image.attributes["src"]
+
+            products.append(data)
+        return products
+
+
+PARSERS = {
+    SoupParser.name: SoupParser,
+    SelectolaxParser.name: SelectolaxParser,
+}
+
+_parsers = {}
+
+
+def get_parser(name: Optional[str] = None):
+    """
+    Function to get Lamoda pages parser.
+
+    Args:
+    - name (str, optional) - parser name (`soup`, `selectolax` or `auto`),
+        `lamoda_html_parser` setting by default.
+        `auto` uses selectolax if it's installed and BeautifulSoup otherwise.
+    """
+    name = name or settings.lamoda_html_parser
+    if name == "auto":
+        name = SelectolaxParser.name if LexborHTMLParser else SoupParser.name
+
+    if name not in PARSERS:
+        raise ValueError(f"Unsupported HTML parser '{name}'.")
+    if name == SelectolaxParser.name and LexborHTMLParser is None:
+        raise ValueError("selectolax must be installed to use selectolax parser.")
+
+    if name not in _parsers:
+        _parsers[name] = PARSERS[name]()
+    return _parsers[name]
+
+
+def parse_pages(
+    method: str, pages: List[str], parser_name: Optional[str] = None
+) -> List[List[Dict]]:
+    """
+    Function to parse batch of pages by one parser method.
+
+    Module level function, so it can be sent to pool processes
+    with pages of whole batch at once.
+
+    Args:
+    - method (str) - parser method (`parse_categories`, `parse_subcategories`
+        or `parse_products`).
+    - pages (list of str) - html pages.
+    - parser_name (str, optional) - parser name, `lamoda_html_parser` setting by default.
+    """
+    parser = get_parser(parser_name)
+    return [getattr(parser, method)(page) for page in pages]
@@ -1,36 +1,102 @@
-from typing import Dict, List
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Set
 from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorCursor
+from pymongo import ASCENDING, DESCENDING, DeleteMany, UpdateOne
 from src.exceptions.exc_types import LamodaCategoriesNotFoundException
 
-from src.lamoda.utils import add_current_time
-from src.resources.mongo import db_lamoda
+from src.lamoda.utils import HtmlPage, add_current_time
+from src.resources.bulk_writer import get_bulk_writer
+from src.resources.mongo import (
+    db_lamoda,
+    db_lamoda_fingerprints,
+    db_lamoda_products,
+    db_lamoda_runs,
+    index,
+)
 
 db = db_lamoda
 
+# Fields of subcategory path stored in every product
+PRODUCT_PATH_FIELDS = ("category", "subcategory_slug", "low_subcategory_slug")
+
+# Product fields which aren't sent in responses
+PRODUCT_HIDDEN_FIELDS = {"subcategory_id": 0}
+
+
+# Indexes of collections ensured at startup:
+# - ids of nested categories, lookups of categories,
+# - category and subcategory slug, reads of categories and subcategories,
+# - unique subcategory and product number, key of product upserts,
+# - subcategory, page and position, products of subcategory in order of pages,
+# - subcategory path and product number, reads of products,
+# - start time of run, latest runs.
+INDEXES = [
+    (
+        db,
+        [
+            index("categories._id"),
+            index("categories.categories._id"),
+            index("category", "categories.slug"),
+        ],
+    ),
+    (
+        db_lamoda_products,
+        [
+            index("subcategory_id", "product_number", unique=True),
+            index("subcategory_id", "page", "position"),
+            index(*PRODUCT_PATH_FIELDS, "product_number"),
+        ],
+    ),
+    (db_lamoda_runs, [index(("started_at", DESCENDING))]),
+]
+
+
+async def save_main_category(data: Dict):
+    """
+    Function to insert or replace data of main category (men, women, kids).
 
-async def insert_main_categories(data: List[Dict]) -> List:
+    Args:
+    - data (dict) - category info with `_id`.
     """
-    Function to insert basic data about main categories (men, women, kids).
+    await add_current_time(data)
+    await db.replace_one({"_id": data["_id"]}, data, upsert=True)
+
 
-    Returns IDs of inserter items.
+async def get_main_category(category: str) -> Optional[Dict]:
+    """
+    Function to get saved data of main category with all nested data.
 
     Args:
-    - data (list of dicts) - categories info.
+    - category (str) - category name.
     """
-    await add_current_time(data)
-    result = await db.insert_many(data)
+    return await db.find_one({"category": category})
 
-    inserted_ids = [str(item_id) for item_id in result.inserted_ids]
-    return inserted_ids
+
+async def get_category_by_id(object_id: ObjectId) -> Optional[Dict]:
+    """
+    Function to get saved data of 2-level category with all nested data.
+
+    Args:
+    - object_id (ObjectId) - category id in database.
+    """
+    parent = await db.find_one({"categories._id": object_id}, {"categories.$": 1})
+    if parent and parent.get("categories"):
+        return parent["categories"][0]
 
 
 async def clear_categories_data() -> int:
     """
     Clear all data from lamoda collection.
 
+    Products and fingerprints of pages are cleared too,
+    so next parsing rewrites all pages.
     Returns amount of deleted instances.
     """
     count = await db.delete_many({})
+    await db_lamoda_products.delete_many({})
+    await db_lamoda_fingerprints.delete_many({})
     return count.deleted_count
 
 
@@ -38,46 +104,250 @@ async def update_category_by_id(object_id: ObjectId, field_name: str, data: dict
     """
     Updates 2-level categories with provided field name and its data.
 
+    Updates of all tasks are coalesced into bulk writes.
+
     Args:
     - object_id (ObjectId) - category id in database.
     - field_name (str) - name of new field.
     - data (dict) - category info to save in new field.
     """
-    filter_query = {"categories._id": object_id}
-
-    parent = await db.find_one(filter_query)
-    if parent:
-        for category in parent.get("categories", []):
-            if category["_id"] == object_id:
-                await add_current_time(data)
-                insert_query = {"$set": {f"categories.$.{field_name}": data}}
-                await db.update_one(filter_query, insert_query)
-                break
+    await add_current_time(data)
+    await get_bulk_writer(db).write(
+        [
+            UpdateOne(
+                {"categories._id": object_id},
+                {"$set": {f"categories.$.{field_name}": data}},
+            )
+        ]
+    )
 
 
-async def insert_product_items(items: List[Dict], subcategory_id: ObjectId):
+async def insert_product_items(items: List[Dict], subcategory: Dict, page: int):
     """
-    Inserts product's data to subcategory.
+    Replaces product's data of one page of subcategory.
+
+    Products are upserted by subcategory and product number,
+    products which aren't on page anymore are deleted.
+    Writes of all tasks are coalesced into bulk writes.
+    Products without product number are skipped.
 
     Args:
     - items (List[Dict]) - list of products info.
+    - subcategory (dict) - subcategory `_id` and its path: `category`,
+        `subcategory_slug` and `low_subcategory_slug`.
+    - page (int) - number of subcategory page.
+    """
+    subcategory_id = subcategory["_id"]
+    path = {field: subcategory.get(field) for field in PRODUCT_PATH_FIELDS}
+    current_time = datetime.now().isoformat()
+
+    requests = []
+    for position, item in enumerate(items):
+        if not item.get("product_number"):
+            continue
+        item = {key: value for key, value in item.items() if key != "_id"}
+        requests.append(
+            UpdateOne(
+                {
+                    "subcategory_id": subcategory_id,
+                    "product_number": item["product_number"],
+                },
+                {
+                    "$set": {
+                        **item,
+                        **path,
+                        "page": page,
+                        "position": position,
+                        "updated_at": current_time,
+                    },
+                    "$setOnInsert": {"created_at": current_time},
+                },
+                upsert=True,
+            )
+        )
+
+    # deleted products don't intersect with upserted ones, so order doesn't matter
+    requests.append(
+        DeleteMany(
+            {
+                "subcategory_id": subcategory_id,
+                "page": page,
+                "product_number": {
+                    "$nin": [item.get("product_number") for item in items]
+                },
+            }
+        )
+    )
+    await get_bulk_writer(db_lamoda_products).write(requests)
+
+
+async def delete_product_items(subcategory_id: ObjectId, from_page: int):
+    """
+    Deletes product's data of subcategory pages starting with `from_page`.
+
+    Args:
     - subcategory_id (ObjectId) - category id in database.
+    - from_page (int) - number of first deleted page.
+    """
+    await get_bulk_writer(db_lamoda_products).write(
+        [DeleteMany({"subcategory_id": subcategory_id, "page": {"$gte": from_page}})]
+    )
+
+
+async def delete_subcategories_data(subcategories: List[Dict]):
+    """
+    Deletes products and fingerprints of pages of removed subcategories.
+
+    Args:
+    - subcategories (list of dicts) - subcategories with `_id` and `link`.
+    """
+    if not subcategories:
+        return
+
+    await get_bulk_writer(db_lamoda_products).write(
+        [
+            DeleteMany(
+                {"subcategory_id": {"$in": [item["_id"] for item in subcategories]}}
+            )
+        ]
+    )
+    await db_lamoda_fingerprints.delete_many(
+        {
+            "$or": [
+                {"_id": {"$regex": f"^{re.escape(item['link'])}(\\?page=\\d+)?$"}}
+                for item in subcategories
+            ]
+        }
+    )
+
+
+async def get_subcategories_with_products(subcategory_ids: List[ObjectId]) -> Set:
+    """
+    Function to get ids of subcategories which have saved products.
+
+    Args:
+    - subcategory_ids (list of ObjectId) - checked subcategories ids.
+    """
+    result = await db_lamoda_products.distinct(
+        "subcategory_id", {"subcategory_id": {"$in": subcategory_ids}}
+    )
+    return set(result)
+
+
+async def get_lowest_categories() -> List[Dict]:
+    """
+    Function to get `_id`, `link` and path of all low-level subcategories.
+    """
+    result = await db.find(
+        {},
+        {
+            "category": 1,
+            "categories.slug": 1,
+            "categories.categories._id": 1,
+            "categories.categories.link": 1,
+            "categories.categories.slug": 1,
+        },
+    ).to_list(length=None)
+
+    return [
+        {
+            "_id": subcategory["_id"],
+            "link": subcategory["link"],
+            "category": parent["category"],
+            "subcategory_slug": category["slug"],
+            "low_subcategory_slug": subcategory["slug"],
+        }
+        for parent in result
+        for category in parent.get("categories", [])
+        for subcategory in category.get("categories", [])
+    ]
+
+
+async def get_fingerprints(urls: List[str]) -> Dict[str, Dict]:
+    """
+    Function to get fingerprints of previously parsed pages.
+
+    Returns fingerprints by page url.
+
+    Args:
+    - urls (list of str) - pages urls with pagination.
+    """
+    result = await db_lamoda_fingerprints.find({"_id": {"$in": urls}}).to_list(
+        length=None
+    )
+    return {fingerprint["_id"]: fingerprint for fingerprint in result}
+
+
+async def save_fingerprint(page: HtmlPage, items_hash: str):
+    """
+    Function to save fingerprint of parsed page.
+
+    Args:
+    - page (HtmlPage) - fetched page with its ETag and Last-Modified.
+    - items_hash (str) - hash of parsed items.
+    """
+    await db_lamoda_fingerprints.update_one(
+        {"_id": page.url},
+        {
+            "$set": {
+                "etag": page.etag,
+                "last_modified": page.last_modified,
+                "hash": items_hash,
+                "updated_at": datetime.now().isoformat(),
+            }
+        },
+        upsert=True,
+    )
+
+
+async def create_run(full: bool, source: str = "network") -> ObjectId:
+    """
+    Function to create summary of parsing run.
+
+    Returns id of run.
+
+    Args:
+    - full (bool) - whether all pages are rewritten.
+    - source (str, optional) - source of pages (`network` or `cache`).
+    """
+    current_time = datetime.now().isoformat()
+    result = await db_lamoda_runs.insert_one(
+        {
+            "full": full,
+            "source": source,
+            "fetched": 0,
+            "skipped": 0,
+            "rewritten": 0,
+            "started_at": current_time,
+            "updated_at": current_time,
+        }
+    )
+    return result.inserted_id
+
+
+async def update_run_counters(run_id: ObjectId, counters: Dict[str, int]):
+    """
+    Function to add amounts of pages processed by task to summary of parsing run.
+
+    Args:
+    - run_id (ObjectId) - run id in database.
+    - counters (dict) - amounts of fetched, skipped and rewritten pages.
     """
-    filter_query = {"categories.categories._id": subcategory_id}
-    parent = await db.find_one(filter_query)
+    await db_lamoda_runs.update_one(
+        {"_id": run_id},
+        {"$inc": counters, "$set": {"updated_at": datetime.now().isoformat()}},
+    )
 
-    if parent:
-        for top_id, category in enumerate(parent.get("categories", [])):
-            for middle_id, subcategory in enumerate(category.get("categories", [])):
-                if subcategory["_id"] == subcategory_id:
-                    await add_current_time(items)
-                    insert_query = {
-                        "$set": {
-                            f"categories.{top_id}.categories.{middle_id}.products": items
-                        }
-                    }
-                    await db.update_one(filter_query, insert_query)
-                    break
+
+async def get_runs(limit: int) -> List[Dict]:
+    """
+    Function to get summaries of latest parsing runs.
+
+    Args:
+    - limit (int) - max amount of runs.
+    """
+    cursor = db_lamoda_runs.find({}).sort("started_at", -1).limit(limit)
+    return await cursor.to_list(length=None)
 
 
 async def get_categories() -> List[Dict]:
@@ -92,81 +362,140 @@ async def get_specific_category(category: str) -> List[Dict]:
     """
     Function to get data of specific category.
 
+    Nested subcategories are excluded by database.
+
     Args:
     - category (str) - category name.
     """
-    result = await db.find_one({"category": category})
+    result = await db.find_one({"category": category}, {"categories.categories": 0})
 
     if not result:
-        categories_data = await get_categories()
-        if categories_data:
-            categories = [c["category"] for c in categories_data]
+        categories = await db.distinct("category")
+        if categories:
             raise LamodaCategoriesNotFoundException(
                 message=f"Category '{category}' not found", details=categories
             )
         else:
             raise LamodaCategoriesNotFoundException(message="No categories exists")
 
-    for category in result["categories"]:
-        if category.get("categories"):
-            del category["categories"]
     return result
 
 
-async def get_subcategories(
-    category: str, subcategory_slug: str, exclude_products=True
-) -> List[Dict]:
+def _find_by_slug(array: str, slug: str) -> Dict:
+    """
+    Returns aggregation expression selecting category with slug from array field.
+    """
+    return {
+        "$arrayElemAt": [
+            {
+                "$filter": {
+                    "input": array,
+                    "as": "category",
+                    "cond": {"$eq": ["$$category.slug", slug]},
+                }
+            },
+            0,
+        ]
+    }
+
+
+async def get_subcategories(category: str, subcategory_slug: str) -> List[Dict]:
     """
     Function to get data of specific subcategory.
 
+    Subcategory is selected by database, so only its data is loaded.
+
     Args:
     - category (str) - category name.
     - subcategory_slug (str) - subcategory slug.
-    - exclude_products (bool, optional) - option to include or exclude products field.
     """
-    filter_query = {
-        "$and": [{"category": category}, {"categories.slug": subcategory_slug}]
-    }
-    parent = await db.find_one(filter_query, {"categories.$": 1})
+    pipeline = [
+        {"$match": {"category": category, "categories.slug": subcategory_slug}},
+        {
+            "$project": {
+                "_id": 0,
+                "categories": _find_by_slug("$categories", subcategory_slug),
+            }
+        },
+    ]
+    result = await db.aggregate(pipeline).to_list(length=1)
 
-    if not parent:
+    if not result:
         category = await get_specific_category(category)
         subcategories = [c["slug"] for c in category.get("categories", [])]
         raise LamodaCategoriesNotFoundException(
             message=f"Subcategory '{subcategory_slug}' not found", details=subcategories
         )
 
-    if parent and parent.get("categories"):
-        subcategories = parent["categories"][0].get("categories")
-        if subcategories and exclude_products:
-            for category in subcategories:
-                if category.get("products"):
-                    del category["products"]
-        return subcategories
+    return result[0]["categories"].get("categories")
+
+
+async def _get_lowest_subcategory(
+    category: str, subcategory_slug: str, low_subcategory_slug: str
+) -> Dict:
+    """
+    Returns low-level subcategory without products or raises not found exception.
+
+    Subcategory is selected by database, only slugs of other subcategories
+    are loaded for not found exception.
+    """
+    pipeline = [
+        {"$match": {"category": category, "categories.slug": subcategory_slug}},
+        {
+            "$project": {
+                "_id": 0,
+                "subcategory": _find_by_slug("$categories", subcategory_slug),
+            }
+        },
+        {
+            "$project": {
+                "category": _find_by_slug(
+                    "$subcategory.categories", low_subcategory_slug
+                ),
+                "slugs": "$subcategory.categories.slug",
+            }
+        },
+    ]
+    result = await db.aggregate(pipeline).to_list(length=1)
+
+    if not result:
+        # raises exception with slugs of subcategories
+        await get_subcategories(category, subcategory_slug)
+        result = [{}]
+
+    if result[0].get("category"):
+        return result[0]["category"]
+
+    raise LamodaCategoriesNotFoundException(
+        message=f"Subcategory '{low_subcategory_slug}' not found",
+        details=result[0].get("slugs", []),
+    )
 
 
 async def get_lowest_subcategories(
     category: str, subcategory_slug: str, low_subcategory_slug: str
 ) -> List[Dict]:
     """
-    Function to get data of specific low-level subcategory
+    Function to get data of specific low-level subcategory with its products.
+
+    Products are ordered as on subcategory pages.
 
     Args
     - category (str) - category name.
     - subcategory_slug (str) - subcategory slug.
     - low_subcategory_slug (str) - next subcategory slug.
     """
-    subcategories = await get_subcategories(
-        category, subcategory_slug, exclude_products=False
+    category = await _get_lowest_subcategory(
+        category, subcategory_slug, low_subcategory_slug
     )
-    for category in subcategories:
-        if category["slug"] == low_subcategory_slug:
-            return category
-
-    categories = [c["slug"] for c in subcategories]
-    raise LamodaCategoriesNotFoundException(
-        message=f"Subcategory '{low_subcategory_slug}' not found", details=categories
+    category["products"] = (
+        await db_lamoda_products.find(
+            {"subcategory_id": category["_id"]}, PRODUCT_HIDDEN_FIELDS
+        )
+        .sort([("page", ASCENDING), ("position", ASCENDING)])
+        .to_list(length=None)
     )
+    return category
 
 
 async def get_product_info(
@@ -181,10 +510,22 @@ async def get_product_info(
     - low_subcategory_slug (str) - next subcategory slug.
     - product (str) - product article number.
     """
-    category = await get_lowest_subcategories(
-        category, subcategory_slug, low_subcategory_slug
+    item = await db_lamoda_products.find_one(
+        {
+            "category": category,
+            "subcategory_slug": subcategory_slug,
+            "low_subcategory_slug": low_subcategory_slug,
+            "product_number": product,
+        },
+        PRODUCT_HIDDEN_FIELDS,
     )
-    if category and category.get("products"):
-        for item in category["products"]:
-            if item["product_number"] == product:
-                return item
+    if not item:
+        await _get_lowest_subcategory(category, subcategory_slug, low_subcategory_slug)
+    return item
+
+
+def get_products_cursor() -> AsyncIOMotorCursor:
+    """
+    Function to get cursor of all products for export.
+    """
+    return db_lamoda_products.find({}, PRODUCT_HIDDEN_FIELDS)
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from fastapi import APIRouter
 from fastapi_cache.decorator import cache
 
@@ -5,29 +7,74 @@ from src.lamoda.repository import (
     clear_categories_data,
     get_categories,
     get_lowest_subcategories,
+    get_products_cursor,
     get_product_info,
+    get_runs,
     get_specific_category,
     get_subcategories,
 )
-from src.lamoda.utils import prepare_response_data
-from src.lamoda.service import parse_all_categories
-from src.resources.kafka import producer_send_one
-
-router = APIRouter()
+from src.lamoda.service import parse_all_categories, reparse_from_cache
+from src.resources.queue import producer_send_unique
+from src.routers.export import export_response
+from src.routers.responses import MongoJSONRoute
+
+router = APIRouter(route_class=MongoJSONRoute)
+
+# Columns of products CSV export
+PRODUCT_FIELDS = [
+    "_id",
+    "category",
+    "subcategory_slug",
+    "low_subcategory_slug",
+    "product_number",
+    "product_name",
+    "brand_name",
+    "single_price",
+    "new_price",
+    "old_price",
+    "link",
+    "image",
+    "page",
+    "position",
+    "created_at",
+    "updated_at",
+]
 
 
 @router.get("/auto-parse")
 @cache(expire=1200)
-async def parse_categories():
+async def parse_categories(full: bool = False):
     """
     API to start auto-parsing all categories.
 
-    Clears all lamoda data and then starts parsing of all categories.
+    Parsing is incremental: only new or changed categories and pages are rewritten.
+    Returns id of started job or id of the same job if it's already queued.
+
+    Parameters:
+    - full (bool, optional) - clear all lamoda data and parse all pages.
     """
-    await clear_categories_data()
-    await producer_send_one(parse_all_categories)
+    job_id, created = await producer_send_unique(parse_all_categories, full=full)
 
-    return {"message": "Parsing started"}
+    return {
+        "message": "Parsing started" if created else "Parsing already queued",
+        "job_id": job_id,
+    }
+
+
+@router.get("/reparse")
+async def reparse_categories():
+    """
+    API to start parsing of all saved subcategories again from page cache.
+
+    Pages aren't fetched, so changed extractors are applied at CPU speed.
+    Returns id of started job or id of the same job if it's already queued.
+    """
+    job_id, created = await producer_send_unique(reparse_from_cache)
+
+    return {
+        "message": "Reparsing started" if created else "Reparsing already queued",
+        "job_id": job_id,
+    }
 
 
 @router.get("/categories/clear")
@@ -48,10 +95,45 @@ async def categories():
     API to gel all categories.
     """
     categories = await get_categories()
-    await prepare_response_data(categories)
     return {"data": categories}
 
 
+@router.get("/runs")
+async def runs(limit: int = 10):
+    """
+    API to get summaries of latest parsing runs.
+
+    Each run has source of pages (`network` or `cache`) and amounts of pages:
+    - fetched - downloaded or read from cache pages,
+    - skipped - pages not modified since previous run or with the same data,
+    - rewritten - pages which data is saved.
+
+    Parameters:
+    - limit (int, optional) - max amount of runs.
+    """
+    data = await get_runs(limit)
+    return {"data": data}
+
+
+@router.get("/products/export")
+async def export_products(
+    format: Literal["ndjson", "csv"] = "ndjson", gzip: bool = False
+):
+    """
+    API to export all products as file.
+
+    Products are sent while they are read from database,
+    so export of all categories doesn't need loading them in memory.
+
+    Parameters:
+    - format (str, optional) - file format (`ndjson` or `csv`).
+    - gzip (bool, optional) - compress file with gzip.
+    """
+    return export_response(
+        get_products_cursor(), "products", PRODUCT_FIELDS, format, gzip
+    )
+
+
 @router.get("/{category}")
 @cache(expire=60)
 async def specific_category(category: str):
@@ -62,8 +144,6 @@ async def specific_category(category: str):
     - category (str, required) - category name.
     """
     data = await get_specific_category(category)
-    await prepare_response_data(data)
-
     return {"data": data}
 
 
@@ -78,8 +158,6 @@ async def subcategories(category: str, subcategory_slug: str):
     - subcategory_slug (str, required) - subcategory slug.
     """
     data = await get_subcategories(category, subcategory_slug)
-    await prepare_response_data(data)
-
     return {"data": data}
 
 
@@ -99,7 +177,6 @@ async def lowest_subcategories(
     data = await get_lowest_subcategories(
         category, subcategory_slug, low_subcategory_slug
     )
-    await prepare_response_data(data)
     return {"data": data}
 
 
@@ -120,5 +197,4 @@ async def product_info(
     data = await get_product_info(
         category, subcategory_slug, low_subcategory_slug, product_number
     )
-    await prepare_response_data(data)
     return {"data": data}
@@ -1,15 +1,31 @@
-from typing import Dict
-from bs4 import BeautifulSoup
+import asyncio
+import math
+from typing import Callable, Dict, List, Optional, Tuple
 from bson import ObjectId
 
 from src.config import settings
 from src.lamoda.repository import (
-    insert_main_categories,
+    clear_categories_data,
+    create_run,
+    delete_product_items,
+    delete_subcategories_data,
+    get_category_by_id,
+    get_fingerprints,
+    get_lowest_categories,
+    get_main_category,
+    get_subcategories_with_products,
     insert_product_items,
+    save_fingerprint,
+    save_main_category,
     update_category_by_id,
+    update_run_counters,
 )
-from src.resources.kafka import producer_send_one
-from src.lamoda.utils import get_html_text
+from src.resources.process_pool import run_in_process
+from src.resources.queue import producer_send_many
+from src.resources.tasks import task
+from src.lamoda.parsers import parse_pages
+from src.lamoda.page_cache import get_cached_page, get_page_cache
+from src.lamoda.utils import HtmlPage, get_html_page, get_items_hash, get_page_url
 
 
 MAIN_CATEGORIES_URL = [
@@ -19,162 +35,424 @@ MAIN_CATEGORIES_URL = [
 ]
 
 
-async def parse_all_categories():
+def merge_categories(
+    parsed: List[Dict],
+    saved: Optional[List[Dict]],
+    full: bool,
+    is_parsed: Callable[[Dict], bool],
+) -> Tuple[List[Dict], List[Tuple[Dict, bool]]]:
     """
-    Function to parse main categories (men, women, kids).
+    Function to merge parsed categories with previously saved ones.
+
+    Saved categories are matched by link and keep their `_id` and nested data.
+    Returns merged categories and categories which must be parsed further
+    with flag whether all their pages must be rewritten:
+    - new categories (all pages are rewritten),
+    - categories with changed amount of products or without parsed data,
+    - all categories if `full` is set.
+
+    Args:
+    - parsed (list of dicts) - parsed categories.
+    - saved (list of dicts, optional) - saved categories.
+    - full (bool) - whether all categories are parsed.
+    - is_parsed (callable) - function which checks whether saved category
+        has parsed data (nested categories or products).
+    """
+    saved_categories = {category["link"]: category for category in saved or []}
+
+    merged = []
+    changed = []
+    for category in parsed:
+        saved_category = saved_categories.get(category["link"])
+        if saved_category is None:
+            category = {"_id": ObjectId(), **category}
+            changed.append((category, True))
+        else:
+            amount_changed = saved_category.get("amount") != category["amount"]
+            is_changed = amount_changed or not is_parsed(saved_category)
+            category = {**saved_category, **category}
+            if full or is_changed:
+                changed.append((category, full))
+        merged.append(category)
+    return merged, changed
+
+
+def get_removed_categories(
+    merged: List[Dict], saved: Optional[List[Dict]]
+) -> List[Dict]:
+    """
+    Function to get saved categories which are missing in merged categories.
+
+    Nested categories of removed categories are removed too.
 
+    Args:
+    - merged (list of dicts) - merged categories.
+    - saved (list of dicts, optional) - saved categories.
     """
-    parsed_data = []
+    merged_ids = {category["_id"] for category in merged}
+    removed = []
+    for category in saved or []:
+        if category["_id"] not in merged_ids:
+            removed.append(category)
+            removed.extend(category.get("categories") or [])
+    return removed
+
+
+async def fetch_pages(
+    urls: List[str], counters: Dict[str, int], full: bool, conditional: bool = True
+) -> List[Tuple[HtmlPage, Dict]]:
+    """
+    Function to fetch pages with their saved fingerprints.
 
-    for category_name, url in MAIN_CATEGORIES_URL:
-        parent_category_id = ObjectId()
-        page = await get_html_text(url)
-        soup = BeautifulSoup(page, "html.parser")
+    Pages are fetched by conditional requests with saved ETag/Last-Modified,
+    text of not modified page is None. All pages are downloaded if `full` is set.
 
-        category_divs = soup.find_all(
-            "div", class_="x-tree-view-catalog-navigation__category"
+    Args:
+    - urls (list of str) - pages urls with pagination.
+    - counters (dict) - counters of run, fetched and skipped pages are added.
+    - full (bool) - whether saved fingerprints are ignored.
+    - conditional (bool, optional) - whether conditional requests are sent.
+    """
+    fingerprints = {} if full else await get_fingerprints(urls)
+
+    pages = await asyncio.gather(
+        *(
+            get_html_page(
+                url,
+                fingerprints.get(url, {}).get("etag") if conditional else None,
+                fingerprints.get(url, {}).get("last_modified") if conditional else None,
+            )
+            for url in urls
         )
+    )
+    for page in pages:
+        counters["fetched" if page.text is not None else "skipped"] += 1
 
-        subcategory_data = []
-        for category in category_divs:
-            elem = category.find("a", class_="x-link__label")
-            if elem:
-                name = elem.text.strip()
-                link = elem["href"]
-                slug = link.split("/")[-2]
-                count = category.find(
-                    "span", class_="x-tree-view-catalog-navigation__found"
-                ).text.strip()
-
-                subcategory_data.append(
-                    {
-                        "_id": ObjectId(),
-                        "name": name,
-                        "link": str(settings.LAMODA_URL_BASE) + link,
-                        "amount": count,
-                        "slug": slug,
-                    }
-                )
+    return [(page, fingerprints.get(page.url, {})) for page in pages]
+
+
+def new_counters() -> Dict[str, int]:
+    """
+    Function to create counters of pages processed by task.
+    """
+    return {"fetched": 0, "skipped": 0, "rewritten": 0}
+
+
+@task("lamoda.parse_all_categories")
+async def parse_all_categories(full: bool = False):
+    """
+    Function to parse main categories (men, women, kids).
+
+    By default parsing is incremental: saved categories are updated
+    and only new or changed categories are parsed further.
+    Products and fingerprints of subcategories removed from site are deleted.
+    If `full` is set all lamoda data is cleared and all pages are parsed.
 
-        parsed_data.append(
-            {
-                "_id": parent_category_id,
-                "category": category_name,
-                "link": url,
-                "categories": subcategory_data,
-            }
+    Args:
+    - full (bool, optional) - whether all pages are parsed.
+    """
+    if full:
+        await clear_categories_data()
+    run_id = await create_run(full)
+    counters = new_counters()
+
+    try:
+        pages = await fetch_pages(
+            [url for _, url in MAIN_CATEGORIES_URL], counters, full, conditional=False
+        )
+        pages_categories = await extract(
+            "parse_categories", [page.text for page, _ in pages]
         )
 
-    await insert_main_categories(parsed_data)
+        changed = []
+        for (category_name, url), (page, fingerprint), categories in zip(
+            MAIN_CATEGORIES_URL, pages, pages_categories
+        ):
+            saved = await get_main_category(category_name)
+            merged, category_changed = merge_categories(
+                categories,
+                saved and saved.get("categories"),
+                full,
+                lambda category: bool(category.get("categories")),
+            )
+            changed.extend(
+                (category_name, subcategory, subcategory_full)
+                for subcategory, subcategory_full in category_changed
+            )
+
+            items_hash = get_items_hash(categories)
+            if saved and not category_changed and fingerprint.get("hash") == items_hash:
+                counters["skipped"] += 1
+                continue
+
+            await save_main_category(
+                {
+                    "_id": saved["_id"] if saved else ObjectId(),
+                    "category": category_name,
+                    "link": url,
+                    "categories": merged,
+                }
+            )
+            await delete_subcategories_data(
+                get_removed_categories(merged, saved and saved.get("categories"))
+            )
+            await save_fingerprint(page, items_hash)
+            counters["rewritten"] += 1
 
-    for category in parsed_data:
-        for subcategory in category["categories"]:
-            await producer_send_one(parse_subcategory, subcategory)
+        await producer_send_many(
+            parse_subcategory,
+            [
+                (
+                    {
+                        "_id": subcategory["_id"],
+                        "link": subcategory["link"],
+                        "category": category_name,
+                        "subcategory_slug": subcategory["slug"],
+                        "run_id": run_id,
+                        "full": subcategory_full,
+                    },
+                )
+                for category_name, subcategory, subcategory_full in changed
+            ],
+            key=lambda data: data["_id"],
+        )
+    finally:
+        await update_run_counters(run_id, counters)
 
 
+@task("lamoda.parse_subcategory")
 async def parse_subcategory(data: dict):
     """
     Function to parse subcategory data.
 
-    Parses main subcategory data and create task to parse full data of subcategory.
-    """
-    page = await get_html_text(data["link"])
-    soup = BeautifulSoup(page, "html.parser")
-
-    ul = soup.find("ul", class_="x-tree-view-catalog-navigation__subtree")
-
-    subcategories = []
-    for li in ul.find_all("li"):
-        category = li.find("div", class_="x-tree-view-catalog-navigation__category")
-        a = category.find("a", class_="x-link x-link__label")
-
-        amount = category.find(
-            "span", class_="x-tree-view-catalog-navigation__found"
-        ).text.strip()
-        name = a.text
-        link = str(settings.LAMODA_URL_BASE) + a["href"]
-        slug = link.split("/")[-2]
-
-        subcategories.append(
-            {
-                "_id": ObjectId(),
-                "name": name,
-                "link": link,
-                "amount": amount,
-                "slug": slug,
-            }
+    Parses main subcategory data and create task to parse full data
+    of new or changed subcategories.
+    Products and fingerprints of subcategories removed from site are deleted.
+
+    Args:
+    - data (dict) - subcategory `_id`, `link`, `category` name and `subcategory_slug`,
+        `run_id` of parsing run and `full` flag whether all pages are parsed.
+    """
+    full = data.get("full", False)
+    counters = new_counters()
+
+    try:
+        [(page, fingerprint)] = await fetch_pages(
+            [data["link"]], counters, full, conditional=False
         )
+        [parsed_subcategories] = await extract("parse_subcategories", [page.text])
 
-    await update_category_by_id(data["_id"], "categories", subcategories)
+        saved = await get_category_by_id(data["_id"])
+        saved_subcategories = (saved and saved.get("categories")) or []
+        with_products = await get_subcategories_with_products(
+            [subcategory["_id"] for subcategory in saved_subcategories]
+        )
+        subcategories, changed = merge_categories(
+            parsed_subcategories,
+            saved_subcategories,
+            full,
+            lambda subcategory: subcategory["_id"] in with_products,
+        )
 
-    for subcategory in subcategories:
-        await producer_send_one(parse_marketplace_items, subcategory)
+        items_hash = get_items_hash(parsed_subcategories)
+        if changed or fingerprint.get("hash") != items_hash:
+            await update_category_by_id(data["_id"], "categories", subcategories)
+            await delete_subcategories_data(
+                get_removed_categories(subcategories, saved_subcategories)
+            )
+            await save_fingerprint(page, items_hash)
+            counters["rewritten"] += 1
+        else:
+            counters["skipped"] += 1
+
+        await producer_send_many(
+            parse_marketplace_items,
+            [
+                (
+                    {
+                        "_id": subcategory["_id"],
+                        "link": subcategory["link"],
+                        "amount": subcategory["amount"],
+                        "category": data.get("category"),
+                        "subcategory_slug": data.get("subcategory_slug"),
+                        "low_subcategory_slug": subcategory["slug"],
+                        "run_id": data.get("run_id"),
+                        "full": subcategory_full,
+                    },
+                )
+                for subcategory, subcategory_full in changed
+            ],
+            key=lambda data: data["_id"],
+        )
+    finally:
+        if data.get("run_id"):
+            await update_run_counters(data["run_id"], counters)
 
 
-async def parse_marketplace_items(subcategory: Dict):
+async def extract(method: str, pages: List[str]) -> List[List[Dict]]:
     """
-    Function to parse all products of specific subcategory.
+    Function to extract data from batch of html pages out of event loop.
+
+    Whole batch is parsed by one call in pool process,
+    parsed items are returned as plain dicts.
+
+    Args:
+    - method (str) - parser method (`parse_categories`, `parse_subcategories`
+        or `parse_products`).
+    - pages (list of str) - html pages.
     """
-    base_link = subcategory["link"]
+    return await run_in_process(
+        parse_pages, method, list(pages), settings.lamoda_html_parser
+    )
 
-    paginator = 1
-    while True:
-        page = await get_html_text(base_link, page=paginator)
-        soup = BeautifulSoup(page, "html.parser")
-        products_divs = soup.find_all("div", class_="x-product-card__card")
 
-        if not products_divs:
-            break
+def estimate_pages_count(amount: Optional[str]) -> int:
+    """
+    Function to estimate amount of subcategory pages by amount of its products.
 
-        paginator += 1
-        products = []
+    Returns 0 if amount is unknown.
+    """
+    digits = "".join(char for char in str(amount or "") if char.isdigit())
+    if not digits:
+        return 0
+    return math.ceil(int(digits) / settings.lamoda_page_size)
 
-        for product in products_divs:
-            data = {
-                "_id": ObjectId(),
-            }
 
-            link = product.find(
-                "a", class_="x-product-card__link x-product-card__hit-area"
-            )
-            if link:
-                data["link"] = str(settings.LAMODA_URL_BASE) + link["href"]
-                data["product_number"] = link["href"].split("/")[-3]
+@task("lamoda.parse_marketplace_items")
+async def parse_marketplace_items(subcategory: Dict):
+    """
+    Function to parse all products of specific subcategory.
 
-            product_name = product.find(
-                "div", class_="x-product-card-description__product-name"
-            )
-            if product_name:
-                data["product_name"] = product_name.text.strip()
+    Fetches pages by windows of `lamoda_pagination_window` concurrent requests
+    up to page count estimated by subcategory's amount of products,
+    then probes next pages one by one until an empty page.
+    Pages of each window are parsed by one call in process pool.
 
-            brand_name = product.find(
-                "div", class_="x-product-card-description__brand-name"
-            )
-            if product_name:
-                data["brand_name"] = brand_name.text.strip()
+    Not modified pages and pages with the same products are not rewritten,
+    products of pages after the last one are deleted.
 
-            single_price = product.find(
-                "span", class_="x-product-card-description__price-single"
+    Args:
+    - subcategory (dict) - subcategory `_id`, `link`, `amount` of products,
+        path (`category`, `subcategory_slug`, `low_subcategory_slug`),
+        `run_id` of parsing run and `full` flag whether all pages are rewritten.
+    """
+    base_link = subcategory["link"]
+    full = subcategory.get("full", False)
+    estimated_pages = estimate_pages_count(subcategory.get("amount"))
+    window = settings.lamoda_pagination_window
+    counters = new_counters()
+
+    try:
+        paginator = 1
+        while True:
+            if not estimated_pages:
+                size = window
+            elif paginator <= estimated_pages:
+                size = min(window, estimated_pages - paginator + 1)
+            else:
+                size = 1
+
+            pages = await fetch_pages(
+                [
+                    get_page_url(base_link, number)
+                    for number in range(paginator, paginator + size)
+                ],
+                counters,
+                full,
             )
-            if single_price:
-                data["single_price"] = single_price.text.strip().replace(" р.", "")
+            texts = [page.text for page, _ in pages if page.text is not None]
+            parsed = iter(await extract("parse_products", texts) if texts else [])
 
-            new_price = product.find(
-                "span", class_="x-product-card-description__price-new"
-            )
-            if new_price:
-                data["new_price"] = new_price.text.strip().replace(" р.", "")
+            for number, (page, fingerprint) in enumerate(pages, start=paginator):
+                if page.text is None:
+                    continue
 
-            old_price = product.find(
-                "span", class_="x-product-card-description__price-old"
-            )
-            if old_price:
-                data["old_price"] = old_price.text.strip().replace(" р.", "")
+                products = next(parsed)
+                if not products:
+                    await delete_product_items(subcategory["_id"], from_page=number)
+                    return
+
+                items_hash = get_items_hash(products)
+                if not full and fingerprint.get("hash") == items_hash:
+                    counters["skipped"] += 1
+                    continue
+
+                await insert_product_items(products, subcategory, page=number)
+                await save_fingerprint(page, items_hash)
+                counters["rewritten"] += 1
 
-            image = product.find("img", class_="x-product-card__pic-img")
-            if image:
-                data["image"] = "https:" + image["src"]
+            paginator += size
+    finally:
+        if subcategory.get("run_id"):
+            await update_run_counters(subcategory["run_id"], counters)
 
-            products.append(data)
 
-        await insert_product_items(products, subcategory_id=subcategory["_id"])
+@task("lamoda.reparse_from_cache")
+async def reparse_from_cache():
+    """
+    Function to parse products of all saved subcategories again from page cache.
+
+    Creates task to parse cached pages of every subcategory,
+    so changed extractors are applied without fetching pages.
+    """
+    if get_page_cache() is None:
+        raise ValueError("Page cache is disabled.")
+
+    run_id = await create_run(full=True, source="cache")
+    await producer_send_many(
+        reparse_subcategory_from_cache,
+        [
+            ({**subcategory, "run_id": run_id},)
+            for subcategory in await get_lowest_categories()
+        ],
+        key=lambda data: data["_id"],
+    )
+
+
+@task("lamoda.reparse_subcategory_from_cache")
+async def reparse_subcategory_from_cache(subcategory: Dict):
+    """
+    Function to parse products of specific subcategory from cached pages.
+
+    Reads cached pages one by one until page which isn't cached,
+    pages are parsed by windows of `lamoda_pagination_window` pages.
+    Page can be missing in cache because it was expired or evicted,
+    so products are deleted only from cached page without products.
+
+    Args:
+    - subcategory (dict) - subcategory `_id`, `link`, path (`category`,
+        `subcategory_slug`, `low_subcategory_slug`) and `run_id` of parsing run.
+    """
+    counters = new_counters()
+
+    try:
+        paginator = 1
+        while True:
+            pages = []
+            for number in range(
+                paginator, paginator + settings.lamoda_pagination_window
+            ):
+                page = await get_cached_page(get_page_url(subcategory["link"], number))
+                if page is None:
+                    break
+                pages.append(page)
+            if not pages:
+                return
+
+            counters["fetched"] += len(pages)
+            pages_products = await extract("parse_products", pages)
+
+            for number, products in enumerate(pages_products, start=paginator):
+                if not products:
+                    await delete_product_items(subcategory["_id"], from_page=number)
+                    return
+
+                await insert_product_items(products, subcategory, page=number)
+                counters["rewritten"] += 1
+
+            paginator += len(pages)
+            if len(pages) < settings.lamoda_pagination_window:
+                return
+    finally:
+        if subcategory.get("run_id"):
+            await update_run_counters(subcategory["run_id"], counters)
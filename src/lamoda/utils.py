@@ -1,53 +1,112 @@
+import hashlib
+import json
 from datetime import datetime
-from typing import Dict, List, Union
+from typing import Dict, List, NamedTuple, Optional
 import httpx
 
+from src.config import settings
+from src.lamoda.page_cache import cache_page, touch_cached_page
+from src.resources.http_client import PooledHttpClient
+from src.resources.limiter import get_host_limiter
 
-async def get_html_text(url, page=None):
+
+# HTTP client shared by all page fetches of process
+http_client = PooledHttpClient("lamoda")
+
+
+class HtmlPage(NamedTuple):
     """
-    Function to get html page of specific requests.
+    Fetched html page.
 
-    Includes pagination of page argument is specified.
+    Attributes:
+    - url (str) - page url with pagination.
+    - text (str, optional) - html of page, None if page is not modified.
+    - etag (str, optional) - ETag header of response.
+    - last_modified (str, optional) - Last-Modified header of response.
     """
-    async with httpx.AsyncClient() as client:
-        if page:
-            repsponse = await client.get(url + f"?page={page}")
-        else:
-            repsponse = await client.get(url)
-        repsponse.raise_for_status()
-        return repsponse.text
 
+    url: str
+    text: Optional[str]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
 
-async def add_current_time(data):
+
+def get_page_url(url: str, page: Optional[int] = None) -> str:
     """
-    Function to add current time (created_at) to instances
+    Function to add pagination to url if page is specified.
     """
-    current_time = datetime.now().isoformat()
-    if isinstance(data, list):
-        for item in data:
-            item["created_at"] = current_time
-    elif isinstance(data, dict):
-        data["created_at"] = current_time
+    if page:
+        url = url + f"?page={page}"
+    return url
+
+
+async def _get(url: str, headers: Optional[Dict] = None) -> httpx.Response:
+    """
+    Sends GET request by shared HTTP client.
+
+    Amount of concurrent requests to one host is limited by adaptive host limiter.
+    """
+    return await get_host_limiter(url).request(
+        lambda: http_client.request("GET", url, headers=headers)
+    )
 
-    return data
 
+async def get_html_page(
+    url: str, etag: Optional[str] = None, last_modified: Optional[str] = None
+) -> HtmlPage:
+    """
+    Function to get html page by conditional request.
+
+    Page text is None if server responds that page is not modified
+    since previous response with provided ETag or Last-Modified.
+    Fetched page is stored in page cache if it's enabled,
+    stored time of cached page is renewed if page is not modified.
+
+    Args:
+    - url (str) - page url with pagination.
+    - etag (str, optional) - ETag of previous response.
+    - last_modified (str, optional) - Last-Modified of previous response.
+    """
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    response = await _get(url, headers)
+    if response.status_code == 304:
+        await touch_cached_page(url)
+        return HtmlPage(url, None, etag, last_modified)
+
+    response.raise_for_status()
+    await cache_page(url, response.text)
+    return HtmlPage(
+        url,
+        response.text,
+        response.headers.get("etag"),
+        response.headers.get("last-modified"),
+    )
+
+
+def get_items_hash(items: List[Dict]) -> str:
+    """
+    Function to get fingerprint of parsed items.
 
-async def prepare_response_data(
-    data: Union[List[Dict], Dict]
-) -> Union[List[Dict], Dict]:
+    Items are compared by content, so changed markup around them doesn't change hash.
     """
-    Recursive function to prepare data before sending response.
+    data = json.dumps(items, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(data.encode()).hexdigest()
 
-    Replace ObjectId to str value.
+
+async def add_current_time(data):
     """
+    Function to add current time (created_at) to instances
+    """
+    current_time = datetime.now().isoformat()
     if isinstance(data, list):
         for item in data:
-            await prepare_response_data(item)
-
+            item["created_at"] = current_time
     elif isinstance(data, dict):
-        data["_id"] = str(data["_id"])
+        data["created_at"] = current_time
 
-        if data.get("categories"):
-            await prepare_response_data(data.get("categories"))
-        if data.get("products"):
-            await prepare_response_data(data.get("products"))
+    return data
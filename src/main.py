@@ -2,25 +2,24 @@ from fastapi_cache.backends.redis import RedisBackend
 from src.config import settings
 from fastapi_cache import FastAPICache
 from contextlib import asynccontextmanager
-from redis import asyncio as aioredis
 from fastapi import FastAPI
 import asyncio
 from contextlib import asynccontextmanager
 
-from src.resources.kafka import run_kafka
-from src.twitch.client import TwitchAPIClient
-
-
-twitch_client = TwitchAPIClient(
-    client_id=settings.twitch_client_id, client_secret=settings.twitch_client_secret
+from src.lamoda.utils import http_client as lamoda_http_client
+from src.resources.bulk_writer import close_bulk_writers
+from src.resources.indexes import ensure_indexes
+from src.resources.process_pool import shutdown_process_pool
+from src.resources.redis import redis
+from src.resources.queue import (
+    get_queue_backend,
+    run_consumer,
+    run_retry_consumer,
+    start_producer,
+    stop_producer,
 )
-
-
-async def get_twitch_client() -> TwitchAPIClient:
-    """
-    Twitch API client dependency for endpoints.
-    """
-    return twitch_client
+from src.routers.responses import MongoJSONCoder
+from src.twitch.client import http_client as twitch_http_client
 
 
 @asynccontextmanager
@@ -30,14 +29,37 @@ async def lifespan(app: FastAPI):
 
     - inits project config,
     - creates connections with databases,
+    - ensures indexes declared by repositories,
     - init caching,
-    - run kafka consumer,
+    - starts shared queue producer,
+    - runs queue consumers if queue backend is in-process,
+    - writes buffered Mongo writes on shutdown,
+    - flushes and stops queue producer on shutdown,
+    - closes shared HTTP clients of Lamoda and Twitch on shutdown,
+    - stops parsing process pool on shutdown.
+
+    With broker backend parsing tasks are consumed by separate worker processes (src.worker).
     """
-    redis = aioredis.from_url("redis://localhost")
-    FastAPICache.init(RedisBackend(redis), prefix="fastapi-cache")
-    asyncio.create_task(run_kafka())
+    FastAPICache.init(RedisBackend(redis), prefix="fastapi-cache", coder=MongoJSONCoder)
+    await ensure_indexes()
+    await start_producer()
+    consumers = []
+    if get_queue_backend().in_process:
+        consumers = [
+            asyncio.create_task(run_consumer()),
+            asyncio.create_task(run_retry_consumer()),
+        ]
     _check_config = settings
     yield
+    for consumer in consumers:
+        consumer.cancel()
+    # consumers are stopped before writers and producer are closed
+    await asyncio.gather(*consumers, return_exceptions=True)
+    await close_bulk_writers()
+    await stop_producer()
+    await lamoda_http_client.close()
+    await twitch_http_client.close()
+    shutdown_process_pool()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -0,0 +1,229 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import BulkWriteError
+
+from src.config import settings
+from src.resources.metrics import latency_percentiles
+
+
+class BulkWriter:
+    """
+    Buffer coalescing write requests of all tasks to one collection.
+
+    Requests (InsertOne, UpdateOne, DeleteMany etc.) are written by unordered
+    bulk writes when buffer has `batch_size` requests or `flush_interval`
+    after first buffered request.
+    Writer waits until its requests are written, so task is completed
+    only after its data is saved. Writer gets error of bulk write only
+    if its own requests failed, other requests of unordered batch are saved.
+    When collection has `max_pending` buffered and in-flight requests
+    new writers wait for free space.
+
+    Attributes:
+    - collection (AsyncIOMotorCollection) - collection requests are written to.
+    - batch_size (int) - max amount of requests in one bulk write.
+    - flush_interval (float) - seconds buffered requests wait for batch.
+    - max_pending (int) - max amount of buffered and in-flight requests.
+    """
+
+    def __init__(
+        self,
+        collection: AsyncIOMotorCollection,
+        batch_size: int,
+        flush_interval: float,
+        max_pending: int,
+    ):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._buffer: Deque[Tuple[Any, asyncio.Future, int]] = deque()
+        self._remaining: Dict[asyncio.Future, int] = {}
+        self._pending = 0
+        self._flusher: Optional[asyncio.Task] = None
+        self._latencies = deque(maxlen=1000)
+        self._counters = {"requests": 0, "batches": 0, "errors": 0, "waits": 0}
+
+    def _start(self):
+        if self._flusher is None or self._flusher.done():
+            self._space = asyncio.Condition()
+            self._flush_lock = asyncio.Lock()
+            self._has_requests = asyncio.Event()
+            self._batch_ready = asyncio.Event()
+            self._flusher = asyncio.create_task(self._run())
+
+    def _has_space(self, amount: int) -> bool:
+        return not self._pending or self._pending + amount <= self.max_pending
+
+    async def write(self, requests: List[Any]):
+        """
+        Buffers write requests and waits until they are written.
+
+        Args:
+        - requests (list) - pymongo write requests.
+        """
+        if not requests:
+            return
+
+        self._start()
+        future = asyncio.get_running_loop().create_future()
+        async with self._space:
+            if not self._has_space(len(requests)):
+                self._counters["waits"] += 1
+                await self._space.wait_for(lambda: self._has_space(len(requests)))
+            self._pending += len(requests)
+            self._remaining[future] = len(requests)
+            self._buffer.extend(
+                (request, future, position) for position, request in enumerate(requests)
+            )
+
+        self._has_requests.set()
+        if len(self._buffer) >= self.batch_size:
+            self._batch_ready.set()
+        await future
+
+    async def _run(self):
+        while True:
+            await self._has_requests.wait()
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            # started flush isn't interrupted by close
+            await asyncio.shield(self.flush())
+
+    async def flush(self):
+        """
+        Writes all buffered requests by batches of `batch_size`.
+        """
+        async with self._flush_lock:
+            while self._buffer:
+                amount = min(self.batch_size, len(self._buffer))
+                batch = [self._buffer.popleft() for _ in range(amount)]
+                await self._write_batch(batch)
+
+            self._has_requests.clear()
+            self._batch_ready.clear()
+
+    async def _write_batch(self, batch: List[Tuple[Any, asyncio.Future, int]]):
+        errors = {}
+        started_at = time.perf_counter()
+        try:
+            await self.collection.bulk_write(
+                [request for request, _, _ in batch], ordered=False
+            )
+        except Exception as exc:
+            # error is raised only in writers of failed requests
+            errors = self._writers_errors(batch, exc)
+            self._counters["errors"] += 1
+        self._latencies.append((time.perf_counter() - started_at) * 1000)
+        self._counters["batches"] += 1
+        self._counters["requests"] += len(batch)
+
+        for _, future, _ in batch:
+            self._remaining[future] -= 1
+            if future in errors and not future.done():
+                future.set_exception(errors[future])
+            if not self._remaining[future]:
+                del self._remaining[future]
+                if not future.done():
+                    future.set_result(None)
+
+        async with self._space:
+            self._pending -= len(batch)
+            self._space.notify_all()
+
+    @staticmethod
+    def _writers_errors(
+        batch: List[Tuple[Any, asyncio.Future, int]], error: Exception
+    ) -> Dict[asyncio.Future, Exception]:
+        """
+        Returns errors of writers whose requests failed.
+
+        Write errors of bulk write are mapped back to writers by index of request,
+        each writer gets BulkWriteError with only its errors and indexes
+        of its own requests. Other errors are raised in all writers of batch.
+        """
+        write_errors = []
+        if isinstance(error, BulkWriteError):
+            write_errors = error.details.get("writeErrors") or []
+        if not write_errors:
+            return {future: error for _, future, _ in batch}
+
+        writers_errors: Dict[asyncio.Future, List[Dict]] = {}
+        for write_error in write_errors:
+            _, future, position = batch[write_error["index"]]
+            writers_errors.setdefault(future, []).append(
+                {**write_error, "index": position}
+            )
+        return {
+            future: BulkWriteError({**error.details, "writeErrors": future_errors})
+            for future, future_errors in writers_errors.items()
+        }
+
+    async def close(self):
+        """
+        Writes buffered requests and stops flushing by time.
+        """
+        if self._flusher is None:
+            return
+
+        self._flusher.cancel()
+        try:
+            await self._flusher
+        except asyncio.CancelledError:
+            pass
+        await self.flush()
+        self._flusher = None
+
+    def stats(self) -> Dict:
+        """
+        Returns amount of buffered and in-flight requests, written requests,
+        bulk writes, failed bulk writes and waits for free space,
+        and bulk write latency percentiles in ms.
+        """
+        return {
+            "pending": self._pending,
+            **self._counters,
+            "latency_ms": latency_percentiles(self._latencies),
+        }
+
+
+_writers: Dict[str, BulkWriter] = {}
+
+
+def get_bulk_writer(collection: AsyncIOMotorCollection) -> BulkWriter:
+    """
+    Function to get writer shared by all tasks writing to collection.
+
+    Writer is created on first write with `bulk_writer_*` settings.
+    """
+    name = collection.full_name
+    if name not in _writers:
+        _writers[name] = BulkWriter(
+            collection,
+            batch_size=settings.bulk_writer_batch_size,
+            flush_interval=settings.bulk_writer_flush_interval,
+            max_pending=settings.bulk_writer_max_pending,
+        )
+    return _writers[name]
+
+
+async def close_bulk_writers():
+    """
+    Function to write buffered requests of all collections on shutdown.
+    """
+    for writer in list(_writers.values()):
+        await writer.close()
+    _writers.clear()
+
+
+def get_bulk_writers_stats() -> Dict[str, Dict]:
+    """
+    Function to get statistics of writers by collection.
+    """
+    return {name: writer.stats() for name, writer in _writers.items()}
@@ -0,0 +1,107 @@
+from typing import Dict, Optional
+import httpx
+
+from src.config import settings
+
+
+class PooledHttpClient:
+    """
+    HTTP client shared by all requests of service in process.
+
+    Client with connection pool is created on first request from settings
+    of service named by `prefix` (e.g. `lamoda_http2`, `lamoda_http_max_connections`)
+    and closed by application/worker lifespan.
+    New connections and TLS handshakes are counted by trace of connection pool
+    to check connections reuse rate.
+
+    Attributes:
+    - prefix (str) - prefix of service settings, e.g. `lamoda` or `twitch`.
+    - transport (httpx.AsyncBaseTransport, optional) - transport of client
+        instead of connection pool, e.g. mock transport of tests.
+    """
+
+    def __init__(
+        self, prefix: str, transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.prefix = prefix
+        self.transport = transport
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._counters = {
+            "requests": 0,
+            "connections": 0,
+            "tls_handshakes": 0,
+            "retries": 0,
+        }
+
+    def _setting(self, name: str, default=None):
+        return getattr(settings, f"{self.prefix}_{name}", default)
+
+    def get_client(self) -> httpx.AsyncClient:
+        """
+        Returns shared client, client is created on first call.
+
+        Responses compressed with gzip/brotli are decoded transparently.
+        Write and pool timeouts are equal to read timeout
+        unless service has its own settings of them.
+        """
+        if self._client is None:
+            read_timeout = self._setting("http_read_timeout")
+            self._client = httpx.AsyncClient(
+                http2=self._setting("http2"),
+                limits=httpx.Limits(
+                    max_connections=self._setting("http_max_connections"),
+                    max_keepalive_connections=self._setting("http_max_keepalive"),
+                    keepalive_expiry=self._setting("http_keepalive_expiry"),
+                ),
+                timeout=httpx.Timeout(
+                    connect=self._setting("http_connect_timeout"),
+                    read=read_timeout,
+                    write=self._setting("http_write_timeout", read_timeout),
+                    pool=self._setting("http_pool_timeout", read_timeout),
+                ),
+                transport=self.transport,
+            )
+        return self._client
+
+    async def close(self):
+        """
+        Closes shared client and its connections.
+        """
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _trace_connections(self, event_name: str, info: dict):
+        """
+        Counts new connections and TLS handshakes made by connection pool.
+        """
+        if event_name == "connection.connect_tcp.complete":
+            self._counters["connections"] += 1
+        elif event_name == "connection.start_tls.complete":
+            self._counters["tls_handshakes"] += 1
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Sends request by shared client.
+        """
+        self._counters["requests"] += 1
+        return await self.get_client().request(
+            method, url, extensions={"trace": self._trace_connections}, **kwargs
+        )
+
+    def count_retry(self):
+        """
+        Counts retry of failed request.
+        """
+        self._counters["retries"] += 1
+
+    def stats(self) -> Dict:
+        """
+        Returns amount of requests, new connections, TLS handshakes, retries
+        and connections reuse rate.
+        """
+        stats = dict(self._counters)
+        if stats["requests"]:
+            stats["reuse_rate"] = round(1 - stats["connections"] / stats["requests"], 3)
+        return stats
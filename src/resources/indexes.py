@@ -0,0 +1,64 @@
+from typing import Dict, List, Tuple
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import IndexModel
+from pymongo.errors import PyMongoError
+
+from src.lamoda import repository as lamoda_repository
+from src.twitch.repository import (
+    categories_repository,
+    streams_repository,
+    users_repository,
+)
+
+
+# Repository modules which declare indexes of their collections in `INDEXES`
+REPOSITORIES = [
+    users_repository,
+    streams_repository,
+    categories_repository,
+    lamoda_repository,
+]
+
+
+def get_declared_indexes() -> List[Tuple[AsyncIOMotorCollection, List[IndexModel]]]:
+    """
+    Function to get collections with indexes declared by all repositories.
+    """
+    return [declared for repository in REPOSITORIES for declared in repository.INDEXES]
+
+
+async def ensure_indexes() -> Dict[str, Dict]:
+    """
+    Function to create declared indexes which don't exist yet.
+
+    Creating existing index is no-op, so function is called on every startup.
+    Error of one collection (e.g. index with same name but other options)
+    is printed and doesn't stop creation of other indexes.
+
+    Returns names of ensured indexes or error by collection.
+    """
+    result = {}
+    for collection, indexes in get_declared_indexes():
+        try:
+            names = await collection.create_indexes(indexes)
+            result[collection.name] = {"indexes": names}
+        except PyMongoError as exc:
+            print(f"Indexes of '{collection.name}' aren't created: {exc}")
+            result[collection.name] = {"error": str(exc)}
+    return result
+
+
+async def get_indexes_info() -> Dict[str, Dict]:
+    """
+    Function to get declared, existing and missing indexes by collection.
+    """
+    result = {}
+    for collection, indexes in get_declared_indexes():
+        declared = [model.document["name"] for model in indexes]
+        existing = [item["name"] async for item in collection.list_indexes()]
+        result[collection.name] = {
+            "declared": declared,
+            "existing": existing,
+            "missing": [name for name in declared if name not in existing],
+        }
+    return result
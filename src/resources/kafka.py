@@ -1,64 +1,379 @@
 import asyncio
+import heapq
+import itertools
+import time
+from typing import Dict, List, Optional, Set, Tuple
 import aiokafka
-import pickle
+from aiokafka.errors import CommitFailedError, IllegalStateError
+from aiokafka.structs import TopicPartition
 
 from src.config import settings
+from src.resources.queue import QueueBackend
 
 
-async def run_kafka():
+class PausingRebalanceListener(aiokafka.ConsumerRebalanceListener):
     """
-    Kafka consumer handler.
+    Pauses partitions assigned after rebalance while fetching is paused,
+    so new partitions don't fill full pool of tasks.
 
-    Parses function with its args from message and execute it.
+    Attributes:
+    - consumer (AIOKafkaConsumer) - consumer of partitions.
+    - paused (bool) - fetching is paused.
     """
 
-    consumer = aiokafka.AIOKafkaConsumer(
-        "parsing-topic", bootstrap_servers=settings.kafka_bootstrap_servers
-    )
-    await consumer.start()
-    try:
-        async for msg in consumer:
-            message_data = pickle.loads(msg.value)
+    def __init__(self, consumer: aiokafka.AIOKafkaConsumer):
+        self.consumer = consumer
+        self.paused = False
 
-            function = message_data["function"]
-            args = message_data["args"]
-            kwargs = message_data["kwargs"]
+    def pause(self):
+        self.consumer.pause(*self.consumer.assignment())
+        self.paused = True
 
-            if asyncio.iscoroutinefunction(function):
+    def resume(self):
+        self.consumer.resume(*self.consumer.assignment())
+        self.paused = False
+
+    async def on_partitions_revoked(self, revoked):
+        pass
+
+    async def on_partitions_assigned(self, assigned):
+        if self.paused:
+            self.consumer.pause(*assigned)
+
+
+class OffsetTracker:
+    """
+    Tracks in-flight messages to commit offsets only of completed tasks.
+
+    Committed offset of partition never passes its earliest unfinished message,
+    so tasks that haven't completed are redelivered after restart or rebalance.
+    """
+
+    def __init__(self):
+        self._pending: Dict[TopicPartition, Set[int]] = {}
+        self._next: Dict[TopicPartition, int] = {}
+        self._committed: Dict[TopicPartition, int] = {}
+
+    def track(self, tp: TopicPartition, offset: int):
+        """
+        Registers message which execution started.
+        """
+        self._pending.setdefault(tp, set()).add(offset)
+        self._next[tp] = max(self._next.get(tp, 0), offset + 1)
+
+    def complete(self, tp: TopicPartition, offset: int):
+        """
+        Registers message which execution finished.
+        """
+        self._pending.get(tp, set()).discard(offset)
+
+    def committable(self) -> Dict[TopicPartition, int]:
+        """
+        Returns offsets of partitions which can be committed since last call.
+        """
+        offsets = {}
+        for tp, next_offset in self._next.items():
+            pending = self._pending.get(tp)
+            offset = min(pending) if pending else next_offset
+            if self._committed.get(tp) != offset:
+                offsets[tp] = offset
+        self._committed.update(offsets)
+        return offsets
+
+
+async def _commit(consumer: aiokafka.AIOKafkaConsumer, offsets: Dict):
+    """
+    Commits offsets of consumed messages.
+    """
+    if offsets:
+        try:
+            await consumer.commit(offsets)
+        except (CommitFailedError, IllegalStateError) as e:
+            print(f"Kafka commit failed: {e}")
+
+
+class KafkaQueueBackend(QueueBackend):
+    """
+    Queue backend on Kafka broker.
+
+    Uses one shared producer per process and consumer groups,
+    so tasks are distributed between all worker processes.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._producer: Optional[aiokafka.AIOKafkaProducer] = None
+        self._producer_lock = asyncio.Lock()
+
+    async def start(self) -> aiokafka.AIOKafkaProducer:
+        """
+        Starts shared Kafka producer.
+
+        Producer is created once per process and reused by every send.
+        """
+        async with self._producer_lock:
+            if self._producer is None:
+                producer = aiokafka.AIOKafkaProducer(
+                    bootstrap_servers=settings.kafka_bootstrap_servers,
+                    linger_ms=settings.kafka_linger_ms,
+                    max_batch_size=settings.kafka_max_batch_size,
+                    compression_type=settings.kafka_compression_type,
+                )
+                await producer.start()
+                self._producer = producer
+        return self._producer
+
+    async def stop(self):
+        """
+        Flushes pending messages and stops shared Kafka producer.
+        """
+        async with self._producer_lock:
+            if self._producer is not None:
                 try:
-                    await function(*args, **kwargs)
-                except Exception as e:
-                    print(
-                        f"function: {function}, args: {args}, kwargs: {kwargs}, error: {e}"
+                    await self._producer.flush()
+                finally:
+                    await self._producer.stop()
+                    self._producer = None
+
+    def _track_send(self, future: asyncio.Future, started_at: float):
+        if future.cancelled():
+            self._record_send(started_at, asyncio.CancelledError())
+        else:
+            self._record_send(started_at, future.exception())
+
+    async def _send(self, topic: str, message: bytes, key: bytes = None):
+        producer = await self.start()
+
+        started_at = time.perf_counter()
+        future = await producer.send(topic, message, key=key)
+        future.add_done_callback(lambda f: self._track_send(f, started_at))
+        return future
+
+    async def send(
+        self, topic: str, message: bytes, key: bytes = None, wait: bool = False
+    ):
+        """
+        Appends message to producer's batch.
+
+        Waits for broker acknowledgement only if `wait` is set.
+        """
+        future = await self._send(topic, message, key)
+        if wait:
+            await future
+
+    async def send_many(self, topic: str, messages: List[Tuple[bytes, bytes]]):
+        """
+        Appends all messages to producer's batches without waiting for each other,
+        then waits until the whole batch is acknowledged by broker.
+        """
+        futures = [await self._send(topic, message, key) for message, key in messages]
+        if futures:
+            await asyncio.gather(*futures)
+
+    async def consume(self, concurrency: int):
+        """
+        Kafka consumer handler.
+
+        Dispatches messages to pool of concurrent tasks. Fetching of partitions
+        is paused while pool is full, offsets are committed after tasks completion.
+        Tasks of same partition are executed in order if `kafka_ordered_partitions` is set.
+        """
+        consumer = aiokafka.AIOKafkaConsumer(
+            bootstrap_servers=settings.kafka_bootstrap_servers,
+            group_id=settings.kafka_group_id,
+            enable_auto_commit=False,
+        )
+        listener = PausingRebalanceListener(consumer)
+        consumer.subscribe([settings.kafka_topic], listener=listener)
+        tracker = OffsetTracker()
+        running: Set[asyncio.Task] = set()
+        partition_tails: Dict[TopicPartition, asyncio.Task] = {}
+
+        async def process(msg, previous: Optional[asyncio.Task]):
+            tp = TopicPartition(msg.topic, msg.partition)
+            try:
+                if previous:
+                    await asyncio.wait([previous])
+                await self.execute_message(msg.value, msg.key)
+            finally:
+                tracker.complete(tp, msg.offset)
+                if partition_tails.get(tp) is asyncio.current_task():
+                    del partition_tails[tp]
+
+        def dispatch(batches):
+            for tp, messages in batches.items():
+                for msg in messages:
+                    tracker.track(tp, msg.offset)
+                    previous = partition_tails.get(tp)
+                    if not settings.kafka_ordered_partitions:
+                        previous = None
+                    task = asyncio.create_task(process(msg, previous))
+                    partition_tails[tp] = task
+                    running.add(task)
+                    task.add_done_callback(running.discard)
+
+        await consumer.start()
+        try:
+            while True:
+                free_slots = concurrency - len(running)
+
+                if free_slots <= 0:
+                    if not listener.paused:
+                        listener.pause()
+                    await asyncio.wait(
+                        running, timeout=1, return_when=asyncio.FIRST_COMPLETED
                     )
+                    # keeps consumer alive in group while fetching is paused,
+                    # paused partitions return nothing, so only one record can pass
+                    dispatch(await consumer.getmany(timeout_ms=0, max_records=1))
+                else:
+                    if listener.paused:
+                        listener.resume()
+                    dispatch(
+                        await consumer.getmany(timeout_ms=500, max_records=free_slots)
+                    )
+
+                await _commit(consumer, tracker.committable())
+
+        finally:
+            if running:
+                await asyncio.wait(running)
+            await _commit(consumer, tracker.committable())
+            await consumer.stop()
 
+    async def consume_retries(self):
+        """
+        Kafka consumer of retry topic.
+
+        Holds failed tasks in heap ordered by their due time and sends them back
+        to parsing topic after their backoff delay, so task with short delay
+        doesn't wait for task with longer delay of the same partition.
+        Offsets are committed up to the earliest task which isn't sent yet.
+        Fetching is paused while `kafka_retry_max_waiting` tasks are waiting.
+        """
+        consumer = aiokafka.AIOKafkaConsumer(
+            settings.kafka_retry_topic,
+            bootstrap_servers=settings.kafka_bootstrap_servers,
+            group_id=f"{settings.kafka_group_id}-retry",
+            enable_auto_commit=False,
+        )
+        tracker = OffsetTracker()
+        waiting: List[Tuple[float, int, TopicPartition, aiokafka.ConsumerRecord]] = []
+        counter = itertools.count()
+
+        await consumer.start()
+        try:
+            while True:
+                timeout = 1.0
+                if waiting:
+                    timeout = min(timeout, max(0.0, waiting[0][0] - time.time()))
+
+                if len(waiting) >= settings.kafka_retry_max_waiting:
+                    consumer.pause(*consumer.assignment())
+                    await asyncio.sleep(timeout)
+                else:
+                    consumer.resume(*consumer.assignment())
+                    batches = await consumer.getmany(timeout_ms=int(timeout * 1000))
+                    for tp, messages in batches.items():
+                        for msg in messages:
+                            tracker.track(tp, msg.offset)
+                            heapq.heappush(
+                                waiting,
+                                (self._due_time(msg.value), next(counter), tp, msg),
+                            )
+
+                now = time.time()
+                while waiting and waiting[0][0] <= now:
+                    _, _, tp, msg = heapq.heappop(waiting)
+                    await self.send(settings.kafka_topic, msg.value, msg.key, wait=True)
+                    tracker.complete(tp, msg.offset)
+
+                await _commit(consumer, tracker.committable())
+        finally:
+            await consumer.stop()
+
+    def _dead_letters_consumer(self) -> aiokafka.AIOKafkaConsumer:
+        return aiokafka.AIOKafkaConsumer(
+            bootstrap_servers=settings.kafka_bootstrap_servers,
+            group_id=f"{settings.kafka_group_id}-dead-letters",
+            enable_auto_commit=False,
+            auto_offset_reset="earliest",
+        )
+
+    async def _read_dead_letters(
+        self, consumer: aiokafka.AIOKafkaConsumer, limit: Optional[int] = None
+    ) -> List[aiokafka.ConsumerRecord]:
+        """
+        Reads dead-letter messages after offsets committed by last replay.
+        """
+        await consumer.topics()
+        topic = settings.kafka_dead_letter_topic
+        tps = [
+            TopicPartition(topic, p) for p in consumer.partitions_for_topic(topic) or []
+        ]
+        if not tps:
+            return []
+
+        consumer.assign(tps)
+        end_offsets = await consumer.end_offsets(tps)
+        for tp in tps:
+            committed = await consumer.committed(tp)
+            if committed is None:
+                await consumer.seek_to_beginning(tp)
             else:
-                function(*args, **kwargs)
+                consumer.seek(tp, committed)
 
-    finally:
-        await consumer.stop()
+        records = []
+        while limit is None or len(records) < limit:
+            remaining = [
+                tp for tp in tps if await consumer.position(tp) < end_offsets[tp]
+            ]
+            if not remaining:
+                break
+            batches = await consumer.getmany(*remaining, timeout_ms=1000)
+            for messages in batches.values():
+                records.extend(messages)
 
+        return records[:limit] if limit else records
 
-async def producer_send_one(function, *args, **kwargs):
-    """
-    Function to send message by Kafka producer.
+    async def get_dead_letters(self, limit: int) -> List[Dict]:
+        """
+        Returns tasks from dead-letter topic which haven't been replayed yet.
+        """
+        consumer = self._dead_letters_consumer()
+        await consumer.start()
+        try:
+            records = await self._read_dead_letters(consumer, limit)
+        finally:
+            await consumer.stop()
 
-    Send function with args as message to kafka broker.
-    """
+        return [
+            self._dead_letter_data(
+                record.value, record.partition, record.offset, record.timestamp
+            )
+            for record in records
+        ]
+
+    async def replay_dead_letters(self) -> int:
+        """
+        Sends tasks from dead-letter topic back to parsing topic
+        and commits offsets of replayed messages.
+        """
+        consumer = self._dead_letters_consumer()
+        await consumer.start()
+        try:
+            records = await self._read_dead_letters(consumer)
+
+            messages = []
+            offsets = {}
+            for record in records:
+                messages.append((self._replayed_message(record.value), record.key))
+                tp = TopicPartition(record.topic, record.partition)
+                offsets[tp] = max(offsets.get(tp, 0), record.offset + 1)
+
+            await self.send_many(settings.kafka_topic, messages)
+            await _commit(consumer, offsets)
+        finally:
+            await consumer.stop()
 
-    producer = aiokafka.AIOKafkaProducer(
-        bootstrap_servers=settings.kafka_bootstrap_servers
-    )
-
-    message_data = {
-        "function": function,
-        "args": args,
-        "kwargs": kwargs,
-    }
-    message = pickle.dumps(message_data)
-
-    await producer.start()
-    try:
-        await producer.send_and_wait("parsing-topic", message)
-    finally:
-        await producer.stop()
+        return len(records)
@@ -0,0 +1,173 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict
+from urllib.parse import urlsplit
+import httpx
+
+from src.config import settings
+from src.resources.metrics import latency_percentiles
+
+
+# Errors which mean that host is overloaded
+OVERLOAD_ERRORS = (httpx.TimeoutException, httpx.NetworkError)
+
+
+def is_throttled(status_code: int) -> bool:
+    """
+    Function to check whether response status means that host is overloaded.
+    """
+    return status_code == 429 or status_code >= 500
+
+
+class AdaptiveLimiter:
+    """
+    Limiter of concurrent requests to one host with AIMD window.
+
+    Window grows additively (by one request per window of successful requests)
+    and is cut multiplicatively on 429/5xx responses, timeouts, network errors
+    and responses slower than `max_latency`.
+    Window is cut at most once per median latency,
+    so burst of failed in-flight requests counts as one backoff.
+
+    Attributes:
+    - limit (float) - current window, amount of concurrent requests.
+    - min_limit (int) - min window.
+    - max_limit (int) - max window.
+    - backoff_ratio (float) - multiplier of window on backoff.
+    - max_latency (float) - seconds, slower responses cause backoff.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        backoff_ratio: float,
+        max_latency: float,
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.max_latency = max_latency
+
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_backoff = 0.0
+        self._latencies = deque(maxlen=1000)
+        self._counters = {"requests": 0, "throttled": 0, "errors": 0, "backoffs": 0}
+
+    async def request(
+        self, send: Callable[[], Awaitable[httpx.Response]]
+    ) -> httpx.Response:
+        """
+        Sends request when window has free slot and adjusts window by its result.
+
+        Args:
+        - send (callable) - function without args which sends request.
+        """
+        await self._acquire()
+        started_at = time.perf_counter()
+        try:
+            response = await send()
+        except OVERLOAD_ERRORS:
+            self._counters["errors"] += 1
+            self._backoff()
+            raise
+        finally:
+            self._release()
+
+        self._record(response.status_code, time.perf_counter() - started_at)
+        return response
+
+    async def _acquire(self):
+        if not self._waiters and self._in_flight < int(self.limit):
+            self._in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # slot was given to waiter right before cancellation
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+
+    def _release(self):
+        self._in_flight -= 1
+        self._wake_up()
+
+    def _wake_up(self):
+        while self._waiters and self._in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._in_flight += 1
+
+    def _record(self, status_code: int, latency: float):
+        self._counters["requests"] += 1
+        self._latencies.append(latency * 1000)
+
+        if is_throttled(status_code):
+            self._counters["throttled"] += 1
+            self._backoff()
+        elif latency > self.max_latency:
+            self._backoff()
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._wake_up()
+
+    def _backoff(self):
+        now = time.monotonic()
+        median_latency = latency_percentiles(self._latencies).get("p50", 0) / 1000
+        if now - self._last_backoff < median_latency:
+            return
+
+        self._last_backoff = now
+        self._counters["backoffs"] += 1
+        self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+
+    def stats(self) -> Dict:
+        """
+        Returns current window, in-flight and waiting requests,
+        amount of requests, throttled responses, errors and backoffs,
+        and latency percentiles in ms.
+        """
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self._in_flight,
+            "waiting": len(self._waiters),
+            **self._counters,
+            "latency_ms": latency_percentiles(self._latencies),
+        }
+
+
+_limiters: Dict[str, AdaptiveLimiter] = {}
+
+
+def get_host_limiter(url: str) -> AdaptiveLimiter:
+    """
+    Function to get limiter shared by all requests to host of url.
+
+    Limiter is created on first request to host with `host_limiter_*` settings.
+    """
+    host = urlsplit(url).netloc
+    if host not in _limiters:
+        _limiters[host] = AdaptiveLimiter(
+            initial_limit=settings.host_limiter_initial_limit,
+            min_limit=settings.host_limiter_min_limit,
+            max_limit=settings.host_limiter_max_limit,
+            backoff_ratio=settings.host_limiter_backoff_ratio,
+            max_latency=settings.host_limiter_max_latency,
+        )
+    return _limiters[host]
+
+
+def get_limiters_stats() -> Dict[str, Dict]:
+    """
+    Function to get statistics of limiters by host.
+    """
+    return {host: limiter.stats() for host, limiter in _limiters.items()}
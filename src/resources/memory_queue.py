@@ -0,0 +1,136 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Dict, List, Tuple
+
+from src.config import settings
+from src.resources.queue import QueueBackend
+
+
+class MemoryQueueBackend(QueueBackend):
+    """
+    In-process queue backend on asyncio queues.
+
+    Messages live in memory of current process, so consumers run
+    in the same process as producers (API lifespan starts them).
+    Used for single-node deployments and benchmarks without broker.
+    Queued tasks are lost on process restart.
+    """
+
+    in_process = True
+
+    def __init__(self):
+        super().__init__()
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._dead_letters: List[Tuple[bytes, bytes, int]] = []
+        self._replayed_count = 0
+
+    def _queue(self, topic: str) -> asyncio.Queue:
+        if topic not in self._queues:
+            self._queues[topic] = asyncio.Queue()
+        return self._queues[topic]
+
+    async def start(self):
+        """
+        Nothing to start, queues are created on first use.
+        """
+
+    async def stop(self):
+        """
+        Nothing to flush, messages are delivered on send.
+        """
+
+    async def send(
+        self, topic: str, message: bytes, key: bytes = None, wait: bool = False
+    ):
+        """
+        Puts message to topic's queue.
+        """
+        started_at = time.perf_counter()
+        if topic == settings.kafka_dead_letter_topic:
+            self._dead_letters.append((message, key, int(time.time() * 1000)))
+        else:
+            await self._queue(topic).put((message, key))
+        self._record_send(started_at)
+
+    async def send_many(self, topic: str, messages: List[Tuple[bytes, bytes]]):
+        """
+        Puts all messages to topic's queue.
+        """
+        for message, key in messages:
+            await self.send(topic, message, key)
+
+    async def consume(self, concurrency: int):
+        """
+        Executes tasks from parsing queue by pool of concurrent tasks.
+
+        Next message is taken from queue only when pool has free slot.
+        """
+        queue = self._queue(settings.kafka_topic)
+        slots = asyncio.Semaphore(concurrency)
+        running = set()
+
+        async def process(message: bytes, key: bytes):
+            try:
+                await self.execute_message(message, key)
+            finally:
+                slots.release()
+                queue.task_done()
+
+        try:
+            while True:
+                await slots.acquire()
+                message, key = await queue.get()
+                task = asyncio.create_task(process(message, key))
+                running.add(task)
+                task.add_done_callback(running.discard)
+        finally:
+            if running:
+                await asyncio.wait(running)
+
+    async def consume_retries(self):
+        """
+        Holds failed tasks in heap ordered by their due time
+        and puts them back to parsing queue after their delay.
+        """
+        queue = self._queue(settings.kafka_retry_topic)
+        waiting = []
+        counter = itertools.count()
+
+        while True:
+            timeout = max(0, waiting[0][0] - time.time()) if waiting else None
+            try:
+                message, key = await asyncio.wait_for(queue.get(), timeout)
+                heapq.heappush(
+                    waiting, (self._due_time(message), next(counter), message, key)
+                )
+            except asyncio.TimeoutError:
+                pass
+
+            now = time.time()
+            while waiting and waiting[0][0] <= now:
+                _, _, message, key = heapq.heappop(waiting)
+                await self.send(settings.kafka_topic, message, key)
+
+    async def get_dead_letters(self, limit: int) -> List[Dict]:
+        """
+        Returns tasks from dead-letter list which haven't been replayed yet.
+        """
+        return [
+            self._dead_letter_data(message, 0, self._replayed_count + i, failed_at)
+            for i, (message, key, failed_at) in enumerate(self._dead_letters[:limit])
+        ]
+
+    async def replay_dead_letters(self) -> int:
+        """
+        Sends all tasks from dead-letter list back to parsing queue.
+        """
+        dead_letters, self._dead_letters = self._dead_letters, []
+        self._replayed_count += len(dead_letters)
+
+        messages = [
+            (self._replayed_message(message), key) for message, key, _ in dead_letters
+        ]
+        await self.send_many(settings.kafka_topic, messages)
+        return len(dead_letters)
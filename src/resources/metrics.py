@@ -0,0 +1,17 @@
+from typing import Dict, Iterable
+
+
+def latency_percentiles(latencies: Iterable[float]) -> Dict[str, float]:
+    """
+    Function to get p50, p95, p99 and max of latencies in ms.
+
+    Returns empty dict if there are no latencies.
+    """
+    latencies = sorted(latencies)
+    percentiles = {}
+    if latencies:
+        for name, percentile in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+            index = min(len(latencies) - 1, int(len(latencies) * percentile))
+            percentiles[name] = round(latencies[index], 3)
+        percentiles["max"] = round(latencies[-1], 3)
+    return percentiles
@@ -1,4 +1,7 @@
-from motor.motor_asyncio import AsyncIOMotorClient
+from typing import Dict, List, Optional, Tuple, Union
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+from pymongo import ASCENDING, IndexModel
 from src.config import settings
 
 
@@ -11,3 +14,56 @@ db_twitch = db.twitch_collection
 
 # MongoDB collection for Lamoda parser instances
 db_lamoda = db.lamoda
+
+# MongoDB collection for Lamoda products
+db_lamoda_products = db.lamoda_products
+
+# MongoDB collection for fingerprints of parsed Lamoda pages
+db_lamoda_fingerprints = db.lamoda_fingerprints
+
+# MongoDB collection for summaries of Lamoda parsing runs
+db_lamoda_runs = db.lamoda_runs
+
+
+def index(*fields: Union[str, Tuple[str, int]], **options) -> IndexModel:
+    """
+    Function to declare index of collection.
+
+    Indexes are built in background, so startup doesn't block collection.
+
+    Args:
+    - fields (str or tuple) - indexed fields, field name is ascending,
+        tuple is field name with direction.
+    - options - index options (`unique`, `name` etc.).
+    """
+    keys = [(field, ASCENDING) if isinstance(field, str) else field for field in fields]
+    return IndexModel(keys, background=True, **options)
+
+
+async def find_page(
+    collection: AsyncIOMotorCollection,
+    query: Dict,
+    after: Optional[ObjectId],
+    limit: int,
+) -> Tuple[List[Dict], Optional[ObjectId]]:
+    """
+    Function to get page of documents ordered by `_id` (keyset pagination).
+
+    Page starts right after document `after`, so its cost doesn't depend
+    on page number, unlike skip. Returns documents and `_id` to start
+    next page with, or None if it's the last page.
+
+    Args:
+    - collection (AsyncIOMotorCollection) - collection to read.
+    - query (dict) - filter of documents.
+    - after (ObjectId, optional) - `_id` of last document of previous page.
+    - limit (int) - max amount of documents.
+    """
+    if after:
+        query = {**query, "_id": {"$gt": after}}
+    cursor = collection.find(query).sort("_id", ASCENDING).limit(limit + 1)
+    items = await cursor.to_list(length=limit + 1)
+
+    if len(items) > limit:
+        return items[:limit], items[limit - 1]["_id"]
+    return items, None
@@ -0,0 +1,114 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+
+from src.config import settings
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_max_workers: Optional[int] = None
+_counters = {"submitted": 0, "completed": 0, "failed": 0, "busy_ms": 0.0}
+
+
+def configure_process_pool(max_workers: Optional[int]):
+    """
+    Function to set amount of processes of CPU-bound work pool.
+
+    Must be called before pool is used,
+    `lamoda_parse_processes` setting is used otherwise.
+
+    Args:
+    - max_workers (int, optional) - amount of processes, amount of CPUs if None,
+        0 to run work in event loop.
+    """
+    global _max_workers
+    _max_workers = max_workers
+
+
+def _pool_size() -> int:
+    size = _max_workers
+    if size is None:
+        size = settings.lamoda_parse_processes
+    if size is None:
+        size = os.cpu_count() or 1
+    return size
+
+
+def get_process_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Function to get shared pool of processes for CPU-bound work.
+
+    Pool is created once per process on first use.
+    Processes are spawned, so they don't inherit state of running event loop.
+    Returns None if pool is disabled.
+    """
+    global _pool
+
+    if _pool is None and _pool_size() > 0:
+        _pool = ProcessPoolExecutor(
+            max_workers=_pool_size(),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+async def run_in_process(function, *args):
+    """
+    Function to run CPU-bound function out of event loop.
+
+    Function and its args must be picklable (module level function with plain data).
+    Function is called in event loop if pool is disabled.
+    Broken pool (crashed process) is recreated on next call.
+    """
+    pool = get_process_pool()
+    started_at = time.perf_counter()
+    _counters["submitted"] += 1
+    try:
+        if pool is None:
+            result = function(*args)
+        else:
+            result = await asyncio.get_running_loop().run_in_executor(
+                pool, function, *args
+            )
+    except BrokenProcessPool:
+        _counters["failed"] += 1
+        shutdown_process_pool(wait=False)
+        raise
+    except Exception:
+        _counters["failed"] += 1
+        raise
+
+    _counters["completed"] += 1
+    _counters["busy_ms"] += (time.perf_counter() - started_at) * 1000
+    return result
+
+
+def shutdown_process_pool(wait: bool = True):
+    """
+    Function to stop processes of shared pool.
+
+    Queued work is cancelled, running work is awaited if `wait` is set.
+    """
+    global _pool
+
+    pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=True)
+
+
+def get_process_pool_stats() -> Dict:
+    """
+    Function to get statistics of work done by shared pool.
+
+    Returns amount of processes, submitted/completed/failed calls
+    and total time of completed calls in ms.
+    """
+    return {
+        "processes": _pool_size(),
+        **_counters,
+        "busy_ms": round(_counters["busy_ms"], 3),
+    }
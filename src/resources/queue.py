@@ -0,0 +1,408 @@
+import asyncio
+import random
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.config import settings
+from src.resources.metrics import latency_percentiles
+from src.resources.redis import redis
+from src.resources.tasks import (
+    UNDECODABLE_TASK,
+    TaskMessage,
+    decode_task,
+    encode_task,
+    get_task,
+    get_task_name,
+    task_key,
+)
+
+
+# Deletes key only if it still keeps value set by caller
+DELETE_IF_EQUAL_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def retry_delay(attempt: int) -> float:
+    """
+    Function to get delay in seconds before next attempt of failed task.
+
+    Exponential backoff with jitter: half of delay is fixed and half is random.
+    """
+    delay = min(
+        settings.task_retry_max_delay,
+        settings.task_retry_base_delay * 2 ** (attempt - 1),
+    )
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class QueueBackend(ABC):
+    """
+    Base class of tasks queue backends.
+
+    Subclasses implement transport of messages: sending, consuming of parsing
+    and retry topics and reading of dead-letter topic,
+    backend without any of these methods can't be created.
+    Execution of tasks with retries and sends statistics are shared by all backends.
+
+    Attributes:
+    - in_process (bool) - whether messages are delivered only inside current process,
+        so consumers must run in the same process as producers.
+    """
+
+    in_process = False
+
+    def __init__(self):
+        self._send_latencies = deque(maxlen=10000)
+        self._send_counters = {"sent": 0, "failed": 0}
+
+    @abstractmethod
+    async def start(self):
+        """
+        Starts producer.
+        """
+
+    @abstractmethod
+    async def stop(self):
+        """
+        Flushes pending messages and stops producer.
+        """
+
+    @abstractmethod
+    async def send(
+        self, topic: str, message: bytes, key: bytes = None, wait: bool = False
+    ):
+        """
+        Sends message to topic.
+
+        Args:
+        - topic (str) - topic name.
+        - message (bytes) - encoded task.
+        - key (bytes, optional) - partitioning key.
+        - wait (bool, optional) - wait until message is delivered.
+        """
+
+    @abstractmethod
+    async def send_many(self, topic: str, messages: List[Tuple[bytes, bytes]]):
+        """
+        Sends batch of messages with keys and waits until the whole batch is delivered.
+        """
+
+    @abstractmethod
+    async def consume(self, concurrency: int):
+        """
+        Executes tasks from parsing topic with `concurrency` tasks at once.
+        """
+
+    @abstractmethod
+    async def consume_retries(self):
+        """
+        Sends tasks from retry topic back to parsing topic after their delay.
+        """
+
+    @abstractmethod
+    async def get_dead_letters(self, limit: int) -> List[Dict]:
+        """
+        Returns tasks from dead-letter topic which haven't been replayed yet.
+        """
+
+    @abstractmethod
+    async def replay_dead_letters(self) -> int:
+        """
+        Sends tasks from dead-letter topic back to parsing topic.
+        """
+
+    async def execute_message(self, value: bytes, key: Optional[bytes] = None):
+        """
+        Parses task with its args from message and executes it.
+
+        Failed task is sent to retry topic, or to dead-letter topic
+        if it exceeded `task_max_attempts` or task is unknown.
+        Message which can't be decoded is sent to dead-letter topic as is.
+        """
+        try:
+            message = decode_task(value)
+        except Exception as e:
+            print(f"Undecodable task message, error: {e!r}")
+            message = TaskMessage(name=UNDECODABLE_TASK, args=[value], kwargs={})
+            await self._send_to_dead_letters(message, key, repr(e))
+            return
+
+        try:
+            function = get_task(message.name)
+        except ValueError as e:
+            await self._send_to_dead_letters(message, key, repr(e))
+            return
+
+        try:
+            if asyncio.iscoroutinefunction(function):
+                await function(*message.args, **message.kwargs)
+            else:
+                function(*message.args, **message.kwargs)
+        except Exception as e:
+            print(
+                f"task: {message.name}, job: {message.job_id}, "
+                f"attempt: {message.attempt + 1}, error: {e!r}"
+            )
+            await self._schedule_retry(message, key, repr(e))
+
+    async def _schedule_retry(
+        self, message: TaskMessage, key: Optional[bytes], error: str
+    ):
+        attempt = message.attempt + 1
+        if attempt >= settings.task_max_attempts:
+            await self._send_to_dead_letters(message, key, error)
+            return
+
+        retry_message = encode_task(
+            message.name,
+            message.args,
+            message.kwargs,
+            attempt=attempt,
+            not_before=time.time() + retry_delay(attempt),
+            error=error,
+            job_id=message.job_id,
+        )
+        await self.send(settings.kafka_retry_topic, retry_message, key, wait=True)
+
+    async def _send_to_dead_letters(
+        self, message: TaskMessage, key: Optional[bytes], error: str
+    ):
+        dead_letter = encode_task(
+            message.name,
+            message.args,
+            message.kwargs,
+            attempt=message.attempt + 1,
+            error=error,
+            job_id=message.job_id,
+        )
+        await self.send(settings.kafka_dead_letter_topic, dead_letter, key, wait=True)
+
+    @staticmethod
+    def _dead_letter_data(
+        value: bytes, partition: int, offset: int, failed_at: int
+    ) -> Dict:
+        try:
+            message = decode_task(value)
+        except Exception as e:
+            message = TaskMessage(
+                name=UNDECODABLE_TASK, args=[value], kwargs={}, error=repr(e)
+            )
+        if message.name == UNDECODABLE_TASK:
+            message = message._replace(args=[message.args[0].hex()])
+
+        return {
+            "partition": partition,
+            "offset": offset,
+            "failed_at": failed_at,
+            **message._asdict(),
+        }
+
+    @staticmethod
+    def _replayed_message(value: bytes) -> bytes:
+        """
+        Returns message of dead letter to send back to parsing topic.
+
+        Task gets new retry attempts, undecodable message is sent as it was received.
+        """
+        try:
+            message = decode_task(value)
+        except Exception:
+            return value
+        if message.name == UNDECODABLE_TASK:
+            return message.args[0]
+        return encode_task(message.name, message.args, message.kwargs)
+
+    @staticmethod
+    def _due_time(value: bytes) -> float:
+        """
+        Returns unix time before which task of retry message can't be executed.
+
+        Undecodable message is due at once, so it gets to dead-letter topic.
+        """
+        try:
+            return decode_task(value).not_before or 0
+        except Exception:
+            return 0
+
+    def _record_send(self, started_at: float, error: Optional[BaseException] = None):
+        """
+        Records latency and result of delivered send.
+        """
+        if error is not None:
+            self._send_counters["failed"] += 1
+            print(f"Queue send failed: {error!r}")
+            return
+
+        self._send_counters["sent"] += 1
+        self._send_latencies.append((time.perf_counter() - started_at) * 1000)
+
+    def stats(self) -> Dict:
+        """
+        Returns amount of sent/failed messages and send latency percentiles in ms.
+        """
+        return {
+            **self._send_counters,
+            "latency_ms": latency_percentiles(self._send_latencies),
+        }
+
+
+_backend: Optional[QueueBackend] = None
+
+
+def get_queue_backend() -> QueueBackend:
+    """
+    Function to get queue backend selected by `queue_backend` setting.
+
+    Backend is created once per process.
+    """
+    global _backend
+
+    if _backend is None:
+        if settings.queue_backend == "kafka":
+            from src.resources.kafka import KafkaQueueBackend
+
+            _backend = KafkaQueueBackend()
+        elif settings.queue_backend == "memory":
+            from src.resources.memory_queue import MemoryQueueBackend
+
+            _backend = MemoryQueueBackend()
+        else:
+            raise ValueError(f"Unsupported queue backend '{settings.queue_backend}'.")
+    return _backend
+
+
+async def start_producer():
+    """
+    Function to start producer of queue backend.
+    """
+    await get_queue_backend().start()
+
+
+async def stop_producer():
+    """
+    Function to flush pending messages and stop producer of queue backend.
+    """
+    await get_queue_backend().stop()
+
+
+async def run_consumer(concurrency: int = None):
+    """
+    Queue consumer handler.
+
+    Executes tasks from parsing topic.
+
+    Args:
+    - concurrency (int, optional) - max amount of concurrent tasks,
+        `kafka_consumer_concurrency` setting by default.
+    """
+    await get_queue_backend().consume(
+        concurrency or settings.kafka_consumer_concurrency
+    )
+
+
+async def run_retry_consumer():
+    """
+    Queue consumer of retry topic.
+
+    Sends failed tasks back to parsing topic after their backoff delay.
+    """
+    await get_queue_backend().consume_retries()
+
+
+def get_producer_stats() -> Dict:
+    """
+    Function to get statistics of producer sends.
+
+    Returns amount of sent/failed messages and send latency percentiles in ms.
+    """
+    return get_queue_backend().stats()
+
+
+async def get_dead_letters(limit: int = 100) -> List[Dict]:
+    """
+    Function to get tasks from dead-letter topic which haven't been replayed yet.
+
+    Args:
+    - limit (int, optional) - max amount of tasks.
+    """
+    return await get_queue_backend().get_dead_letters(limit)
+
+
+async def replay_dead_letters() -> int:
+    """
+    Function to send all tasks from dead-letter topic back to parsing topic.
+
+    Replayed tasks get new retry attempts. Returns amount of replayed tasks.
+    """
+    return await get_queue_backend().replay_dead_letters()
+
+
+async def producer_send_one(function, *args, **kwargs):
+    """
+    Function to send task to queue.
+
+    Send registered task name with args as message to parsing topic.
+    Message is sent without waiting for delivery,
+    pending messages are flushed on producer stop.
+    """
+    message = encode_task(get_task_name(function), args, kwargs)
+    await get_queue_backend().send(settings.kafka_topic, message)
+
+
+async def producer_send_unique(function, *args, **kwargs) -> Tuple[str, bool]:
+    """
+    Function to send task to queue unless same task was sent recently.
+
+    Idempotency key of task (name with args) is stored in Redis
+    for `task_dedup_ttl` seconds, duplicates sent within this window are dropped.
+    Key is deleted if task isn't sent, so failed send doesn't block the task.
+
+    Returns job id of sent or already queued task and whether task was sent.
+    """
+    name = get_task_name(function)
+    dedup_key = f"task-dedup:{task_key(name, args, kwargs)}"
+    job_id = uuid.uuid4().hex
+
+    if not await redis.set(dedup_key, job_id, nx=True, ex=settings.task_dedup_ttl):
+        existing_job_id = await redis.get(dedup_key)
+        if existing_job_id:
+            return existing_job_id.decode(), False
+
+    message = encode_task(name, args, kwargs, job_id=job_id)
+    try:
+        await get_queue_backend().send(settings.kafka_topic, message)
+    except Exception:
+        await redis.eval(DELETE_IF_EQUAL_SCRIPT, 1, dedup_key, job_id)
+        raise
+    return job_id, True
+
+
+async def producer_send_many(
+    function, args_list: Iterable[tuple], key: Optional[Callable] = None
+):
+    """
+    Function to send batch of messages with same task to queue.
+
+    All messages are sent without waiting for each other,
+    then function waits until the whole batch is delivered.
+
+    Args:
+    - function - registered task.
+    - args_list (iterable of tuples) - positional args of each task.
+    - key (callable, optional) - function which takes task args and returns
+        partitioning key, messages with same key go to same partition.
+    """
+    name = get_task_name(function)
+    messages = [
+        (encode_task(name, args), str(key(*args)).encode() if key else None)
+        for args in args_list
+    ]
+    if messages:
+        await get_queue_backend().send_many(settings.kafka_topic, messages)
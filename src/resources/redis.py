@@ -0,0 +1,6 @@
+from redis import asyncio as aioredis
+from src.config import settings
+
+
+# Redis client shared by caching and tasks deduplication
+redis = aioredis.from_url(str(settings.redis_dsn))
@@ -0,0 +1,41 @@
+import json
+import os
+from typing import Dict
+
+from src.lamoda.page_cache import get_page_cache_stats
+from src.lamoda.utils import http_client as lamoda_http_client
+from src.resources.bulk_writer import get_bulk_writers_stats
+from src.resources.limiter import get_limiters_stats
+from src.resources.process_pool import get_process_pool_stats
+from src.resources.queue import get_producer_stats
+from src.twitch.client import http_client as twitch_http_client
+from src.twitch.rate_limiter import get_rate_limiters_stats
+
+
+def get_process_stats() -> Dict:
+    """
+    Function to get runtime statistics of current process.
+
+    Includes queue producer sends with its latency, connections reuse
+    of Lamoda and Twitch HTTP clients, work of parsing process pool, windows
+    with latencies of host limiters, Lamoda page cache hits,
+    batches of Mongo bulk writers and tokens of Twitch rate limiters.
+    """
+    return {
+        "pid": os.getpid(),
+        "queue_producer": get_producer_stats(),
+        "lamoda_http": lamoda_http_client.stats(),
+        "twitch_http": twitch_http_client.stats(),
+        "process_pool": get_process_pool_stats(),
+        "host_limiters": get_limiters_stats(),
+        "page_cache": get_page_cache_stats(),
+        "bulk_writers": get_bulk_writers_stats(),
+        "twitch_rate_limiters": get_rate_limiters_stats(),
+    }
+
+
+def print_process_stats():
+    """
+    Function to print runtime statistics of current process as one json line.
+    """
+    print(json.dumps(get_process_stats()), flush=True)
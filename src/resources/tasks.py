@@ -0,0 +1,163 @@
+import hashlib
+import importlib
+from typing import Callable, Dict, NamedTuple, Optional
+import msgpack
+from bson import ObjectId
+
+
+# Modules which register parsing tasks on import
+TASK_MODULES = [
+    "src.lamoda.service",
+    "src.twitch.services.categories_services",
+    "src.twitch.services.streams_services",
+    "src.twitch.services.users_services",
+]
+
+# msgpack extension type for bson ObjectId
+OBJECT_ID_EXT_TYPE = 1
+
+# Name of dead letter with message which can't be decoded, its raw bytes are the only arg
+UNDECODABLE_TASK = "undecodable"
+
+TASKS: Dict[str, Callable] = {}
+_modules_loaded = False
+
+
+class TaskMessage(NamedTuple):
+    """
+    Task unpacked from queue message.
+
+    Attributes:
+    - name (str) - registered task name.
+    - args (list) - task's positional args.
+    - kwargs (dict) - task's keyword args.
+    - attempt (int) - amount of failed executions.
+    - not_before (float, optional) - unix time before which task can't be executed.
+    - error (str, optional) - error of the last failed execution.
+    - job_id (str, optional) - id of job returned to API client.
+    """
+
+    name: str
+    args: list
+    kwargs: dict
+    attempt: int = 0
+    not_before: Optional[float] = None
+    error: Optional[str] = None
+    job_id: Optional[str] = None
+
+
+def task(name: str):
+    """
+    Decorator to register function as task which can be sent to queue.
+
+    Args:
+    - name (str) - stable task name used in messages instead of function path.
+    """
+
+    def decorator(function: Callable) -> Callable:
+        if name in TASKS and TASKS[name] is not function:
+            raise ValueError(f"Task '{name}' is already registered.")
+        TASKS[name] = function
+        function.task_name = name
+        return function
+
+    return decorator
+
+
+def get_task(name: str) -> Callable:
+    """
+    Function to get registered task by its name.
+
+    Imports modules with tasks on first call.
+    """
+    global _modules_loaded
+
+    if not _modules_loaded:
+        for module in TASK_MODULES:
+            importlib.import_module(module)
+        _modules_loaded = True
+
+    if name not in TASKS:
+        raise ValueError(f"Unknown task '{name}'.")
+    return TASKS[name]
+
+
+def get_task_name(function: Callable) -> str:
+    """
+    Function to get registered name of task function.
+    """
+    name = getattr(function, "task_name", None)
+    if name is None:
+        raise ValueError(f"Function '{function.__qualname__}' is not registered task.")
+    return name
+
+
+def _encode_ext(obj):
+    if isinstance(obj, ObjectId):
+        return msgpack.ExtType(OBJECT_ID_EXT_TYPE, obj.binary)
+    raise TypeError(f"Object of type {type(obj).__name__} can't be sent in task.")
+
+
+def _decode_ext(code: int, data: bytes):
+    if code == OBJECT_ID_EXT_TYPE:
+        return ObjectId(data)
+    return msgpack.ExtType(code, data)
+
+
+def encode_task(
+    name: str,
+    args: tuple = (),
+    kwargs: dict = None,
+    attempt: int = 0,
+    not_before: float = None,
+    error: str = None,
+    job_id: str = None,
+) -> bytes:
+    """
+    Function to pack task name with its args into message.
+
+    Args:
+    - name (str) - registered task name.
+    - args (tuple, optional) - task's positional args.
+    - kwargs (dict, optional) - task's keyword args.
+    - attempt (int, optional) - amount of failed executions.
+    - not_before (float, optional) - unix time before which task can't be executed.
+    - error (str, optional) - error of the last failed execution.
+    - job_id (str, optional) - id of job returned to API client.
+    """
+    envelope = {"t": name, "a": list(args), "k": kwargs or {}}
+    if attempt:
+        envelope["n"] = attempt
+    if not_before:
+        envelope["nb"] = not_before
+    if error:
+        envelope["e"] = error
+    if job_id:
+        envelope["j"] = job_id
+    return msgpack.packb(envelope, default=_encode_ext)
+
+
+def decode_task(message: bytes) -> TaskMessage:
+    """
+    Function to unpack task name with its args from message.
+    """
+    envelope = msgpack.unpackb(message, ext_hook=_decode_ext)
+    return TaskMessage(
+        name=envelope["t"],
+        args=envelope["a"],
+        kwargs=envelope["k"],
+        attempt=envelope.get("n", 0),
+        not_before=envelope.get("nb"),
+        error=envelope.get("e"),
+        job_id=envelope.get("j"),
+    )
+
+
+def task_key(name: str, args: tuple = (), kwargs: dict = None) -> str:
+    """
+    Function to get idempotency key of task derived from its name and args.
+
+    Keyword args are sorted, so key doesn't depend on their order.
+    """
+    kwargs = dict(sorted((kwargs or {}).items()))
+    return hashlib.sha1(encode_task(name, args, kwargs)).hexdigest()
@@ -0,0 +1,62 @@
+from fastapi import APIRouter
+
+from src.resources.indexes import ensure_indexes, get_indexes_info
+from src.resources.queue import get_dead_letters, replay_dead_letters
+from src.routers.responses import MongoJSONRoute
+from src.resources.stats import get_process_stats
+
+router = APIRouter(route_class=MongoJSONRoute)
+
+
+@router.get("/stats")
+async def stats():
+    """
+    API to get runtime statistics of current process.
+
+    Includes queue producer sends with its latency, connections reuse
+    of Lamoda HTTP client, work of parsing process pool, windows
+    with latencies of host limiters, Lamoda page cache hits
+    and batches of Mongo bulk writers.
+    """
+    return get_process_stats()
+
+
+@router.get("/dead-letters")
+async def dead_letters(limit: int = 100):
+    """
+    API to get failed tasks which exceeded retry attempts.
+
+    Args:
+    - limit (int, optional) - max amount of tasks.
+    """
+    data = await get_dead_letters(limit)
+    return {"data": data}
+
+
+@router.get("/dead-letters/replay")
+async def replay():
+    """
+    API to send all failed tasks from dead-letter topic back to parsing.
+
+    Returns message with amount of replayed tasks.
+    """
+    count = await replay_dead_letters()
+    return {"message": f"Tasks replayed ({count})"}
+
+
+@router.get("/indexes")
+async def indexes():
+    """
+    API to get declared, existing and missing indexes of collections.
+    """
+    return await get_indexes_info()
+
+
+@router.get("/indexes/ensure")
+async def ensure():
+    """
+    API to create declared indexes which don't exist yet.
+
+    Returns names of ensured indexes or error by collection.
+    """
+    return await ensure_indexes()
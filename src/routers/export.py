@@ -0,0 +1,129 @@
+import csv
+import io
+import zlib
+from typing import Any, AsyncIterator, Dict, List
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorCursor
+from starlette.responses import StreamingResponse
+
+from src.config import settings
+from src.routers.responses import dumps
+
+
+# Media types of export formats
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def csv_cell(value: Any) -> Any:
+    """
+    Function to convert document value into CSV cell.
+
+    Lists and nested documents are written as json.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (list, dict)):
+        return dumps(value).decode()
+    return value
+
+
+async def encode_documents(
+    cursor: AsyncIOMotorCursor, export_format: str, fields: List[str], batch_size: int
+) -> AsyncIterator[bytes]:
+    """
+    Generator encoding documents of cursor into chunks of NDJSON or CSV rows.
+
+    Chunk has `batch_size` rows, first row is sent at once,
+    so client gets data before the first batch is read.
+    Cursor is closed when export is finished or client disconnects.
+
+    Args:
+    - cursor (AsyncIOMotorCursor) - cursor of exported documents.
+    - export_format (str) - `ndjson` or `csv`.
+    - fields (list of str) - columns of CSV.
+    - batch_size (int) - amount of rows in chunk.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    rows = []
+
+    def write_csv_row(values: List) -> bytes:
+        writer.writerow(values)
+        row = buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+        return row
+
+    def encode(document: Dict) -> bytes:
+        if export_format == "ndjson":
+            return dumps(document) + b"\n"
+        return write_csv_row([csv_cell(document.get(field)) for field in fields])
+
+    try:
+        if export_format == "csv":
+            rows.append(write_csv_row(fields))
+
+        sent = 0
+        async for document in cursor:
+            rows.append(encode(document))
+            sent += 1
+            if sent == 1 or len(rows) >= batch_size:
+                yield b"".join(rows)
+                rows = []
+        if rows:
+            yield b"".join(rows)
+    finally:
+        await cursor.close()
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Generator compressing chunks into gzip stream.
+
+    Every chunk is flushed, so compressed data is sent as soon as it's encoded.
+    """
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    async for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def export_response(
+    cursor: AsyncIOMotorCursor,
+    name: str,
+    fields: List[str],
+    export_format: str = "ndjson",
+    gzip: bool = False,
+) -> StreamingResponse:
+    """
+    Function to stream documents of cursor as NDJSON or CSV file.
+
+    Documents are read by batches of `export_batch_size`,
+    so memory use doesn't depend on amount of exported documents.
+
+    Args:
+    - cursor (AsyncIOMotorCursor) - cursor of exported documents.
+    - name (str) - name of exported file without extension.
+    - fields (list of str) - columns of CSV.
+    - export_format (str, optional) - `ndjson` or `csv`.
+    - gzip (bool, optional) - compress file with gzip.
+    """
+    batch_size = settings.export_batch_size
+    chunks = encode_documents(
+        cursor.batch_size(batch_size), export_format, fields, batch_size
+    )
+    filename = f"{name}.{export_format}"
+    media_type = EXPORT_MEDIA_TYPES[export_format]
+    if gzip:
+        chunks = gzip_chunks(chunks)
+        filename = f"{filename}.gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
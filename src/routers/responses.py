@@ -0,0 +1,124 @@
+from functools import wraps
+from typing import Any, Callable, Coroutine, Optional, Sequence
+
+import orjson
+from bson import ObjectId
+from fastapi import Depends, Request, Response, params
+from fastapi.routing import APIRoute
+from fastapi_cache.coder import Coder
+from starlette.responses import JSONResponse
+
+
+def default(obj: Any) -> Any:
+    """
+    Function to encode types unknown to orjson.
+
+    Replaces ObjectId to str value, datetime is encoded by orjson as ISO 8601.
+    """
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Function to encode data with ObjectId to json in one pass.
+    """
+    return orjson.dumps(content, default=default)
+
+
+class MongoJSONResponse(JSONResponse):
+    """
+    JSON response encoded by orjson, supports ObjectId and datetime.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class MongoJSONCoder(Coder):
+    """
+    Coder of cached responses.
+
+    Cached json is sent as it is without decoding and encoding again.
+    """
+
+    @classmethod
+    def encode(cls, value: Any) -> bytes:
+        if isinstance(value, Response):
+            return value.body
+        return dumps(value)
+
+    @classmethod
+    def decode(cls, value: bytes) -> Any:
+        return orjson.loads(value)
+
+    @classmethod
+    def decode_as_type(cls, value: bytes, *, type_: Any) -> Response:
+        return Response(value, media_type="application/json")
+
+
+def send_as_response(endpoint: Callable) -> Callable:
+    """
+    Decorator to return endpoint data as `MongoJSONResponse`.
+
+    Returned response skips FastAPI `jsonable_encoder`,
+    signature of endpoint isn't changed.
+    """
+
+    @wraps(endpoint)
+    async def inner(*args, **kwargs):
+        result = await endpoint(*args, **kwargs)
+        if isinstance(result, Response):
+            return result
+        return MongoJSONResponse(result)
+
+    inner.sends_response = True
+    return inner
+
+
+def keep_dependencies_response(request: Request, response: Response):
+    """
+    Dependency to keep response of dependencies (e.g. with cache headers)
+    in request state, its headers are copied to response of endpoint.
+    """
+    request.state.dependencies_response = response
+
+
+class MongoJSONRoute(APIRoute):
+    """
+    Route sending endpoint data as `MongoJSONResponse`.
+
+    Data is encoded by orjson in one pass instead of FastAPI `jsonable_encoder`
+    and json encoding, so ObjectId doesn't need to be replaced before response.
+    Headers and status code set by dependencies and decorators are copied
+    to returned response.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        endpoint: Callable,
+        *,
+        dependencies: Optional[Sequence[params.Depends]] = None,
+        **kwargs,
+    ):
+        # routes of included routers are created again with wrapped endpoint
+        if not getattr(endpoint, "sends_response", False):
+            endpoint = send_as_response(endpoint)
+            dependencies = [*(dependencies or []), Depends(keep_dependencies_response)]
+        super().__init__(path, endpoint, dependencies=dependencies, **kwargs)
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            response = await handler(request)
+            dependencies_response = request.state.dependencies_response
+            if response is not dependencies_response:
+                response.headers.raw.extend(dependencies_response.headers.raw)
+                if dependencies_response.status_code:
+                    response.status_code = dependencies_response.status_code
+            return response
+
+        return route_handler
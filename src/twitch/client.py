@@ -1,8 +1,16 @@
 import asyncio
-from typing import Dict, List, Union
+import json
+from typing import Dict, List, Optional, Union
 import httpx
+from redis.exceptions import LockError, RedisError
 from datetime import datetime, timedelta
 
+from src.config import settings
+from src.resources.http_client import PooledHttpClient
+from src.resources.limiter import get_host_limiter
+from src.resources.redis import redis
+from src.twitch.rate_limiter import PRIORITY_BULK, get_rate_limiter
+
 
 TWITCH_URLS = {
     "OAUTH2": "https://id.twitch.tv/oauth2/token",
@@ -13,12 +21,31 @@ TWITCH_URLS = {
     "GET_USER": "https://api.twitch.tv/helix/users",
 }
 
-client = httpx.AsyncClient()
-timeout = httpx.Timeout(connect=20.0, read=20.0, write=10.0, pool=10.0)
+# Errors of requests which are retried
+RETRY_ERRORS = (httpx.TimeoutException, httpx.NetworkError)
+
+# HTTP client shared by all Twitch requests of process
+http_client = PooledHttpClient("twitch")
+
+
+async def _send(method: str, url: str, **kwargs) -> httpx.Response:
+    """
+    Sends request by shared HTTP client.
+    """
+    return await http_client.request(method, url, **kwargs)
+
+
+async def _get(url: str, **kwargs) -> httpx.Response:
+    return await _send("GET", url, **kwargs)
+
+
+async def _post(url: str, **kwargs) -> httpx.Response:
+    return await _send("POST", url, **kwargs)
+
 
 TWITCH_CLIENT_HTTP_METHODS = {
-    "GET": client.get,
-    "POST": client.post,
+    "GET": _get,
+    "POST": _post,
 }
 
 
@@ -31,9 +58,11 @@ class TwitchAPIClient:
         - make_request - making request with specific url
 
     Protected methods:
-        - is_token_expired - checking whether token is expired.
+        - is_token_expired - checking whether token is expired or expires soon.
         - prepare_headers - creates dict with necessary headers params.
-        - refresh_token - gets new access token.
+        - refresh_token - gets new access token once for all concurrent tasks.
+        - refresh_shared_token - gets access token shared by processes through Redis.
+        - request_token - requests new access token from Twitch OAuth2 service.
 
     Attributes:
         - client_id (str) - app's registered client ID.
@@ -58,25 +87,40 @@ class TwitchAPIClient:
 
         self.access_token = None
         self.token_expires_at = None
+        self._refresh_lock = asyncio.Lock()
 
     async def make_request(
-        self, url_name: str, http_method: str, query_params: dict = {}, body: dict = {}
+        self,
+        url_name: str,
+        http_method: str,
+        query_params: dict = {},
+        body: dict = {},
+        priority: int = PRIORITY_BULK,
     ) -> dict:
         """
         Function to make request to twitch API.
 
         Checks whether token is valid and then makes request.
         Repeat request if there is unauthorized status code.
+        Timeouts, network errors and 5xx responses are retried
+        `twitch_http_max_retries` times with exponential backoff.
+        Amount of concurrent requests to Twitch API is limited by adaptive host limiter.
+        Rate of requests is limited by token bucket shared by all tasks of app,
+        which is seeded from rate limit headers of responses.
+        Throttled (429) request is repeated at reset time of rate limit.
+        Requests repeated after 429 or 401 are retried the same way.
 
         Args:
             - url_name (str, required) - url name.
             - http_method (str, required) - http method name.
             - query_params (dict, optional) - - data represents request's query params.
             - body (dict, optional) - data represents request's body.
+            - priority (int, optional) - `PRIORITY_INTERACTIVE` requests
+                are sent before `PRIORITY_BULK` requests.
         """
 
         if not self.access_token or await self._is_token_expired():
-            await self._refresh_token()
+            await self._refresh_token(stale_token=self.access_token)
 
         if url_name not in self.urls:
             raise ValueError("Unsupported URL name.")
@@ -84,24 +128,52 @@ class TwitchAPIClient:
             raise ValueError("Unsupported HTTP method.")
 
         url = self.urls[url_name]
-        headers = await self._prepare_headers()
         handler = self.http_methods[http_method]
         params = await self.prepare_query_params(query_params)
-
-        retries = 0
-        max_retries = 3
-        while retries < max_retries:
+        rate_limiter = get_rate_limiter(self.client_id)
+        sent_token = None
+
+        async def send() -> httpx.Response:
+            nonlocal sent_token
+            await rate_limiter.acquire(priority)
+            sent_token = self.access_token
+            headers = await self._prepare_headers()
+            response = await get_host_limiter(url).request(
+                lambda: handler(url, headers=headers, params=params)
+            )
+            rate_limiter.update(response.headers, throttled=response.status_code == 429)
+            return response
+
+        max_retries = settings.twitch_http_max_retries
+        retries = throttled_retries = 0
+        is_refreshed = False
+        while True:
+            # every attempt is checked for throttling, stale token and failure
             try:
-                response = await handler(url, headers=headers, params=params)
-                break
-            except httpx.ConnectTimeout:
-                retries += 1
-
-        if response.status_code == 401:
-            await self._refresh_token()
-            response = await handler(url, headers=headers, params=params)
-
-        return response
+                response = await send()
+            except RETRY_ERRORS:
+                if retries == max_retries:
+                    raise
+                response = None
+
+            if response is not None:
+                if (
+                    response.status_code == 429
+                    and throttled_retries < settings.twitch_rate_limit_max_retries
+                ):
+                    # rate limiter waits for reset time before next attempt
+                    throttled_retries += 1
+                    continue
+                if response.status_code == 401 and not is_refreshed:
+                    is_refreshed = True
+                    await self._refresh_token(stale_token=sent_token)
+                    continue
+                if response.status_code < 500 or retries == max_retries:
+                    return response
+
+            retries += 1
+            http_client.count_retry()
+            await asyncio.sleep(settings.twitch_http_retry_delay * 2 ** (retries - 1))
 
     async def prepare_query_params(
         self, query_params: Union[List, Dict]
@@ -118,50 +190,141 @@ class TwitchAPIClient:
                 params[param] = query_params[param]
         return params
 
-    async def _refresh_token(self):
+    async def _refresh_token(self, stale_token: Optional[str] = None):
         """
         Function to get new token.
 
-        Sends POST request to twitch OAuth2 service with credentials to get new token.
-        Updates APIClient statement with new token and time of its expiration if success request.
-        Otherwise retries to get new token in 1 sec.
+        Refresh is single-flight: concurrent tasks wait for one refresh
+        and use its token instead of requesting their own.
+        If token cache is enabled, token is shared by all processes through Redis:
+        token is taken from cache unless it's stale, otherwise one process
+        requests new token under Redis lock while others wait and read it from cache.
+
+        Args:
+        - stale_token (str, optional) - expired or rejected token to replace.
+        """
+        async with self._refresh_lock:
+            # token was refreshed by concurrent task while waiting for lock
+            if self.access_token != stale_token and not await self._is_token_expired():
+                return
+
+            if settings.twitch_token_cache:
+                try:
+                    await self._refresh_shared_token(stale_token)
+                    return
+                except (RedisError, LockError) as exc:
+                    print(f"Twitch token cache is unavailable: {exc!r}")
+
+            await self._request_token()
+
+    async def _refresh_shared_token(self, stale_token: Optional[str]):
+        """
+        Function to get token from Redis cache or to request and cache new token.
+        """
+        key = f"twitch-token:{self.client_id}"
+        if await self._load_cached_token(key, stale_token):
+            return
+
+        async with redis.lock(
+            f"{key}:lock",
+            timeout=settings.twitch_token_lock_timeout,
+            blocking_timeout=settings.twitch_token_lock_timeout,
+        ):
+            # token was refreshed by other process while waiting for lock
+            if await self._load_cached_token(key, stale_token):
+                return
+
+            await self._request_token()
+            expires_in = (self.token_expires_at - datetime.now()).total_seconds()
+            token = {
+                "access_token": self.access_token,
+                "expires_at": self.token_expires_at.timestamp(),
+            }
+            await redis.set(key, json.dumps(token), ex=max(1, int(expires_in)))
+
+    async def _load_cached_token(self, key: str, stale_token: Optional[str]) -> bool:
+        """
+        Function to use token from Redis cache if it's fresh.
+
+        Returns whether cached token is used.
+        """
+        cached = await redis.get(key)
+        if not cached:
+            return False
+
+        token = json.loads(cached)
+        expires_at = datetime.fromtimestamp(token["expires_at"])
+        if token["access_token"] == stale_token or self._expires_soon(expires_at):
+            return False
+
+        self.access_token = token["access_token"]
+        self.token_expires_at = expires_at
+        return True
+
+    async def _request_token(self):
+        """
+        Function to request new token from Twitch OAuth2 service.
+
+        Sends POST request with credentials and updates APIClient statement with
+        new token and time of its expiration if success request.
+        Failed requests are retried `twitch_token_max_retries` times with exponential backoff.
 
         Request data:
         - client_id (str, required) - app's registered client ID.
         - client_secret (str, required) - app's registered client secret.
         - grant_type (str, required) - must be set to client_credentials.
         """
-
         data = {
             "client_id": self.client_id,
             "client_secret": self.client_secret,
             "grant_type": "client_credentials",
         }
 
-        response = await httpx.AsyncClient().post(self.urls["OAUTH2"], data=data)
-        if response.status_code == 200:
-            response_data = response.json()
-            self.access_token = response_data["access_token"]
-            expires_in_sec = response_data["expires_in"]
-            self.token_expires_at = datetime.now() + timedelta(seconds=expires_in_sec)
-        elif response.status_code == 400:
-            raise ValueError(
-                "Invalid credentials: client_id or client_secret.Must be set in environment"
-            )
-        else:
-            await asyncio.sleep(1)
-            await self._refresh_token()
+        for attempt in range(settings.twitch_token_max_retries + 1):
+            if attempt:
+                await asyncio.sleep(
+                    settings.twitch_token_retry_delay * 2 ** (attempt - 1)
+                )
+            try:
+                response = await self.http_methods["POST"](
+                    self.urls["OAUTH2"], data=data
+                )
+            except httpx.TransportError:
+                if attempt == settings.twitch_token_max_retries:
+                    raise
+                continue
+
+            if response.status_code == 200:
+                response_data = response.json()
+                self.access_token = response_data["access_token"]
+                expires_in_sec = response_data["expires_in"]
+                self.token_expires_at = datetime.now() + timedelta(
+                    seconds=expires_in_sec
+                )
+                return
+            if response.status_code == 400:
+                raise ValueError(
+                    "Invalid credentials: client_id or client_secret.Must be set in environment"
+                )
+
+        raise ValueError(f"Failed to get token, status code {response.status_code}")
 
     async def _is_token_expired(self):
         """
         Function to check whether access token is expired.
+
+        Token is treated as expired `twitch_token_refresh_margin` seconds
+        before its expiration, so it's refreshed before requests are rejected.
         """
 
         if self.token_expires_at:
-            now = datetime.now()
-            return self.token_expires_at < now
+            return self._expires_soon(self.token_expires_at)
         return True
 
+    def _expires_soon(self, expires_at: datetime) -> bool:
+        margin = timedelta(seconds=settings.twitch_token_refresh_margin)
+        return expires_at - margin < datetime.now()
+
     async def _prepare_headers(self) -> dict:
         """
         Function to create dict with params which represents request's headers.
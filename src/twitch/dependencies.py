@@ -0,0 +1,14 @@
+from src.config import settings
+from src.twitch.client import TwitchAPIClient
+
+
+twitch_client = TwitchAPIClient(
+    client_id=settings.twitch_client_id, client_secret=settings.twitch_client_secret
+)
+
+
+async def get_twitch_client() -> TwitchAPIClient:
+    """
+    Twitch API client dependency for endpoints.
+    """
+    return twitch_client
@@ -0,0 +1,167 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from src.config import settings
+
+
+# Priorities of requests, requests with lower value are sent first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+
+
+class RateLimiter:
+    """
+    Token bucket of Twitch API requests with priority queue.
+
+    Bucket has `capacity` tokens and is refilled by `capacity` tokens per `window`.
+    Bucket is seeded from `Ratelimit-Limit`, `Ratelimit-Remaining`
+    and `Ratelimit-Reset` headers of Twitch responses:
+    when no requests remain, tokens aren't given until reset time.
+    Waiting requests get tokens by priority, then in order of arrival.
+
+    Attributes:
+    - capacity (int) - max amount of tokens (requests per window).
+    - window (float) - seconds to refill full bucket.
+    - tokens (float) - amount of tokens available now.
+    """
+
+    def __init__(self, capacity: int, window: float):
+        self.capacity = capacity
+        self.window = window
+        self.tokens = float(capacity)
+
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._counters = {"requests": 0, "waited": 0, "throttled": 0}
+
+    async def acquire(self, priority: int = PRIORITY_BULK):
+        """
+        Waits for token of one request.
+
+        Args:
+        - priority (int, optional) - priority of request, lower is sent first.
+        """
+        self._counters["requests"] += 1
+        self._refill()
+        if not self._waiters and self._is_available():
+            self.tokens -= 1
+            return
+
+        self._counters["waited"] += 1
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), waiter))
+        self._schedule()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # token was given to waiter right before cancellation
+            if waiter.done() and not waiter.cancelled():
+                self.tokens += 1
+                self._wake_up()
+            raise
+
+    def update(self, headers: Mapping[str, str], throttled: bool = False):
+        """
+        Seeds bucket from rate limit headers of Twitch response.
+
+        Args:
+        - headers (mapping) - headers of response.
+        - throttled (bool, optional) - response has 429 status.
+        """
+        try:
+            limit = int(headers["Ratelimit-Limit"])
+            remaining = int(headers["Ratelimit-Remaining"])
+            reset = int(headers["Ratelimit-Reset"])
+        except (KeyError, ValueError):
+            if throttled:
+                remaining, reset = 0, time.time() + self.window / self.capacity
+            else:
+                return
+        else:
+            # broken limit is ignored, bucket keeps previous capacity
+            if limit > 0:
+                self.capacity = limit
+
+        if throttled:
+            self._counters["throttled"] += 1
+            remaining = 0
+
+        self._refill()
+        self.tokens = min(self.tokens, remaining)
+        if remaining < 1:
+            reset_at = time.monotonic() + max(0.0, reset - time.time())
+            self._blocked_until = max(self._blocked_until, reset_at)
+
+    def _refill(self):
+        now = time.monotonic()
+        rate = self.capacity / self.window
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated_at) * rate)
+        self._updated_at = now
+
+    def _is_available(self) -> bool:
+        return self.tokens >= 1 and time.monotonic() >= self._blocked_until
+
+    def _wake_up(self):
+        self._timer = None
+        self._refill()
+        while self._waiters and self._is_available():
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                self.tokens -= 1
+        self._schedule()
+
+    def _schedule(self):
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+        if not self._waiters or self._timer:
+            return
+
+        now = time.monotonic()
+        refill_delay = (1 - self.tokens) * self.window / self.capacity
+        delay = max(0.0, self._blocked_until - now, refill_delay)
+        self._timer = asyncio.get_running_loop().call_later(delay, self._wake_up)
+
+    def stats(self) -> Dict:
+        """
+        Returns capacity, available tokens, waiting requests,
+        amount of requests, requests which waited for token and throttled responses.
+        """
+        self._refill()
+        return {
+            "capacity": self.capacity,
+            "tokens": round(self.tokens, 2),
+            "waiting": sum(not waiter.done() for _, _, waiter in self._waiters),
+            **self._counters,
+        }
+
+
+_rate_limiters: Dict[str, RateLimiter] = {}
+
+
+def get_rate_limiter(client_id: str) -> RateLimiter:
+    """
+    Function to get rate limiter shared by all requests of Twitch app.
+
+    Twitch limits requests by app, so all tasks of process
+    with the same client ID share one bucket.
+    """
+    if client_id not in _rate_limiters:
+        _rate_limiters[client_id] = RateLimiter(
+            capacity=settings.twitch_rate_limit,
+            window=settings.twitch_rate_limit_window,
+        )
+    return _rate_limiters[client_id]
+
+
+def get_rate_limiters_stats() -> Dict[str, Dict]:
+    """
+    Function to get statistics of rate limiters by Twitch client ID.
+    """
+    return {client_id: limiter.stats() for client_id, limiter in _rate_limiters.items()}
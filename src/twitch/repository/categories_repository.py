@@ -1,30 +1,49 @@
-from typing import List, Dict
-from src.resources.mongo import db_twitch
+from typing import List, Dict, Optional, Tuple
+from bson import ObjectId
+from pymongo import InsertOne
+from src.resources.bulk_writer import get_bulk_writer
+from src.resources.mongo import db_twitch, find_page, index
 from src.twitch.utils import add_current_time
 
 db = db_twitch.categories
 
+# Indexes of collection ensured at startup
+INDEXES = [(db, [index("id")])]
+
 
 async def insert_categories_data(data: List[Dict]) -> List[str]:
     """
     Multiple insert category/game data to Twitch categories/games collection.
 
+    Ids are assigned before insert, inserts of all tasks are coalesced
+    into bulk writes.
+
     Args:
     - data (list of dicts) - list of categories info.
     """
     await add_current_time(data)
-    inserted_data = await db.insert_many(data)
+    for item in data:
+        item.setdefault("_id", ObjectId())
+    await get_bulk_writer(db).write([InsertOne(item) for item in data])
 
-    inserted_ids = [str(item_id) for item_id in inserted_data.inserted_ids]
+    inserted_ids = [str(item["_id"]) for item in data]
     return inserted_ids
 
 
-async def get_categories_data() -> List[Dict]:
+async def get_categories_page(
+    after: Optional[ObjectId] = None, limit: int = 100
+) -> Tuple[List[Dict], Optional[ObjectId]]:
     """
-    Get all data from Twitch categories/games collection.
+    Get page of data from Twitch categories/games collection.
+
+    Returns categories and `_id` to start next page with,
+    or None if it's the last page.
+
+    Args:
+    - after (ObjectId, optional) - `_id` of last category of previous page.
+    - limit (int, optional) - max amount of categories.
     """
-    result = await db.find({}).to_list(None)
-    return result
+    return await find_page(db, {}, after, limit)
 
 
 async def get_category_data(object_id: int = None, category_id: int = None) -> Dict:
@@ -1,30 +1,88 @@
-from typing import List, Dict
-from src.resources.mongo import db_twitch
+from typing import List, Dict, Optional, Tuple
+from motor.motor_asyncio import AsyncIOMotorCursor
+from bson import ObjectId
+from pymongo import InsertOne
+from src.resources.bulk_writer import get_bulk_writer
+from src.resources.mongo import db_twitch, find_page, index
 from src.twitch.utils import add_current_time
 
 db = db_twitch.streams
 
+# Indexes of collection ensured at startup:
+# - id, reads of specific stream,
+# - filter field, `_id` and viewers, pages of streams filtered by equality
+#     in order of `_id` with viewers filtered on index keys.
+INDEXES = [
+    (
+        db,
+        [
+            index("id"),
+            index("game_id", "_id", "viewer_count"),
+            index("language", "_id", "viewer_count"),
+            index("type", "_id", "viewer_count"),
+        ],
+    )
+]
+
 
 async def insert_streams_data(data: List[Dict]) -> List[str]:
     """
     Multiple insert streams data to Twitch streams collection.
 
+    Ids are assigned before insert, inserts of all tasks are coalesced
+    into bulk writes.
+
     Args:
     - data (list of dicts) - list of streams info.
     """
     await add_current_time(data)
-    inserted_data = await db.insert_many(data)
+    for item in data:
+        item.setdefault("_id", ObjectId())
+    await get_bulk_writer(db).write([InsertOne(item) for item in data])
 
-    inserted_ids = [str(item_id) for item_id in inserted_data.inserted_ids]
+    inserted_ids = [str(item["_id"]) for item in data]
     return inserted_ids
 
 
-async def get_streams_data() -> List[Dict]:
+async def get_streams_page(
+    after: Optional[ObjectId] = None,
+    limit: int = 100,
+    game_id: str = None,
+    language: str = None,
+    min_viewers: int = None,
+    stream_type: str = None,
+) -> Tuple[List[Dict], Optional[ObjectId]]:
     """
-    Get all data from Twitch streams collection.
+    Get page of data from Twitch streams collection.
+
+    Returns streams and `_id` to start next page with, or None if it's the last page.
+
+    Args:
+    - after (ObjectId, optional) - `_id` of last stream of previous page.
+    - limit (int, optional) - max amount of streams.
+    - game_id (str, optional) - game (category) id of streams.
+    - language (str, optional) - language of streams.
+    - min_viewers (int, optional) - min amount of viewers of streams.
+    - stream_type (str, optional) - type of streams (`live`).
     """
-    result = await db.find({}).to_list(None)
-    return result
+    query = {}
+    if game_id:
+        query["game_id"] = game_id
+    if language:
+        query["language"] = language
+    if stream_type:
+        query["type"] = stream_type
+    if min_viewers is not None:
+        query["viewer_count"] = {"$gte": min_viewers}
+
+    return await find_page(db, query, after, limit)
+
+
+def get_streams_cursor() -> AsyncIOMotorCursor:
+    """
+    Get cursor of all data from Twitch streams collection for export.
+    """
+    return db.find({})
 
 
 async def get_stream_data(object_id: int = None, stream_id: int = None) -> Dict:
@@ -1,30 +1,64 @@
-from typing import List, Dict
-from src.resources.mongo import db_twitch
+from typing import List, Dict, Optional, Tuple
+from motor.motor_asyncio import AsyncIOMotorCursor
+from bson import ObjectId
+from pymongo import InsertOne
+from src.resources.bulk_writer import get_bulk_writer
+from src.resources.mongo import db_twitch, find_page, index
 from src.twitch.utils import add_current_time
 
 db = db_twitch.users
 
+# Indexes of collection ensured at startup
+INDEXES = [(db, [index("login"), index("id"), index("broadcaster_type", "_id")])]
+
 
 async def insert_users_data(data: List[Dict]) -> List[str]:
     """
     Multiple insert users data to Twitch users collection.
 
+    Ids are assigned before insert, inserts of all tasks are coalesced
+    into bulk writes.
+
     Args:
     - data (list of dicts) - list of users info.
     """
     await add_current_time(data)
-    inserted_data = await db.insert_many(data)
+    for item in data:
+        item.setdefault("_id", ObjectId())
+    await get_bulk_writer(db).write([InsertOne(item) for item in data])
 
-    inserted_ids = [str(item_id) for item_id in inserted_data.inserted_ids]
+    inserted_ids = [str(item["_id"]) for item in data]
     return inserted_ids
 
 
-async def get_users_data() -> List[Dict]:
+async def get_users_page(
+    after: Optional[ObjectId] = None,
+    limit: int = 100,
+    broadcaster_type: str = None,
+) -> Tuple[List[Dict], Optional[ObjectId]]:
+    """
+    Get page of data from Twitch users collection.
+
+    Returns users and `_id` to start next page with, or None if it's the last page.
+
+    Args:
+    - after (ObjectId, optional) - `_id` of last user of previous page.
+    - limit (int, optional) - max amount of users.
+    - broadcaster_type (str, optional) - broadcaster type of users
+        (`partner`, `affiliate`).
+    """
+    query = {}
+    if broadcaster_type:
+        query["broadcaster_type"] = broadcaster_type
+
+    return await find_page(db, query, after, limit)
+
+
+def get_users_cursor() -> AsyncIOMotorCursor:
     """
-    Get all data from Twitch users collection.
+    Get cursor of all data from Twitch users collection for export.
     """
-    result = await db.find({}).to_list(None)
-    return result
+    return db.find({})
 
 
 async def get_user_data(identifier: str) -> Dict:
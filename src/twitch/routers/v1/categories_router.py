@@ -1,9 +1,9 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 from fastapi_cache.decorator import cache
 
 from src.twitch.repository.categories_repository import (
     clear_categories_data,
-    get_categories_data,
+    get_categories_page,
     get_category_data,
 )
 from src.twitch.services.categories_services import (
@@ -11,9 +11,11 @@ from src.twitch.services.categories_services import (
     parse_category,
     parse_top_categories,
 )
-from src.resources.kafka import producer_send_one
+from src.resources.queue import producer_send_unique
+from src.routers.responses import MongoJSONRoute
+from src.twitch.utils import decode_cursor, encode_cursor
 
-router = APIRouter()
+router = APIRouter(route_class=MongoJSONRoute)
 
 
 @router.get("/auto-parse")
@@ -23,11 +25,14 @@ async def auto_parse_categories():
     API to start auto-parsing categories/games.
 
     Parses every category/game by 100 items per page.
+    Returns id of started job or id of the same job if it's already queued.
     """
 
-    await clear_categories_data()
-    await producer_send_one(auto_parse_all_categories)
-    return {"message": "Parsing started"}
+    job_id, created = await producer_send_unique(auto_parse_all_categories)
+    return {
+        "message": "Parsing started" if created else "Parsing already queued",
+        "job_id": job_id,
+    }
 
 
 @router.get("/top/parse")
@@ -46,8 +51,13 @@ async def parse_categories(
     - first (int, optional, max 100) - the maximum number of items to return per page in the response.
     """
 
-    await producer_send_one(parse_top_categories, first, after, before)
-    return {"message": "Parsing started"}
+    job_id, created = await producer_send_unique(
+        parse_top_categories, first, after, before
+    )
+    return {
+        "message": "Parsing started" if created else "Parsing already queued",
+        "job_id": job_id,
+    }
 
 
 @router.get("/parse")
@@ -68,23 +78,36 @@ async def parse_specific_category(
     if not id and not name and not igdb_id:
         return {"error": "id or name or igdb_id must be specified"}
 
-    await producer_send_one(parse_category, id, name, igdb_id)
-
-    return {"message": "Parsing started"}
+    job_id, created = await producer_send_unique(parse_category, id, name, igdb_id)
+    return {
+        "message": "Parsing started" if created else "Parsing already queued",
+        "job_id": job_id,
+    }
 
 
 @router.get("/")
 @cache(expire=60)
-async def get_categories():
-    """
-    API to get all categories/games data.
+async def get_categories(after: str = None, limit: int = Query(100, ge=1, le=1000)):
     """
-    data = await get_categories_data()
+    API to get categories/games data by pages.
 
-    for item in data:
-        item["_id"] = str(item["_id"])
+    Returns page of categories and cursor of next page (`next_cursor`),
+    which is null on the last page.
 
-    return data
+    Args:
+    - after (str, optional) - cursor of page returned with previous page.
+    - limit (int, optional, max 1000) - the maximum number of categories in page.
+    """
+    try:
+        after_id = decode_cursor(after) if after else None
+    except ValueError:
+        return {"error": "Invalid cursor"}
+
+    data, next_after = await get_categories_page(after=after_id, limit=limit)
+    return {
+        "data": data,
+        "next_cursor": encode_cursor(next_after) if next_after else None,
+    }
 
 
 @router.get("/clear")
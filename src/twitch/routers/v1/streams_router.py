@@ -1,18 +1,44 @@
-from fastapi import APIRouter
+from typing import Literal
+
+from fastapi import APIRouter, Query
 from fastapi_cache.decorator import cache
 
 from src.twitch.repository.streams_repository import (
     clear_streams_data,
     get_stream_data,
-    get_streams_data,
+    get_streams_cursor,
+    get_streams_page,
 )
 from src.twitch.services.streams_services import (
     auto_parse_all_streams,
     parse_specific_streams,
 )
-from src.resources.kafka import producer_send_one
-
-router = APIRouter()
+from src.resources.queue import producer_send_unique
+from src.routers.export import export_response
+from src.routers.responses import MongoJSONRoute
+from src.twitch.utils import decode_cursor, encode_cursor
+
+router = APIRouter(route_class=MongoJSONRoute)
+
+# Columns of streams CSV export
+STREAM_FIELDS = [
+    "_id",
+    "id",
+    "user_id",
+    "user_login",
+    "user_name",
+    "game_id",
+    "game_name",
+    "type",
+    "title",
+    "viewer_count",
+    "started_at",
+    "language",
+    "thumbnail_url",
+    "tags",
+    "is_mature",
+    "created_at",
+]
 
 
 @router.get("/auto-parse")
@@ -22,11 +48,14 @@ async def auto_parse_streams():
     API to start auto-parsing streams.
 
     Parses all streams for every game(category) in database.
+    Returns id of started job or id of the same job if it's already queued.
     """
 
-    await clear_streams_data()
-    await producer_send_one(auto_parse_all_streams)
-    return {"message": "Parsing started"}
+    job_id, created = await producer_send_unique(auto_parse_all_streams)
+    return {
+        "message": "Parsing started" if created else "Parsing already queued",
+        "job_id": job_id,
+    }
 
 
 @router.get("/parse")
@@ -56,7 +85,7 @@ async def parse_streams(
     - first (int, optional, max 100) - the maximum number of items to return per page in the response.
     """
 
-    await producer_send_one(
+    job_id, created = await producer_send_unique(
         parse_specific_streams,
         game_id,
         user_id,
@@ -66,21 +95,53 @@ async def parse_streams(
         before,
         language,
     )
-    return {"message": "Parsing started"}
+    return {
+        "message": "Parsing started" if created else "Parsing already queued",
+        "job_id": job_id,
+    }
 
 
 @router.get("/")
 @cache(expire=60)
-async def get_streams():
-    """
-    API to get all streams data.
+async def get_streams(
+    after: str = None,
+    limit: int = Query(100, ge=1, le=1000),
+    game_id: str = None,
+    language: str = None,
+    min_viewers: int = None,
+    type: str = None,
+):
     """
-    data = await get_streams_data()
+    API to get streams data by pages.
 
-    for item in data:
-        item["_id"] = str(item["_id"])
+    Returns page of streams and cursor of next page (`next_cursor`),
+    which is null on the last page.
 
-    return data
+    Args:
+    - after (str, optional) - cursor of page returned with previous page.
+    - limit (int, optional, max 1000) - the maximum number of streams in page.
+    - game_id (str, optional) - a game (category) ID used to filter streams.
+    - language (str, optional) - a language code used to filter streams.
+    - min_viewers (int, optional) - min number of viewers used to filter streams.
+    - type (str, optional) - a stream type (`live`) used to filter streams.
+    """
+    try:
+        after_id = decode_cursor(after) if after else None
+    except ValueError:
+        return {"error": "Invalid cursor"}
+
+    data, next_after = await get_streams_page(
+        after=after_id,
+        limit=limit,
+        game_id=game_id,
+        language=language,
+        min_viewers=min_viewers,
+        stream_type=type,
+    )
+    return {
+        "data": data,
+        "next_cursor": encode_cursor(next_after) if next_after else None,
+    }
 
 
 @router.get("/clear")
@@ -92,6 +153,23 @@ async def clear_categories():
     return {"message": f"Categories cleared ({count})"}
 
 
+@router.get("/export")
+async def export_streams(
+    format: Literal["ndjson", "csv"] = "ndjson", gzip: bool = False
+):
+    """
+    API to export all streams as file.
+
+    Streams are sent while they are read from database,
+    so export of full collection doesn't need pagination.
+
+    Args:
+    - format (str, optional) - file format (`ndjson` or `csv`).
+    - gzip (bool, optional) - compress file with gzip.
+    """
+    return export_response(get_streams_cursor(), "streams", STREAM_FIELDS, format, gzip)
+
+
 @router.get("/{stream_id}")
 @cache(expire=60)
 async def get_specific_stream(stream_id: int):
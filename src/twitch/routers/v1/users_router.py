@@ -1,16 +1,37 @@
-from fastapi import APIRouter
+from typing import Literal
+
+from fastapi import APIRouter, Query
 from fastapi_cache.decorator import cache
 
-from src.resources.kafka import producer_send_one
+from src.resources.queue import producer_send_unique
+from src.routers.export import export_response
+from src.routers.responses import MongoJSONRoute
+from src.twitch.utils import decode_cursor, encode_cursor
 from src.twitch.repository.users_repository import (
     clear_users_data,
     get_user_data,
-    get_users_data,
+    get_users_cursor,
+    get_users_page,
 )
 from src.twitch.services.users_services import auto_parse_all_users, parse_specific_user
 
 
-router = APIRouter()
+router = APIRouter(route_class=MongoJSONRoute)
+
+# Columns of users CSV export
+USER_FIELDS = [
+    "_id",
+    "id",
+    "login",
+    "display_name",
+    "type",
+    "broadcaster_type",
+    "description",
+    "profile_image_url",
+    "offline_image_url",
+    "view_count",
+    "created_at",
+]
 
 
 @router.get("/auto-parse")
@@ -18,11 +39,15 @@ router = APIRouter()
 async def parse_user():
     """
     API to start auto-parsing users of all streams in database.
+
+    Returns id of started job or id of the same job if it's already queued.
     """
 
-    await clear_users_data()
-    await producer_send_one(auto_parse_all_users)
-    return {"message": "Parsing started"}
+    job_id, created = await producer_send_unique(auto_parse_all_users)
+    return {
+        "message": "Parsing started" if created else "Parsing already queued",
+        "job_id": job_id,
+    }
 
 
 @router.get("/parse")
@@ -41,22 +66,44 @@ async def parse_user(
     if not user_id and not login:
         return {"error": "user_id or login must be specified"}
 
-    await producer_send_one(parse_specific_user, user_id, login)
-    return {"message": "Parsing started"}
+    job_id, created = await producer_send_unique(parse_specific_user, user_id, login)
+    return {
+        "message": "Parsing started" if created else "Parsing already queued",
+        "job_id": job_id,
+    }
 
 
 @router.get("/")
 @cache(expire=60)
-async def get_users():
-    """
-    API to get all users data.
+async def get_users(
+    after: str = None,
+    limit: int = Query(100, ge=1, le=1000),
+    broadcaster_type: str = None,
+):
     """
-    data = await get_users_data()
+    API to get users data by pages.
 
-    for item in data:
-        item["_id"] = str(item["_id"])
+    Returns page of users and cursor of next page (`next_cursor`),
+    which is null on the last page.
 
-    return data
+    Args:
+    - after (str, optional) - cursor of page returned with previous page.
+    - limit (int, optional, max 1000) - the maximum number of users in page.
+    - broadcaster_type (str, optional) - a broadcaster type (`partner`, `affiliate`)
+        used to filter users.
+    """
+    try:
+        after_id = decode_cursor(after) if after else None
+    except ValueError:
+        return {"error": "Invalid cursor"}
+
+    data, next_after = await get_users_page(
+        after=after_id, limit=limit, broadcaster_type=broadcaster_type
+    )
+    return {
+        "data": data,
+        "next_cursor": encode_cursor(next_after) if next_after else None,
+    }
 
 
 @router.get("/clear")
@@ -68,6 +115,21 @@ async def clear_users():
     return {"message": f"Users cleared ({count})"}
 
 
+@router.get("/export")
+async def export_users(format: Literal["ndjson", "csv"] = "ndjson", gzip: bool = False):
+    """
+    API to export all users as file.
+
+    Users are sent while they are read from database,
+    so export of full collection doesn't need pagination.
+
+    Args:
+    - format (str, optional) - file format (`ndjson` or `csv`).
+    - gzip (bool, optional) - compress file with gzip.
+    """
+    return export_response(get_users_cursor(), "users", USER_FIELDS, format, gzip)
+
+
 @router.get("/{identifier}")
 @cache(expire=60)
 async def get_specific_user(identifier: str):
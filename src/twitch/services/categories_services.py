@@ -1,16 +1,24 @@
 import asyncio
 
-from src.twitch.repository.categories_repository import insert_categories_data
+from src.twitch.repository.categories_repository import (
+    clear_categories_data,
+    insert_categories_data,
+)
 from src.twitch.utils import response_into_dict
-from src.main import get_twitch_client
+from src.twitch.dependencies import get_twitch_client
+from src.twitch.rate_limiter import PRIORITY_INTERACTIVE
+from src.resources.tasks import task
 
 
+@task("twitch.auto_parse_all_categories")
 async def auto_parse_all_categories():
     """
     Function to auto-parse all games(categories).
 
-    Makes requests with incremental page untill no categories returns.
+    Clears categories collection and makes requests
+    with incremental page untill no categories returns.
     """
+    await clear_categories_data()
     buffer_inserts = []
     twitch_client = await get_twitch_client()
 
@@ -39,6 +47,7 @@ async def auto_parse_all_categories():
         await asyncio.gather(*buffer_inserts)
 
 
+@task("twitch.parse_top_categories")
 async def parse_top_categories(first: int, after: str, before: str):
     """
     Function to parse top categories.
@@ -54,6 +63,7 @@ async def parse_top_categories(first: int, after: str, before: str):
         url_name="GET_TOP_GAMES",
         http_method="GET",
         query_params={"first": first, "after": after, "before": before},
+        priority=PRIORITY_INTERACTIVE,
     )
 
     data = await response_into_dict(response)
@@ -62,6 +72,7 @@ async def parse_top_categories(first: int, after: str, before: str):
         return {"inserted_ids": inserted_ids}
 
 
+@task("twitch.parse_category")
 async def parse_category(id: int, name: int, igdb_id: int):
     """
     Function to parse specific category by options.
@@ -77,6 +88,7 @@ async def parse_category(id: int, name: int, igdb_id: int):
         url_name="GET_GAMES",
         http_method="GET",
         query_params={"id": id, "name": name, "igdb_id": igdb_id},
+        priority=PRIORITY_INTERACTIVE,
     )
     data = await response_into_dict(response)
     if data:
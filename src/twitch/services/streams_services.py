@@ -1,28 +1,47 @@
 import asyncio
 
-from src.resources.kafka import producer_send_one
-from src.twitch.repository.categories_repository import get_categories_data
+from src.resources.queue import producer_send_many
+from src.twitch.repository.categories_repository import get_categories_page
 from src.twitch.utils import response_into_dict
-from src.twitch.repository.streams_repository import insert_streams_data
-from src.main import get_twitch_client
+from src.twitch.repository.streams_repository import (
+    clear_streams_data,
+    insert_streams_data,
+)
+from src.twitch.dependencies import get_twitch_client
+from src.twitch.rate_limiter import PRIORITY_INTERACTIVE
+from src.resources.tasks import task
 
 
+@task("twitch.auto_parse_all_streams")
 async def auto_parse_all_streams():
     """
     Function to start parsing streams of all games(categories).
 
-    Creates kafka task to parse subcategories for each parsed category.
+    Clears streams collection and creates task to parse streams
+    for each parsed category.
     """
-    categories = await get_categories_data()
-    for category in categories:
-        await producer_send_one(full_parse_specific_category, category)
+    await clear_streams_data()
+    after = None
+    while True:
+        categories, after = await get_categories_page(after=after, limit=1000)
+        await producer_send_many(
+            full_parse_specific_category,
+            [({"id": category["id"]},) for category in categories],
+            key=lambda category: category["id"],
+        )
+        if not after:
+            break
 
 
+@task("twitch.full_parse_specific_category")
 async def full_parse_specific_category(category: dict):
     """
     Function to parse all streams of specific game(category).
 
     Makes requests with incremental page untill no streams returns.
+
+    Args:
+    - category (dict) - category with its twitch `id`.
     """
     twitch_client = await get_twitch_client()
     buffer_inserts = []
@@ -64,6 +83,7 @@ async def full_parse_specific_category(category: dict):
         await asyncio.gather(*buffer_inserts)
 
 
+@task("twitch.parse_specific_streams")
 async def parse_specific_streams(
     game_id,
     user_id,
@@ -90,6 +110,7 @@ async def parse_specific_streams(
             "before": before,
             "language": language,
         },
+        priority=PRIORITY_INTERACTIVE,
     )
     data = await response_into_dict(response)
     await insert_streams_data(data)
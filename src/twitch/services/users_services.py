@@ -1,28 +1,35 @@
 import asyncio
 
-from src.twitch.repository.streams_repository import get_streams_data
-from src.twitch.repository.users_repository import insert_users_data
-from src.twitch.utils import divide_chunks, response_into_dict
-from src.main import get_twitch_client
-
-
+from src.twitch.repository.streams_repository import get_streams_page
+from src.twitch.repository.users_repository import (
+    clear_users_data,
+    insert_users_data,
+)
+from src.twitch.utils import response_into_dict
+from src.twitch.dependencies import get_twitch_client
+from src.twitch.rate_limiter import PRIORITY_INTERACTIVE
+from src.resources.tasks import task
+
+
+@task("twitch.auto_parse_all_users")
 async def auto_parse_all_users():
     """
     Function to auto-parse all users info of streams in database.
 
-    Parses users' info by sending requests with chunks of users' ids.
+    Clears users collection and parses users' info
+    by sending requests with users' ids of pages of 100 streams.
     """
+    await clear_users_data()
     twitch_client = await get_twitch_client()
     buffer_inserts = []
 
-    streams = await get_streams_data()
+    after = None
+    while True:
+        streams, after = await get_streams_page(after=after, limit=100)
+        if not streams:
+            break
 
-    users_ids = [stream["user_id"] for stream in streams]
-    chunk = 100
-    splited_ids = list(divide_chunks(users_ids, chunk))
-
-    for ids_chunk in splited_ids:
-        query_params = [("id", user_id) for user_id in ids_chunk]
+        query_params = [("id", stream["user_id"]) for stream in streams]
         response = await twitch_client.make_request(
             url_name="GET_USER",
             http_method="GET",
@@ -32,9 +39,13 @@ async def auto_parse_all_users():
         if data:
             buffer_inserts.append(insert_users_data(data))
 
+        if not after:
+            break
+
     await asyncio.gather(*buffer_inserts)
 
 
+@task("twitch.parse_specific_user")
 async def parse_specific_user(user_id: str, login: str):
     """
     Function to start parsing user by its user_id or login.
@@ -45,6 +56,7 @@ async def parse_specific_user(user_id: str, login: str):
         url_name="GET_USER",
         http_method="GET",
         query_params={"id": user_id, "login": login},
+        priority=PRIORITY_INTERACTIVE,
     )
     data = await response_into_dict(response)
     await insert_users_data(data)
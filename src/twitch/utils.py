@@ -1,5 +1,10 @@
+import base64
+import binascii
 from datetime import datetime
 
+from bson import ObjectId
+from bson.errors import InvalidId
+
 
 async def response_into_dict(response) -> dict:
     """
@@ -28,3 +33,22 @@ def divide_chunks(l, n):
     """
     for i in range(0, len(l), n):
         yield l[i : i + n]
+
+
+def encode_cursor(object_id: ObjectId) -> str:
+    """
+    Function to encode `_id` of last item of page into opaque cursor of next page.
+    """
+    return base64.urlsafe_b64encode(object_id.binary).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> ObjectId:
+    """
+    Function to decode cursor of page into `_id` of last item of previous page.
+
+    Raises ValueError if cursor is invalid.
+    """
+    try:
+        return ObjectId(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, InvalidId, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
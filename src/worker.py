@@ -0,0 +1,205 @@
+"""
+Parsing worker.
+
+Consumes parsing tasks from queue broker separately from API processes.
+
+Usage:
+    python -m src.worker --concurrency 8 --processes 4
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import time
+from contextlib import asynccontextmanager
+
+from src.config import settings
+from src.lamoda.utils import http_client as lamoda_http_client
+from src.resources.bulk_writer import close_bulk_writers
+from src.resources.indexes import ensure_indexes
+from src.resources.process_pool import configure_process_pool, shutdown_process_pool
+from src.resources.stats import print_process_stats
+from src.resources.queue import (
+    get_queue_backend,
+    run_consumer,
+    run_retry_consumer,
+    start_producer,
+    stop_producer,
+)
+from src.twitch.client import http_client as twitch_http_client
+
+
+@asynccontextmanager
+async def lifespan():
+    """
+    Worker initialization and termination logic.
+
+    - ensures indexes declared by repositories,
+    - starts shared queue producer used by tasks fan-out,
+    - writes buffered Mongo writes on shutdown,
+    - flushes and stops queue producer on shutdown,
+    - closes shared HTTP clients of Lamoda and Twitch on shutdown,
+    - stops parsing process pool on shutdown.
+    """
+    await ensure_indexes()
+    await start_producer()
+    try:
+        yield
+    finally:
+        await close_bulk_writers()
+        await stop_producer()
+        await lamoda_http_client.close()
+        await twitch_http_client.close()
+        shutdown_process_pool()
+
+
+async def report_stats(interval: float):
+    """
+    Function to print statistics of worker process every `interval` seconds.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        print_process_stats()
+
+
+async def run_worker(concurrency: int, stats_interval: float = 0):
+    """
+    Function to run queue consumers of parsing and retry topics
+    until SIGINT or SIGTERM received.
+
+    Running tasks are awaited and their offsets are committed before exit.
+    Process statistics are printed every `stats_interval` seconds and on exit.
+    Only the first signal stops worker, repeated signals are ignored,
+    so they don't interrupt writing buffered data and committing offsets.
+    """
+    loop = asyncio.get_running_loop()
+    consumer_task = asyncio.current_task()
+
+    def stop():
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, lambda: None)
+        consumer_task.cancel()
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop)
+
+    async with lifespan():
+        consumers = [run_consumer(concurrency), run_retry_consumer()]
+        if stats_interval:
+            consumers.append(report_stats(stats_interval))
+        try:
+            await asyncio.gather(*consumers)
+        except asyncio.CancelledError:
+            pass
+        print_process_stats()
+
+
+def start_worker(
+    concurrency: int, stats_interval: float = 0, parse_processes: int = None
+):
+    """
+    Entry point of single worker process.
+
+    Args:
+    - concurrency (int) - max amount of concurrent tasks.
+    - stats_interval (float, optional) - seconds between printing statistics.
+    - parse_processes (int, optional) - amount of parsing processes of worker,
+        `lamoda_parse_processes` setting by default.
+    """
+    if parse_processes is not None:
+        configure_process_pool(parse_processes)
+    asyncio.run(run_worker(concurrency, stats_interval))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parsing tasks worker.")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.kafka_consumer_concurrency,
+        help="max amount of concurrent tasks per process",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=os.cpu_count(),
+        help="amount of worker processes",
+    )
+    parser.add_argument(
+        "--stats-interval",
+        type=float,
+        default=60,
+        help="seconds between printing process statistics, 0 to disable",
+    )
+    parser.add_argument(
+        "--parse-processes",
+        type=int,
+        default=settings.lamoda_parse_processes,
+        help="amount of parsing processes per worker process, "
+        "CPUs are shared between worker processes by default",
+    )
+    parser.add_argument(
+        "--stop-timeout",
+        type=float,
+        default=30,
+        help="seconds to wait for worker processes to stop after SIGINT "
+        "before sending SIGTERM to them",
+    )
+    args = parser.parse_args()
+
+    if get_queue_backend().in_process:
+        parser.error(
+            f"'{settings.queue_backend}' queue backend is consumed by API process."
+        )
+
+    if args.processes <= 1:
+        start_worker(args.concurrency, args.stats_interval, args.parse_processes)
+        return
+
+    parse_processes = args.parse_processes
+    if parse_processes is None:
+        parse_processes = max(1, (os.cpu_count() or 1) // args.processes)
+
+    processes = [
+        multiprocessing.Process(
+            target=start_worker,
+            args=(args.concurrency, args.stats_interval, parse_processes),
+            name=f"worker-{i}",
+        )
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+
+    received = []
+
+    def stop(signum, frame):
+        if not received:
+            received.append((signum, time.monotonic()))
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    terminated = False
+    while True:
+        alive = [process for process in processes if process.is_alive()]
+        if not alive:
+            break
+
+        if received and not terminated:
+            signum, received_at = received[0]
+            # Ctrl+C sends SIGINT to worker processes too,
+            # they are terminated only if they haven't stopped within timeout
+            if (
+                signum == signal.SIGTERM
+                or time.monotonic() - received_at > args.stop_timeout
+            ):
+                for process in alive:
+                    process.terminate()
+                terminated = True
+        alive[0].join(timeout=0.5)
+
+
+if __name__ == "__main__":
+    main()
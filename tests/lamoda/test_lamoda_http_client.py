@@ -0,0 +1,53 @@
+import asyncio
+
+import httpx
+
+import src.lamoda.utils as utils
+from src.resources.http_client import PooledHttpClient
+
+
+class TestLamodaHttpClient:
+    """
+    Tests shared HTTP client of Lamoda pages.
+    """
+
+    def test_connections_are_reused(self, monkeypatch, local_server):
+        """
+        Checking whether page fetches reuse connection of shared client.
+        """
+        monkeypatch.setattr(utils, "http_client", PooledHttpClient("lamoda"))
+
+        async def scenario():
+            try:
+                for page in range(1, 6):
+                    response = await utils._get(utils.get_page_url(local_server, page))
+                    assert response.status_code == 200
+            finally:
+                await utils.http_client.close()
+
+        asyncio.run(scenario())
+
+        stats = utils.http_client.stats()
+        assert stats["requests"] == 5
+        assert stats["connections"] == 1
+        assert stats["reuse_rate"] == 0.8
+
+    def test_not_modified_page_is_touched_in_cache(self, monkeypatch):
+        """
+        Checking whether cached page isn't expired while page is not modified.
+        """
+        touched = []
+
+        async def _get(url, headers=None):
+            return httpx.Response(304)
+
+        async def touch_cached_page(url):
+            touched.append(url)
+
+        monkeypatch.setattr(utils, "_get", _get)
+        monkeypatch.setattr(utils, "touch_cached_page", touch_cached_page)
+
+        page = asyncio.run(utils.get_html_page("url", etag="etag"))
+
+        assert page.text is None
+        assert touched == ["url"]
@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+pytest.importorskip("zstandard")
+
+from src.lamoda.page_cache import PageCache
+
+
+def count_objects(cache: PageCache) -> int:
+    return sum(
+        len(files) for _, _, files in os.walk(os.path.join(cache.directory, "objects"))
+    )
+
+
+class TestPageCache:
+    """
+    Tests on-disk cache of raw pages.
+    """
+
+    def test_roundtrip(self, tmp_path):
+        """
+        Checking whether stored page is returned by its url.
+        """
+        cache = PageCache(str(tmp_path), ttl=60, max_size=10**6)
+        cache.put("https://lamoda/c/1/?page=1", "<html>Кеды</html>")
+
+        assert cache.get("https://lamoda/c/1/?page=1") == "<html>Кеды</html>"
+        assert cache.get("https://lamoda/c/1/?page=2") is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_same_content_is_stored_once(self, tmp_path):
+        """
+        Checking whether pages with same content share one stored object.
+        """
+        cache = PageCache(str(tmp_path), ttl=60, max_size=10**6)
+        cache.put("url-1", "<html>same</html>")
+        cache.put("url-2", "<html>same</html>")
+        assert count_objects(cache) == 1
+
+        cache.put("url-1", "<html>changed</html>")
+        cache.put("url-2", "<html>changed too</html>")
+        assert count_objects(cache) == 2
+
+    def test_expired_page(self, tmp_path):
+        """
+        Checking whether page isn't returned after its ttl.
+        """
+        cache = PageCache(str(tmp_path), ttl=-1, max_size=10**6)
+        cache.put("url", "<html></html>")
+
+        assert cache.get("url") is None
+        assert count_objects(cache) == 0
+
+    def test_touched_page_isnt_expired(self, tmp_path):
+        """
+        Checking whether touched page is stored again for its ttl.
+        """
+        cache = PageCache(str(tmp_path), ttl=60, max_size=10**6)
+        cache.put("url", "<html></html>")
+        cache._db.execute("UPDATE pages SET stored_at = stored_at - 120")
+
+        cache.touch("url")
+
+        assert cache.get("url") == "<html></html>"
+
+    def test_least_recently_used_pages_are_evicted(self, tmp_path):
+        """
+        Checking whether least recently used pages are evicted above max size.
+        """
+        cache = PageCache(str(tmp_path), ttl=60, max_size=10**6)
+        for i in range(5):
+            cache.put(f"url-{i}", os.urandom(2000).hex())
+        cache.get("url-0")
+
+        size = cache._db.execute("SELECT MAX(size) FROM objects").fetchone()[0]
+        cache.max_size = 3 * size
+        cache.evict()
+
+        assert cache.get("url-0") is not None
+        assert cache.get("url-4") is not None
+        assert cache.get("url-1") is None
+        assert cache.get("url-2") is None
+        assert cache.stats()["evicted"] == 2
@@ -0,0 +1,74 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from src.lamoda.parsers import LexborHTMLParser, get_parser
+
+
+DATA_DIR = Path(__file__).parent / "data"
+
+PARSER_NAMES = [
+    "soup",
+    pytest.param(
+        "selectolax",
+        marks=pytest.mark.skipif(
+            LexborHTMLParser is None, reason="selectolax is not installed"
+        ),
+    ),
+]
+
+
+def read_page(name: str) -> str:
+    return (DATA_DIR / f"{name}.html").read_text(encoding="utf-8")
+
+
+def read_golden(name: str):
+    return json.loads((DATA_DIR / f"{name}.json").read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize("parser_name", PARSER_NAMES)
+class TestLamodaParsers:
+    """
+    Tests that every parser backend extracts the same data from golden pages.
+    """
+
+    def test_parse_categories(self, parser_name):
+        """
+        Checking categories extracted from main category page.
+        """
+        parser = get_parser(parser_name)
+        categories = parser.parse_categories(read_page("main_category_page"))
+        assert categories == read_golden("main_categories")
+
+    def test_parse_subcategories(self, parser_name):
+        """
+        Checking subcategories extracted from navigation subtree.
+        """
+        parser = get_parser(parser_name)
+        subcategories = parser.parse_subcategories(read_page("subcategory_page"))
+        assert subcategories == read_golden("subcategories")
+
+    def test_parse_products(self, parser_name):
+        """
+        Checking products extracted from product cards.
+        """
+        parser = get_parser(parser_name)
+        products = parser.parse_products(read_page("subcategory_page"))
+        assert products == read_golden("subcategory_products")
+
+    def test_empty_page(self, parser_name):
+        """
+        Checking whether page without data gives no items.
+        """
+        parser = get_parser(parser_name)
+        assert parser.parse_products("<html><body></body></html>") == []
+        assert parser.parse_subcategories("<html><body></body></html>") == []
+
+
+def test_unsupported_parser():
+    """
+    Checking whether unknown parser name is rejected.
+    """
+    with pytest.raises(ValueError):
+        get_parser("lxml")
@@ -0,0 +1,210 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from src.config import settings
+from src.exceptions.exc_types import LamodaCategoriesNotFoundException
+from src.lamoda import repository
+
+
+def subcategory(slug: str, categories: list = None) -> dict:
+    data = {"_id": ObjectId(), "name": slug, "slug": slug, "link": f"/c/{slug}/"}
+    if categories is not None:
+        data["categories"] = categories
+    return data
+
+
+CATEGORIES = [
+    {
+        "_id": ObjectId(),
+        "category": "men",
+        "categories": [
+            subcategory("shoes", [subcategory("boots"), subcategory("sneakers")]),
+            subcategory("bags", [subcategory("backpacks")]),
+            subcategory("hats"),
+        ],
+    },
+    {
+        "_id": ObjectId(),
+        "category": "women",
+        "categories": [subcategory("shoes", [subcategory("heels")])],
+    },
+]
+PRODUCTS = [
+    {
+        "_id": ObjectId(),
+        "subcategory_id": CATEGORIES[0]["categories"][0]["categories"][0]["_id"],
+        "category": "men",
+        "subcategory_slug": "shoes",
+        "low_subcategory_slug": "boots",
+        "product_number": "MP001",
+        "title": "Boots",
+    }
+]
+
+
+async def find_subcategories(category: str, subcategory_slug: str):
+    """
+    Previous lookup of subcategory: positional projection of whole subcategory.
+    """
+    parent = await repository.db.find_one(
+        {"$and": [{"category": category}, {"categories.slug": subcategory_slug}]},
+        {"categories.$": 1},
+    )
+    if not parent:
+        category = await repository.get_specific_category(category)
+        subcategories = [c["slug"] for c in category.get("categories", [])]
+        raise LamodaCategoriesNotFoundException(
+            message=f"Subcategory '{subcategory_slug}' not found", details=subcategories
+        )
+    return parent["categories"][0].get("categories")
+
+
+async def find_lowest_subcategory(
+    category: str, subcategory_slug: str, low_subcategory_slug: str
+):
+    """
+    Previous lookup of low-level subcategory: loop over all subcategories.
+    """
+    subcategories = await find_subcategories(category, subcategory_slug) or []
+    for category in subcategories:
+        if category["slug"] == low_subcategory_slug:
+            return category
+
+    raise LamodaCategoriesNotFoundException(
+        message=f"Subcategory '{low_subcategory_slug}' not found",
+        details=[c["slug"] for c in subcategories],
+    )
+
+
+async def find_product_info(
+    category: str, subcategory_slug: str, low_subcategory_slug: str, product: str
+):
+    """
+    Previous lookup of product checked by previous lookup of low-level subcategory.
+    """
+    item = await repository.db_lamoda_products.find_one(
+        {
+            "category": category,
+            "subcategory_slug": subcategory_slug,
+            "low_subcategory_slug": low_subcategory_slug,
+            "product_number": product,
+        },
+        repository.PRODUCT_HIDDEN_FIELDS,
+    )
+    if not item:
+        await find_lowest_subcategory(category, subcategory_slug, low_subcategory_slug)
+    return item
+
+
+@pytest.fixture(scope="module")
+def database_name():
+    client = MongoClient(str(settings.mongo_dsn), serverSelectionTimeoutMS=500)
+    try:
+        client.admin.command("ping")
+    except PyMongoError:
+        pytest.skip("MongoDB isn't available")
+
+    database = client[f"test_lamoda_repository_{ObjectId()}"]
+    database[repository.db.name].insert_many(CATEGORIES)
+    database[repository.db_lamoda_products.name].insert_many(PRODUCTS)
+    yield database.name
+    client.drop_database(database.name)
+    client.close()
+
+
+@pytest.fixture
+def lookup(monkeypatch, database_name):
+    """
+    Returns function which runs current and previous lookups with the same args
+    and returns their results or raised not found exceptions.
+    """
+
+    async def call(function, args):
+        try:
+            return await function(*args)
+        except LamodaCategoriesNotFoundException as e:
+            return {"message": e.message, "details": e.details}
+
+    async def scenario(function, previous_function, args):
+        client = AsyncIOMotorClient(str(settings.mongo_dsn))
+        database = client[database_name]
+        monkeypatch.setattr(repository, "db", database[repository.db.name])
+        monkeypatch.setattr(
+            repository,
+            "db_lamoda_products",
+            database[repository.db_lamoda_products.name],
+        )
+        try:
+            return await call(function, args), await call(previous_function, args)
+        finally:
+            client.close()
+
+    return lambda *args: asyncio.run(scenario(*args))
+
+
+class TestLamodaRepositoryReads:
+    """
+    Tests server-side selection of Lamoda categories against previous lookups.
+    """
+
+    @pytest.mark.parametrize(
+        "args",
+        [
+            ("men", "shoes"),
+            ("women", "shoes"),
+            ("men", "hats"),
+            ("men", "unknown"),
+            ("unknown", "shoes"),
+        ],
+    )
+    def test_get_subcategories(self, lookup, args):
+        """
+        Checking whether nested subcategories and not found errors are the same.
+        """
+        result, previous = lookup(
+            repository.get_subcategories, find_subcategories, args
+        )
+
+        assert result == previous
+
+    @pytest.mark.parametrize(
+        "args",
+        [
+            ("men", "shoes", "sneakers"),
+            ("women", "shoes", "heels"),
+            ("men", "shoes", "heels"),
+            ("men", "hats", "caps"),
+            ("men", "unknown", "boots"),
+        ],
+    )
+    def test_get_lowest_subcategory(self, lookup, args):
+        """
+        Checking whether low-level subcategory and not found errors are the same.
+        """
+        result, previous = lookup(
+            repository._get_lowest_subcategory, find_lowest_subcategory, args
+        )
+
+        assert result == previous
+
+    @pytest.mark.parametrize(
+        "args",
+        [
+            ("men", "shoes", "boots", "MP001"),
+            ("men", "shoes", "boots", "MP002"),
+            ("men", "shoes", "heels", "MP001"),
+            ("men", "unknown", "boots", "MP001"),
+        ],
+    )
+    def test_get_product_info(self, lookup, args):
+        """
+        Checking whether product, missing product and not found errors are the same.
+        """
+        result, previous = lookup(repository.get_product_info, find_product_info, args)
+
+        assert result == previous
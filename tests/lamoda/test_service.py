@@ -0,0 +1,364 @@
+import asyncio
+
+from bson import ObjectId
+
+from src.lamoda import service
+from src.lamoda.service import get_removed_categories, merge_categories
+from src.lamoda.utils import HtmlPage, get_items_hash
+
+
+def category(link: str, amount: str) -> dict:
+    return {"name": link, "link": link, "amount": amount, "slug": link}
+
+
+def has_products(category: dict) -> bool:
+    return bool(category.get("products"))
+
+
+class TestMergeCategories:
+    """
+    Tests merging of parsed categories with saved ones.
+    """
+
+    def test_saved_categories_keep_id_and_nested_data(self):
+        """
+        Checking whether unchanged category keeps its data and isn't parsed further.
+        """
+        saved = [{"_id": ObjectId(), **category("a", "10"), "products": [{"x": 1}]}]
+
+        merged, changed = merge_categories(
+            [category("a", "10")], saved, full=False, is_parsed=has_products
+        )
+
+        assert merged == saved
+        assert changed == []
+
+    def test_new_and_changed_categories(self):
+        """
+        Checking whether new categories are fully parsed and changed ones are parsed.
+        """
+        saved = [{"_id": ObjectId(), **category("a", "10"), "products": [{"x": 1}]}]
+
+        merged, changed = merge_categories(
+            [category("a", "11"), category("b", "5")],
+            saved,
+            full=False,
+            is_parsed=has_products,
+        )
+
+        assert merged[0]["_id"] == saved[0]["_id"]
+        assert merged[0]["amount"] == "11"
+        assert [(item["link"], full) for item, full in changed] == [
+            ("a", False),
+            ("b", True),
+        ]
+
+    def test_full_parses_all_categories(self):
+        """
+        Checking whether all categories are parsed if `full` is set.
+        """
+        saved = [{"_id": ObjectId(), **category("a", "10"), "products": [{"x": 1}]}]
+
+        _, changed = merge_categories(
+            [category("a", "10")], saved, full=True, is_parsed=has_products
+        )
+
+        assert [(item["link"], full) for item, full in changed] == [("a", True)]
+
+
+class TestRemovedCategories:
+    """
+    Tests cleanup of subcategories removed from site.
+    """
+
+    def test_removed_categories_with_nested(self):
+        """
+        Checking whether missing categories are returned with their nested categories.
+        """
+        nested = {"_id": ObjectId(), **category("a-1", "5")}
+        saved = [
+            {"_id": ObjectId(), **category("a", "10"), "categories": [nested]},
+            {"_id": ObjectId(), **category("b", "10")},
+        ]
+
+        merged, _ = merge_categories(
+            [category("b", "10")], saved, full=False, is_parsed=has_products
+        )
+
+        assert get_removed_categories(merged, saved) == [saved[0], nested]
+        assert get_removed_categories(merged, None) == []
+
+    def test_products_of_removed_subcategories_are_deleted(self, monkeypatch):
+        """
+        Checking whether parsing of subcategory deletes data of missing subcategories.
+        """
+        kept = {"_id": ObjectId(), **category("kept", "10")}
+        removed = {"_id": ObjectId(), **category("removed", "10")}
+        deleted = []
+
+        async def fetch_pages(urls, counters, full, conditional=True):
+            return [(HtmlPage(urls[0], "html"), {})]
+
+        async def extract(method, pages):
+            return [[category("kept", "10")]]
+
+        async def get_category_by_id(object_id):
+            return {"_id": object_id, "categories": [kept, removed]}
+
+        async def get_subcategories_with_products(subcategory_ids):
+            return set(subcategory_ids)
+
+        async def delete_subcategories_data(subcategories):
+            deleted.extend(subcategories)
+
+        async def noop(*args, **kwargs):
+            pass
+
+        for function in (
+            fetch_pages,
+            extract,
+            get_category_by_id,
+            get_subcategories_with_products,
+            delete_subcategories_data,
+        ):
+            monkeypatch.setattr(service, function.__name__, function)
+        for name in ("update_category_by_id", "save_fingerprint", "producer_send_many"):
+            monkeypatch.setattr(service, name, noop)
+
+        asyncio.run(service.parse_subcategory({"_id": ObjectId(), "link": "link"}))
+
+        assert deleted == [removed]
+
+
+class TestReparseFromCache:
+    """
+    Tests parsing of products from cached pages.
+    """
+
+    def test_uncached_page_keeps_products(self, monkeypatch):
+        """
+        Checking whether reparse stops at uncached page without deleting products
+        and deletes products only after cached page without products.
+        """
+        cached = {"link?page=1": "p1", "link?page=2": "p2", "link?page=3": "p3"}
+        written = []
+        deleted = []
+
+        async def get_cached_page(url):
+            return cached.get(url)
+
+        async def extract(method, pages):
+            return [[{"product_number": page}] if page else [] for page in pages]
+
+        async def insert_product_items(items, subcategory, page):
+            written.append(page)
+
+        async def delete_product_items(subcategory_id, from_page):
+            deleted.append(from_page)
+
+        for function in (
+            get_cached_page,
+            extract,
+            insert_product_items,
+            delete_product_items,
+        ):
+            monkeypatch.setattr(service, function.__name__, function)
+
+        def reparse(window):
+            written.clear()
+            deleted.clear()
+            monkeypatch.setattr(service.settings, "lamoda_pagination_window", window)
+            asyncio.run(
+                service.reparse_subcategory_from_cache(
+                    {"_id": ObjectId(), "link": "link"}
+                )
+            )
+
+        for window in (2, 3):
+            reparse(window)
+            assert written == [1, 2, 3]
+            assert deleted == []
+
+        # first page is expired
+        del cached["link?page=1"]
+        reparse(2)
+        assert written == []
+        assert deleted == []
+
+        cached["link?page=1"] = "p1"
+        cached["link?page=4"] = ""
+        for window in (2, 3):
+            reparse(window)
+            assert written == [1, 2, 3]
+            assert deleted == [4]
+
+
+class TestIncrementalProducts:
+    """
+    Tests that only changed pages of subcategory are rewritten.
+    """
+
+    def test_unchanged_pages_are_skipped(self, monkeypatch):
+        """
+        Checking counters and writes of not modified, same and changed pages.
+        """
+        products = {
+            1: [{"product_number": "1"}],
+            2: [{"product_number": "2"}],
+            3: [{"product_number": "3-new"}],
+            4: [],
+        }
+        fingerprints = {
+            "link?page=1": {"etag": "e1", "hash": "old"},
+            "link?page=2": {"hash": get_items_hash(products[2])},
+            "link?page=3": {"hash": "old"},
+        }
+        written = []
+        deleted = []
+        counters = {}
+
+        async def get_fingerprints(urls):
+            return {url: fingerprints[url] for url in urls if url in fingerprints}
+
+        async def get_html_page(url, etag=None, last_modified=None):
+            if etag:
+                return HtmlPage(url, None, etag)
+            return HtmlPage(url, url)
+
+        async def extract(method, pages):
+            return [products[int(page.split("=")[-1])] for page in pages]
+
+        async def insert_product_items(items, subcategory, page):
+            written.append(page)
+
+        async def save_fingerprint(page, items_hash):
+            pass
+
+        async def delete_product_items(subcategory_id, from_page):
+            deleted.append(from_page)
+
+        async def update_run_counters(run_id, run_counters):
+            counters.update(run_counters)
+
+        for function in (
+            get_fingerprints,
+            get_html_page,
+            extract,
+            insert_product_items,
+            save_fingerprint,
+            delete_product_items,
+            update_run_counters,
+        ):
+            monkeypatch.setattr(service, function.__name__, function)
+        monkeypatch.setattr(service.settings, "lamoda_pagination_window", 2)
+
+        asyncio.run(
+            service.parse_marketplace_items(
+                {"_id": ObjectId(), "link": "link", "run_id": ObjectId()}
+            )
+        )
+
+        assert written == [3]
+        assert deleted == [4]
+        assert counters == {"fetched": 3, "skipped": 2, "rewritten": 1}
+
+
+class TestWindowedPagination:
+    """
+    Tests fetching subcategory pages by windows.
+    """
+
+    def parse(self, monkeypatch, subcategory: dict, products: dict) -> tuple:
+        """
+        Parses subcategory with stubbed pages, returns numbers of fetched windows,
+        written pages and pages from which products are deleted.
+        """
+        windows = []
+        written = []
+        deleted = []
+
+        async def fetch_pages(urls, counters, full):
+            windows.append([int(url.split("=")[-1]) for url in urls])
+            return [(HtmlPage(url, url), {}) for url in urls]
+
+        async def extract(method, pages):
+            return [products.get(int(page.split("=")[-1]), []) for page in pages]
+
+        async def insert_product_items(items, subcategory, page):
+            written.append(page)
+
+        async def delete_product_items(subcategory_id, from_page):
+            deleted.append(from_page)
+
+        async def save_fingerprint(page, items_hash):
+            pass
+
+        for function in (
+            fetch_pages,
+            extract,
+            insert_product_items,
+            delete_product_items,
+            save_fingerprint,
+        ):
+            monkeypatch.setattr(service, function.__name__, function)
+        monkeypatch.setattr(service.settings, "lamoda_pagination_window", 4)
+        monkeypatch.setattr(service.settings, "lamoda_page_size", 60)
+
+        asyncio.run(
+            service.parse_marketplace_items(
+                {"_id": ObjectId(), "link": "link", **subcategory}
+            )
+        )
+        return windows, written, deleted
+
+    def test_estimate_pages_count(self, monkeypatch):
+        """
+        Checking whether pages count is estimated by amount of products.
+        """
+        monkeypatch.setattr(service.settings, "lamoda_page_size", 60)
+
+        assert service.estimate_pages_count("1 234 товара") == 21
+        assert service.estimate_pages_count("60") == 1
+        assert service.estimate_pages_count(None) == 0
+        assert service.estimate_pages_count("") == 0
+
+    def test_estimated_pages_are_fetched_by_windows(self, monkeypatch):
+        """
+        Checking whether windows end at estimated page count and last page is probed.
+        """
+        products = {number: [{"product_number": str(number)}] for number in range(1, 7)}
+
+        windows, written, deleted = self.parse(monkeypatch, {"amount": "360"}, products)
+
+        assert windows == [[1, 2, 3, 4], [5, 6], [7]]
+        assert written == [1, 2, 3, 4, 5, 6]
+        assert deleted == [7]
+
+    def test_pages_after_underestimate_are_probed(self, monkeypatch):
+        """
+        Checking whether pages after estimated count are fetched one by one.
+        """
+        products = {number: [{"product_number": str(number)}] for number in range(1, 5)}
+
+        windows, written, deleted = self.parse(monkeypatch, {"amount": "120"}, products)
+
+        assert windows == [[1, 2], [3], [4], [5]]
+        assert written == [1, 2, 3, 4]
+        assert deleted == [5]
+
+    def test_empty_page_inside_window(self, monkeypatch):
+        """
+        Checking whether parsing stops at first empty page of window
+        and products are deleted from it.
+        """
+        products = {
+            1: [{"product_number": "1"}],
+            2: [{"product_number": "2"}],
+            4: [{"product_number": "4"}],
+        }
+
+        windows, written, deleted = self.parse(monkeypatch, {}, products)
+
+        assert windows == [[1, 2, 3, 4]]
+        assert written == [1, 2]
+        assert deleted == [3]
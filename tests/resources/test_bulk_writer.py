@@ -0,0 +1,161 @@
+import asyncio
+
+from pymongo import InsertOne
+from pymongo.errors import BulkWriteError
+
+from src.resources.bulk_writer import BulkWriter
+
+
+class Collection:
+    def __init__(self, delay: float = 0, error: Exception = None, failed=()):
+        self.delay = delay
+        self.error = error
+        self.failed = set(failed)
+        self.batches = []
+
+    async def bulk_write(self, requests, ordered=True):
+        assert not ordered
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+
+        numbers = [request._doc["n"] for request in requests]
+        self.batches.append([n for n in numbers if n not in self.failed])
+        write_errors = [
+            {"index": index, "code": 11000, "errmsg": "duplicate key"}
+            for index, n in enumerate(numbers)
+            if n in self.failed
+        ]
+        if write_errors:
+            raise BulkWriteError({"writeErrors": write_errors, "nInserted": 0})
+
+
+def make_writer(collection, batch_size=100, flush_interval=0.01, max_pending=1000):
+    return BulkWriter(
+        collection,
+        batch_size=batch_size,
+        flush_interval=flush_interval,
+        max_pending=max_pending,
+    )
+
+
+def inserts(*numbers):
+    return [InsertOne({"n": n}) for n in numbers]
+
+
+class TestBulkWriter:
+    """
+    Tests coalescing of writes to collection.
+    """
+
+    def test_concurrent_writes_are_coalesced(self):
+        """
+        Checking whether writes of concurrent tasks are written by one bulk write.
+        """
+        collection = Collection()
+        writer = make_writer(collection)
+
+        async def scenario():
+            await asyncio.gather(*(writer.write(inserts(n)) for n in range(5)))
+            await writer.close()
+
+        asyncio.run(scenario())
+        assert collection.batches == [[0, 1, 2, 3, 4]]
+        assert writer.stats()["batches"] == 1
+
+    def test_full_batch_is_written_before_interval(self):
+        """
+        Checking whether batch is split by size and flushed without waiting.
+        """
+        collection = Collection()
+        writer = make_writer(collection, batch_size=2, flush_interval=10)
+
+        async def scenario():
+            await asyncio.wait_for(writer.write(inserts(0, 1, 2, 3)), 1)
+            await writer.close()
+
+        asyncio.run(scenario())
+        assert collection.batches == [[0, 1], [2, 3]]
+
+    def test_writers_wait_for_free_space(self):
+        """
+        Checking whether pending requests don't exceed `max_pending`.
+        """
+        collection = Collection(delay=0.01)
+        writer = make_writer(collection, batch_size=2, max_pending=2)
+        pending = []
+
+        async def write(n):
+            await writer.write(inserts(n))
+            pending.append(writer.stats()["pending"])
+
+        async def scenario():
+            await asyncio.gather(*(write(n) for n in range(6)))
+            await writer.close()
+
+        asyncio.run(scenario())
+        assert max(pending) <= 2
+        assert sum(collection.batches, []) == list(range(6))
+        assert writer.stats()["waits"] > 0
+
+    def test_error_is_raised_in_writers(self):
+        """
+        Checking whether failed bulk write raises its error in all writers of batch.
+        """
+        collection = Collection(error=BulkWriteError({"writeErrors": []}))
+        writer = make_writer(collection)
+
+        async def scenario():
+            results = await asyncio.gather(
+                writer.write(inserts(0)),
+                writer.write(inserts(1)),
+                return_exceptions=True,
+            )
+            await writer.close()
+            return results
+
+        results = asyncio.run(scenario())
+        assert all(isinstance(result, BulkWriteError) for result in results)
+        assert writer.stats()["errors"] == 1
+
+    def test_error_is_raised_only_in_writers_of_failed_requests(self):
+        """
+        Checking whether failed request of batch doesn't fail other writers.
+        """
+        collection = Collection(failed={2})
+        writer = make_writer(collection)
+
+        async def scenario():
+            results = await asyncio.gather(
+                writer.write(inserts(0)),
+                writer.write(inserts(1, 2)),
+                writer.write(inserts(3)),
+                return_exceptions=True,
+            )
+            await writer.close()
+            return results
+
+        first, second, third = asyncio.run(scenario())
+        assert first is None and third is None
+        assert isinstance(second, BulkWriteError)
+        assert second.details["writeErrors"] == [
+            {"index": 1, "code": 11000, "errmsg": "duplicate key"}
+        ]
+        assert collection.batches == [[0, 1, 3]]
+        assert writer.stats()["errors"] == 1
+
+    def test_close_writes_buffered_requests(self):
+        """
+        Checking whether close writes requests without waiting for interval.
+        """
+        collection = Collection()
+        writer = make_writer(collection, flush_interval=10)
+
+        async def scenario():
+            write = asyncio.create_task(writer.write(inserts(0)))
+            await asyncio.sleep(0)
+            await writer.close()
+            await asyncio.wait_for(write, 1)
+
+        asyncio.run(scenario())
+        assert collection.batches == [[0]]
@@ -0,0 +1,103 @@
+import pytest
+from bson import ObjectId
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from src.config import settings
+from src.resources.indexes import get_declared_indexes
+
+
+# Hot read queries of repositories by collection: (filter, sort)
+HOT_QUERIES = {
+    "twitch_collection.users": [
+        ({"$or": [{"login": "user"}, {"id": "user"}]}, None),
+        ({"broadcaster_type": "partner", "_id": {"$gt": ObjectId()}}, [("_id", 1)]),
+    ],
+    "twitch_collection.streams": [
+        ({"id": "1"}, None),
+        ({"_id": {"$gt": ObjectId()}}, [("_id", 1)]),
+        (
+            {"game_id": "1", "viewer_count": {"$gte": 100}, "_id": {"$gt": ObjectId()}},
+            [("_id", 1)],
+        ),
+        ({"language": "en", "_id": {"$gt": ObjectId()}}, [("_id", 1)]),
+        ({"type": "live"}, [("_id", 1)]),
+    ],
+    "twitch_collection.categories": [
+        ({"id": "1"}, None),
+        ({"_id": {"$gt": ObjectId()}}, [("_id", 1)]),
+    ],
+    "lamoda": [
+        ({"category": "men"}, None),
+        ({"categories._id": ObjectId()}, None),
+        ({"categories.categories._id": ObjectId()}, None),
+        ({"$and": [{"category": "men"}, {"categories.slug": "shoes"}]}, None),
+    ],
+    "lamoda_products": [
+        ({"subcategory_id": ObjectId()}, [("page", 1), ("position", 1)]),
+        ({"subcategory_id": {"$in": [ObjectId()]}}, None),
+        (
+            {
+                "category": "men",
+                "subcategory_slug": "shoes",
+                "low_subcategory_slug": "boots",
+                "product_number": "1",
+            },
+            None,
+        ),
+    ],
+    "lamoda_runs": [({}, [("started_at", -1)])],
+}
+
+
+def get_stages(plan: dict) -> set:
+    """
+    Returns names of all stages of query plan.
+    """
+    stages = {plan["stage"]}
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages |= get_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        stages |= get_stages(child)
+    return stages
+
+
+@pytest.fixture(scope="module")
+def database():
+    client = MongoClient(str(settings.mongo_dsn), serverSelectionTimeoutMS=500)
+    try:
+        client.admin.command("ping")
+    except PyMongoError:
+        pytest.skip("MongoDB isn't available")
+
+    database = client[f"test_indexes_{ObjectId()}"]
+    for collection, indexes in get_declared_indexes():
+        database[collection.name].create_indexes(indexes)
+        database[collection.name].insert_one({})
+    yield database
+    client.drop_database(database.name)
+    client.close()
+
+
+@pytest.mark.parametrize(
+    "collection, query, sort",
+    [
+        (collection, query, sort)
+        for collection, queries in HOT_QUERIES.items()
+        for query, sort in queries
+    ],
+)
+def test_hot_queries_use_indexes(database, collection, query, sort):
+    """
+    Checking whether hot read queries are index scans without collection scans.
+    """
+    cursor = database[collection].find(query)
+    if sort:
+        cursor = cursor.sort(sort)
+
+    plan = cursor.explain()["queryPlanner"]["winningPlan"]
+    stages = get_stages(plan)
+
+    assert "IXSCAN" in stages
+    assert "COLLSCAN" not in stages
@@ -0,0 +1,199 @@
+import asyncio
+import time
+
+import aiokafka
+from aiokafka.structs import ConsumerRecord, TopicPartition
+
+from src.config import settings
+from src.resources.kafka import KafkaQueueBackend, OffsetTracker
+from src.resources.queue import retry_delay
+from src.resources.tasks import encode_task
+
+
+TP = TopicPartition("parsing-topic", 0)
+
+
+def make_record(offset: int, value: bytes) -> ConsumerRecord:
+    return ConsumerRecord(
+        TP.topic, TP.partition, offset, 0, 0, None, value, None, 0, len(value), []
+    )
+
+
+class Consumer:
+    """
+    Kafka consumer returning given records once.
+    """
+
+    records = []
+    committed = {}
+    instance = None
+
+    def __init__(self, *topics, **config):
+        self.paused = set()
+        self.listener = None
+        Consumer.instance = self
+
+    def subscribe(self, topics, listener=None):
+        self.listener = listener
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def assignment(self):
+        return {TP}
+
+    def pause(self, *partitions):
+        self.paused.update(partitions)
+
+    def resume(self, *partitions):
+        self.paused.difference_update(partitions)
+
+    async def getmany(self, timeout_ms=0, max_records=None):
+        if self.records and TP not in self.paused:
+            records = Consumer.records[:max_records]
+            Consumer.records = Consumer.records[len(records) :]
+            return {TP: records}
+        await asyncio.sleep(timeout_ms / 1000)
+        return {}
+
+    async def commit(self, offsets):
+        Consumer.committed.update(offsets)
+
+
+class TestOffsetTracker:
+    """
+    Tests committing offsets of completed tasks.
+    """
+
+    def test_commit_waits_for_earliest_pending(self):
+        """
+        Checking whether offset doesn't pass unfinished message.
+        """
+        tracker = OffsetTracker()
+        for offset in (5, 6, 7):
+            tracker.track(TP, offset)
+
+        tracker.complete(TP, 6)
+        tracker.complete(TP, 7)
+        assert tracker.committable() == {TP: 5}
+
+        tracker.complete(TP, 5)
+        assert tracker.committable() == {TP: 8}
+
+    def test_commit_only_changed_offsets(self):
+        """
+        Checking whether same offset isn't committed twice.
+        """
+        tracker = OffsetTracker()
+        tracker.track(TP, 0)
+        tracker.complete(TP, 0)
+
+        assert tracker.committable() == {TP: 1}
+        assert tracker.committable() == {}
+
+
+class TestConsumer:
+    """
+    Tests concurrent execution of consumed tasks.
+    """
+
+    def test_fetching_is_paused_while_pool_is_full(self, monkeypatch):
+        """
+        Checking whether running tasks don't exceed concurrency
+        and partitions assigned while fetching is paused are paused.
+        """
+        monkeypatch.setattr(aiokafka, "AIOKafkaConsumer", Consumer)
+        Consumer.records = [make_record(offset, b"task") for offset in range(6)]
+        Consumer.committed = {}
+        running = []
+        max_running = 0
+        executed = []
+
+        backend = KafkaQueueBackend()
+
+        async def execute_message(value, key=None):
+            nonlocal max_running
+            running.append(value)
+            max_running = max(max_running, len(running))
+            await asyncio.sleep(0.05)
+            running.remove(value)
+            executed.append(value)
+
+        backend.execute_message = execute_message
+        new_partition = TopicPartition("parsing-topic", 1)
+
+        async def scenario():
+            consumer = asyncio.create_task(backend.consume(concurrency=2))
+            while not running or not Consumer.instance.listener.paused:
+                await asyncio.sleep(0.01)
+            listener = Consumer.instance.listener
+            await listener.on_partitions_assigned({new_partition})
+            assert new_partition in Consumer.instance.paused
+
+            while len(executed) < 6:
+                await asyncio.sleep(0.01)
+            consumer.cancel()
+            await asyncio.gather(consumer, return_exceptions=True)
+
+        asyncio.run(asyncio.wait_for(scenario(), 2))
+
+        assert max_running == 2
+        assert Consumer.committed[TP] == 6
+
+
+class TestRetryDelay:
+    """
+    Tests backoff of failed tasks.
+    """
+
+    def test_delay_grows_and_is_capped(self):
+        """
+        Checking whether delay is doubled every attempt and limited by max delay.
+        """
+        base = settings.task_retry_base_delay
+        for attempt in (1, 2, 3):
+            delay = retry_delay(attempt)
+            assert base * 2 ** (attempt - 1) / 2 <= delay <= base * 2 ** (attempt - 1)
+
+        assert retry_delay(100) <= settings.task_retry_max_delay
+
+
+class TestRetryConsumer:
+    """
+    Tests sending retried tasks back to parsing topic.
+    """
+
+    def test_short_delay_doesnt_wait_for_long_delay(self, monkeypatch):
+        """
+        Checking whether tasks are sent by due time, not by offset of partition.
+        """
+        monkeypatch.setattr(aiokafka, "AIOKafkaConsumer", Consumer)
+        now = time.time()
+        long_delay = encode_task("tests.kafka.long", not_before=now + 0.3)
+        short_delay = encode_task("tests.kafka.short", not_before=now)
+        Consumer.records = [make_record(0, long_delay), make_record(1, short_delay)]
+        Consumer.committed = {}
+        sent = []
+
+        backend = KafkaQueueBackend()
+
+        async def send(topic, message, key=None, wait=False):
+            sent.append((message, time.time() - now))
+
+        backend.send = send
+
+        async def scenario():
+            consumer = asyncio.create_task(backend.consume_retries())
+            while len(sent) < 2:
+                await asyncio.sleep(0.01)
+            consumer.cancel()
+            await asyncio.gather(consumer, return_exceptions=True)
+
+        asyncio.run(asyncio.wait_for(scenario(), 2))
+
+        assert [message for message, _ in sent] == [short_delay, long_delay]
+        assert sent[0][1] < 0.2
+        assert Consumer.committed == {TP: 2}
@@ -0,0 +1,93 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.resources.limiter import AdaptiveLimiter
+
+
+class Response:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+
+
+def make_limiter(initial_limit: int = 4) -> AdaptiveLimiter:
+    return AdaptiveLimiter(
+        initial_limit=initial_limit,
+        min_limit=1,
+        max_limit=8,
+        backoff_ratio=0.5,
+        max_latency=5.0,
+    )
+
+
+class TestAdaptiveLimiter:
+    """
+    Tests AIMD window of host limiter.
+    """
+
+    def test_window_grows_on_success(self):
+        """
+        Checking whether window grows by one after window of successful requests.
+        """
+        limiter = make_limiter()
+
+        async def scenario():
+            for _ in range(4):
+                await limiter.request(lambda: asyncio.sleep(0, Response(200)))
+
+        asyncio.run(scenario())
+        assert 4.9 < limiter.limit < 5.1
+        assert limiter.stats()["requests"] == 4
+
+    def test_window_is_cut_on_throttling(self):
+        """
+        Checking whether window is halved on 429 and not less than min limit.
+        """
+        limiter = make_limiter()
+
+        async def scenario():
+            for _ in range(3):
+                limiter._last_backoff = 0
+                await limiter.request(lambda: asyncio.sleep(0, Response(429)))
+
+        asyncio.run(scenario())
+        assert limiter.limit == 1
+        assert limiter.stats()["throttled"] == 3
+
+    def test_window_is_cut_on_timeout(self):
+        """
+        Checking whether timeout cuts window and error is raised.
+        """
+        limiter = make_limiter()
+
+        async def send():
+            raise httpx.ReadTimeout("timeout")
+
+        with pytest.raises(httpx.ReadTimeout):
+            asyncio.run(limiter.request(send))
+        assert limiter.limit == 2
+        assert limiter.stats()["in_flight"] == 0
+
+    def test_concurrency_is_limited_by_window(self):
+        """
+        Checking whether amount of concurrent requests doesn't exceed window.
+        """
+        limiter = make_limiter(initial_limit=2)
+        in_flight = []
+        max_in_flight = []
+
+        async def send():
+            in_flight.append(1)
+            max_in_flight.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.pop()
+            return Response(200)
+
+        async def scenario():
+            await asyncio.gather(*(limiter.request(send) for _ in range(6)))
+
+        asyncio.run(scenario())
+        assert max(max_in_flight) <= 3
+        assert max_in_flight[:2] == [1, 2]
+        assert limiter.stats()["in_flight"] == 0
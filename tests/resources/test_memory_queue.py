@@ -0,0 +1,117 @@
+import asyncio
+
+from src.config import settings
+from src.resources.memory_queue import MemoryQueueBackend
+from src.resources.tasks import UNDECODABLE_TASK, encode_task, task
+
+
+executed = []
+
+
+@task("tests.memory_queue.record")
+async def record(value):
+    executed.append(value)
+
+
+@task("tests.memory_queue.fail")
+async def fail():
+    raise RuntimeError("failed")
+
+
+async def run_until(backend: MemoryQueueBackend, condition, timeout: float = 2):
+    """
+    Runs backend consumers until condition is met.
+    """
+    consumers = [
+        asyncio.create_task(backend.consume(concurrency=4)),
+        asyncio.create_task(backend.consume_retries()),
+    ]
+
+    async def wait():
+        while not condition():
+            await asyncio.sleep(0.01)
+
+    try:
+        await asyncio.wait_for(wait(), timeout)
+    finally:
+        for consumer in consumers:
+            consumer.cancel()
+        await asyncio.gather(*consumers, return_exceptions=True)
+
+
+class TestMemoryQueueBackend:
+    """
+    Tests in-process queue backend.
+    """
+
+    def test_tasks_are_executed(self):
+        """
+        Checking whether sent tasks are executed by consumer.
+        """
+        executed.clear()
+
+        async def scenario():
+            backend = MemoryQueueBackend()
+            await backend.send_many(
+                settings.kafka_topic,
+                [
+                    (encode_task("tests.memory_queue.record", (i,)), None)
+                    for i in range(10)
+                ],
+            )
+            await run_until(backend, lambda: len(executed) == 10)
+
+        asyncio.run(scenario())
+        assert sorted(executed) == list(range(10))
+
+    def test_failed_task_goes_to_dead_letters(self, monkeypatch):
+        """
+        Checking whether task is retried and then sent to dead letters.
+        """
+        monkeypatch.setattr(settings, "task_max_attempts", 2)
+        monkeypatch.setattr(settings, "task_retry_base_delay", 0.01)
+
+        async def scenario():
+            backend = MemoryQueueBackend()
+            await backend.send(
+                settings.kafka_topic, encode_task("tests.memory_queue.fail")
+            )
+            await run_until(backend, lambda: backend._dead_letters)
+
+            dead_letters = await backend.get_dead_letters(limit=10)
+            assert len(dead_letters) == 1
+            assert dead_letters[0]["name"] == "tests.memory_queue.fail"
+            assert dead_letters[0]["attempt"] == 2
+
+            assert await backend.replay_dead_letters() == 1
+            assert await backend.get_dead_letters(limit=10) == []
+
+        asyncio.run(scenario())
+
+    def test_undecodable_message_goes_to_dead_letters(self):
+        """
+        Checking whether message which can't be decoded is sent to dead letters as is.
+        """
+        executed.clear()
+        message = b"\x80\x04legacy pickled task"
+
+        async def scenario():
+            backend = MemoryQueueBackend()
+            await backend.send(settings.kafka_topic, message)
+            await backend.send(
+                settings.kafka_topic, encode_task("tests.memory_queue.record", (1,))
+            )
+            await run_until(backend, lambda: backend._dead_letters and executed)
+
+            dead_letters = await backend.get_dead_letters(limit=10)
+            assert len(dead_letters) == 1
+            assert dead_letters[0]["name"] == UNDECODABLE_TASK
+            assert dead_letters[0]["args"] == [message.hex()]
+            assert dead_letters[0]["error"]
+
+            assert await backend.replay_dead_letters() == 1
+            replayed, _ = await backend._queue(settings.kafka_topic).get()
+            assert replayed == message
+
+        asyncio.run(scenario())
+        assert executed == [1]
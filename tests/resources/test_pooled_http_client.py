@@ -0,0 +1,37 @@
+import asyncio
+
+from src.config import settings
+from src.resources.http_client import PooledHttpClient
+
+
+class TestPooledHttpClient:
+    """
+    Tests HTTP client shared by requests of service.
+    """
+
+    def test_client_is_created_from_service_settings(self, monkeypatch):
+        """
+        Checking whether client takes settings of its service.
+        """
+        monkeypatch.setattr(settings, "twitch_http_write_timeout", 3.0)
+        monkeypatch.setattr(settings, "lamoda_http_read_timeout", 7.0)
+
+        twitch = PooledHttpClient("twitch").get_client()
+        lamoda = PooledHttpClient("lamoda").get_client()
+
+        assert twitch.timeout.write == 3.0
+        assert twitch.timeout.pool == settings.twitch_http_pool_timeout
+        # Lamoda has no own write and pool timeouts
+        assert lamoda.timeout.read == lamoda.timeout.write == lamoda.timeout.pool == 7.0
+
+    def test_closed_client_is_created_again(self):
+        """
+        Checking whether new client is created after shared client is closed.
+        """
+        http_client = PooledHttpClient("lamoda")
+        client = http_client.get_client()
+
+        assert http_client.get_client() is client
+        asyncio.run(http_client.close())
+        assert client.is_closed
+        assert http_client.get_client() is not client
@@ -0,0 +1,50 @@
+import asyncio
+from pathlib import Path
+
+from src.lamoda.parsers import get_parser, parse_pages
+from src.resources.process_pool import (
+    configure_process_pool,
+    get_process_pool_stats,
+    run_in_process,
+    shutdown_process_pool,
+)
+
+
+PAGE = (
+    Path(__file__).parent.parent / "lamoda" / "data" / "subcategory_page.html"
+).read_text(encoding="utf-8")
+
+
+class TestProcessPool:
+    """
+    Tests running of parsing out of event loop.
+    """
+
+    def teardown_method(self):
+        shutdown_process_pool()
+        configure_process_pool(None)
+
+    def test_batch_is_parsed_in_pool(self):
+        """
+        Checking whether batch of pages is parsed by pool process into plain dicts.
+        """
+        configure_process_pool(1)
+        products = get_parser("soup").parse_products(PAGE)
+
+        result = asyncio.run(
+            run_in_process(parse_pages, "parse_products", [PAGE, PAGE], "soup")
+        )
+        assert result == [products, products]
+        assert get_process_pool_stats()["completed"] >= 1
+
+    def test_disabled_pool_parses_in_event_loop(self):
+        """
+        Checking whether pages are parsed without pool if it's disabled.
+        """
+        configure_process_pool(0)
+
+        result = asyncio.run(
+            run_in_process(parse_pages, "parse_products", ["<html></html>"], "soup")
+        )
+        assert result == [[]]
+        assert get_process_pool_stats()["processes"] == 0
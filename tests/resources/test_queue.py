@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+import src.resources.queue as queue
+from src.resources.memory_queue import MemoryQueueBackend
+from src.resources.queue import QueueBackend, producer_send_unique
+from src.resources.tasks import decode_task, task
+
+
+@task("tests.queue.parse")
+async def parse(value):
+    pass
+
+
+class Redis:
+    """
+    In-memory replacement of Redis client.
+    """
+
+    def __init__(self):
+        self.values = {}
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value.encode()
+        return True
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def eval(self, script, numkeys, key, value):
+        if self.values.get(key) == value.encode():
+            del self.values[key]
+            return 1
+        return 0
+
+
+class FailingBackend(MemoryQueueBackend):
+    async def send(self, topic, message, key=None, wait=False):
+        raise ConnectionError("broker is unavailable")
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    redis = Redis()
+    monkeypatch.setattr(queue, "redis", redis)
+    return redis
+
+
+class TestProducerSendUnique:
+    """
+    Tests deduplication of tasks sent by API.
+    """
+
+    def test_duplicate_returns_existing_job(self, redis, monkeypatch):
+        """
+        Checking whether duplicate task isn't sent and gets job id of queued task.
+        """
+        backend = MemoryQueueBackend()
+        monkeypatch.setattr(queue, "_backend", backend)
+
+        async def scenario():
+            first = await producer_send_unique(parse, 1)
+            second = await producer_send_unique(parse, 1)
+            other = await producer_send_unique(parse, 2)
+            return first, second, other, backend._queue(queue.settings.kafka_topic)
+
+        first, second, other, messages = asyncio.run(scenario())
+
+        assert first[1] and other[1]
+        assert second == (first[0], False)
+        assert messages.qsize() == 2
+        assert decode_task(messages.get_nowait()[0]).job_id == first[0]
+
+    def test_failed_send_releases_key(self, redis, monkeypatch):
+        """
+        Checking whether task can be sent again after failed send.
+        """
+        monkeypatch.setattr(queue, "_backend", FailingBackend())
+
+        with pytest.raises(ConnectionError):
+            asyncio.run(producer_send_unique(parse, 1))
+        assert redis.values == {}
+
+        monkeypatch.setattr(queue, "_backend", MemoryQueueBackend())
+        job_id, created = asyncio.run(producer_send_unique(parse, 1))
+        assert created
+
+
+class TestQueueBackend:
+    """
+    Tests interface of queue backends.
+    """
+
+    def test_backend_without_method_isnt_created(self):
+        """
+        Checking whether backend missing transport method fails on creation.
+        """
+
+        class IncompleteBackend(QueueBackend):
+            async def start(self):
+                pass
+
+        with pytest.raises(TypeError):
+            IncompleteBackend()
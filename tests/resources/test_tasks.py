@@ -0,0 +1,60 @@
+import pytest
+from bson import ObjectId
+
+from src.resources.tasks import (
+    decode_task,
+    encode_task,
+    get_task,
+    get_task_name,
+    task,
+    task_key,
+)
+
+
+class TestTaskEnvelope:
+    """
+    Tests packing tasks into queue messages.
+    """
+
+    def test_roundtrip_with_object_id(self):
+        """
+        Checking whether task args with ObjectId are restored.
+        """
+        object_id = ObjectId()
+        message = encode_task(
+            "lamoda.parse_subcategory", ({"_id": object_id, "link": "url"},), {"x": 1}
+        )
+
+        task_message = decode_task(message)
+        assert task_message.name == "lamoda.parse_subcategory"
+        assert task_message.args == [{"_id": object_id, "link": "url"}]
+        assert task_message.kwargs == {"x": 1}
+        assert task_message.attempt == 0
+
+    def test_task_key_ignores_kwargs_order(self):
+        """
+        Checking whether idempotency key doesn't depend on order of keyword args.
+        """
+        key = task_key("tests.sample_task", (1,), {"a": 1, "b": 2})
+
+        assert task_key("tests.sample_task", (1,), {"b": 2, "a": 1}) == key
+        assert task_key("tests.sample_task", (2,), {"a": 1, "b": 2}) != key
+
+    def test_registered_task(self):
+        """
+        Checking whether registered task is found by its name.
+        """
+
+        @task("tests.sample_task")
+        async def sample_task():
+            pass
+
+        assert get_task_name(sample_task) == "tests.sample_task"
+        assert get_task("tests.sample_task") is sample_task
+
+    def test_unknown_task(self):
+        """
+        Checking whether unknown task name is raising error.
+        """
+        with pytest.raises(ValueError, match="Unknown task"):
+            get_task("tests.unknown_task")
@@ -0,0 +1,126 @@
+import csv
+import gzip
+import io
+import json
+
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.lamoda.router import PRODUCT_FIELDS
+from src.routers.export import export_response
+
+
+OBJECT_ID = ObjectId()
+DOCUMENTS = [
+    {"_id": OBJECT_ID, "id": str(i), "title": f"Stream, {i}", "tags": ["en"]}
+    for i in range(5)
+]
+FIELDS = ["_id", "id", "title", "tags", "language"]
+
+
+class Cursor:
+    def __init__(self, items):
+        self.items = items
+        self.closed = False
+
+    def batch_size(self, batch_size):
+        return self
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for item in self.items:
+            yield item
+
+    async def close(self):
+        self.closed = True
+
+
+def make_client(cursor: Cursor, fields: list = FIELDS) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/export")
+    async def export(format: str = "ndjson", gzip: bool = False):
+        return export_response(cursor, "streams", fields, format, gzip)
+
+    return TestClient(app)
+
+
+class TestExport:
+    """
+    Tests streaming export of collections.
+    """
+
+    def test_ndjson(self):
+        """
+        Checking whether every document is sent as json line.
+        """
+        cursor = Cursor(DOCUMENTS)
+        response = make_client(cursor).get("/export")
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert 'filename="streams.ndjson"' in response.headers["content-disposition"]
+        assert [line["id"] for line in lines] == ["0", "1", "2", "3", "4"]
+        assert lines[0]["_id"] == str(OBJECT_ID)
+        assert cursor.closed
+
+    def test_csv(self):
+        """
+        Checking whether documents are sent as CSV rows with header.
+        """
+        response = make_client(Cursor(DOCUMENTS)).get("/export?format=csv")
+
+        rows = list(csv.reader(io.StringIO(response.text)))
+        assert response.headers["content-type"].startswith("text/csv")
+        assert rows[0] == FIELDS
+        assert rows[1] == [str(OBJECT_ID), "0", "Stream, 0", '["en"]', ""]
+        assert len(rows) == len(DOCUMENTS) + 1
+
+    def test_gzip(self):
+        """
+        Checking whether compressed export is the same as plain export.
+        """
+        plain = make_client(Cursor(DOCUMENTS)).get("/export")
+        compressed = make_client(Cursor(DOCUMENTS)).get(
+            "/export?gzip=true", headers={"Accept-Encoding": "identity"}
+        )
+
+        assert compressed.headers["content-type"] == "application/gzip"
+        assert (
+            'filename="streams.ndjson.gz"' in compressed.headers["content-disposition"]
+        )
+        assert gzip.decompress(compressed.content) == plain.content
+
+    def test_empty_collection(self):
+        """
+        Checking whether empty collection is exported as CSV header only.
+        """
+        cursor = Cursor([])
+        response = make_client(cursor).get("/export?format=csv")
+
+        assert response.text.splitlines() == [",".join(FIELDS)]
+        assert cursor.closed
+
+    def test_csv_discounted_product(self):
+        """
+        Checking whether new and old prices of discounted product are exported.
+        """
+        product = {
+            "_id": OBJECT_ID,
+            "product_number": "MP002XW0",
+            "new_price": 99.9,
+            "old_price": 149.9,
+            "created_at": "2024-01-02T03:04:05",
+        }
+        response = make_client(Cursor([product]), PRODUCT_FIELDS).get(
+            "/export?format=csv"
+        )
+
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert rows[0]["single_price"] == ""
+        assert rows[0]["new_price"] == "99.9"
+        assert rows[0]["old_price"] == "149.9"
+        assert rows[0]["created_at"] == "2024-01-02T03:04:05"
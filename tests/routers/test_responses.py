@@ -0,0 +1,100 @@
+from datetime import datetime
+
+from bson import ObjectId
+from fastapi import APIRouter, Depends, FastAPI, Response
+from fastapi.testclient import TestClient
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from fastapi_cache.decorator import cache
+
+from src.routers.responses import MongoJSONCoder, MongoJSONResponse, MongoJSONRoute
+
+
+OBJECT_ID = ObjectId()
+CREATED_AT = datetime(2024, 1, 2, 3, 4, 5)
+calls = []
+
+
+def set_header(response: Response):
+    response.headers["X-Dependency"] = "set"
+
+
+router = APIRouter(route_class=MongoJSONRoute)
+
+
+@router.get("/items")
+@cache(expire=60)
+async def items():
+    calls.append(1)
+    return {
+        "data": [
+            {
+                "_id": OBJECT_ID,
+                "created_at": CREATED_AT,
+                "categories": [{"_id": OBJECT_ID, "products": [{"_id": OBJECT_ID}]}],
+            }
+        ]
+    }
+
+
+@router.get("/dependency", dependencies=[Depends(set_header)])
+async def dependency():
+    return {"id": OBJECT_ID}
+
+
+def make_client() -> TestClient:
+    # in-memory cache is shared, so every client has its own keys
+    FastAPICache.reset()
+    FastAPICache.init(InMemoryBackend(), prefix=str(ObjectId()), coder=MongoJSONCoder)
+    api_router = APIRouter(prefix="/api", default_response_class=MongoJSONResponse)
+    api_router.include_router(router, prefix="/v1")
+    app = FastAPI()
+    app.include_router(api_router)
+    return TestClient(app)
+
+
+class TestMongoJSONRoute:
+    """
+    Tests sending endpoints data with ObjectId as json.
+    """
+
+    def test_nested_object_id_and_datetime(self):
+        """
+        Checking whether nested ObjectId and datetime are encoded.
+        """
+        response = make_client().get("/api/v1/items")
+
+        item = response.json()["data"][0]
+        assert item["_id"] == str(OBJECT_ID)
+        assert item["created_at"] == "2024-01-02T03:04:05"
+        assert item["categories"][0]["products"][0]["_id"] == str(OBJECT_ID)
+
+    def test_cached_response_keeps_body_and_headers(self):
+        """
+        Checking whether cached json is sent with cache headers.
+        """
+        client = make_client()
+        calls.clear()
+
+        miss = client.get("/api/v1/items")
+        hit = client.get("/api/v1/items")
+
+        assert len(calls) == 1
+        assert miss.headers["X-FastAPI-Cache"] == "MISS"
+        assert hit.headers["X-FastAPI-Cache"] == "HIT"
+        assert hit.headers["content-type"] == "application/json"
+        assert hit.content == miss.content
+
+        not_modified = client.get(
+            "/api/v1/items", headers={"If-None-Match": hit.headers["ETag"]}
+        )
+        assert not_modified.status_code == 304
+
+    def test_dependency_headers(self):
+        """
+        Checking whether headers set by dependencies are sent.
+        """
+        response = make_client().get("/api/v1/dependency")
+
+        assert response.headers["X-Dependency"] == "set"
+        assert response.json() == {"id": str(OBJECT_ID)}
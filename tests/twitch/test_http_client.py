@@ -0,0 +1,154 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+import src.twitch.client as client_module
+from src.config import settings
+from src.resources.http_client import PooledHttpClient
+from src.twitch.client import TwitchAPIClient
+
+
+def make_client(monkeypatch, handler) -> TwitchAPIClient:
+    monkeypatch.setattr(settings, "twitch_http_retry_delay", 0)
+    monkeypatch.setattr(
+        client_module,
+        "http_client",
+        PooledHttpClient("twitch", transport=httpx.MockTransport(handler)),
+    )
+    client = TwitchAPIClient(client_id="http_id", client_secret="secret")
+    client.access_token = "some_token"
+    client.token_expires_at = datetime.now() + timedelta(days=10)
+    return client
+
+
+def make_request(client: TwitchAPIClient) -> httpx.Response:
+    async def scenario():
+        try:
+            return await client.make_request(url_name="GET_STREAMS", http_method="GET")
+        finally:
+            await client_module.http_client.close()
+
+    return asyncio.run(scenario())
+
+
+class TestTwitchHttpClient:
+    """
+    Tests shared HTTP client and retries of Twitch API Client.
+    """
+
+    def test_server_errors_are_retried(self, monkeypatch):
+        """
+        Checking whether 5xx responses and read timeouts are retried.
+        """
+        responses = [
+            httpx.ReadTimeout("timeout"),
+            httpx.Response(503),
+            httpx.Response(200, json={"data": []}),
+        ]
+
+        def handler(request):
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        response = make_request(make_client(monkeypatch, handler))
+
+        assert response.status_code == 200
+        assert not responses
+        assert client_module.http_client.stats()["retries"] == 2
+
+    def test_retries_are_bounded(self, monkeypatch):
+        """
+        Checking whether timeout is raised when all retries are failed.
+        """
+        monkeypatch.setattr(settings, "twitch_http_max_retries", 2)
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            raise httpx.ConnectTimeout("timeout")
+
+        with pytest.raises(httpx.ConnectTimeout):
+            make_request(make_client(monkeypatch, handler))
+        assert len(calls) == 3
+
+    def test_last_server_error_is_returned(self, monkeypatch):
+        """
+        Checking whether 5xx response is returned when all retries are failed.
+        """
+        monkeypatch.setattr(settings, "twitch_http_max_retries", 1)
+
+        response = make_request(
+            make_client(monkeypatch, lambda request: httpx.Response(500))
+        )
+
+        assert response.status_code == 500
+
+    def test_server_error_after_throttling_is_retried(self, monkeypatch):
+        """
+        Checking whether 5xx response of request repeated after 429 is retried.
+        """
+        responses = [
+            httpx.Response(429),
+            httpx.Response(503),
+            httpx.Response(200, json={"data": []}),
+        ]
+
+        response = make_request(
+            make_client(monkeypatch, lambda request: responses.pop(0))
+        )
+
+        assert response.status_code == 200
+        assert not responses
+
+    def test_network_error_after_refresh_is_retried(self, monkeypatch):
+        """
+        Checking whether request repeated with refreshed token is retried on errors.
+        """
+        tokens = []
+
+        def handler(request):
+            tokens.append(request.headers["Authorization"])
+            if len(tokens) == 1:
+                return httpx.Response(401)
+            if len(tokens) == 2:
+                raise httpx.ConnectError("error")
+            return httpx.Response(200, json={"data": []})
+
+        client = make_client(monkeypatch, handler)
+
+        async def _refresh_token(stale_token=None):
+            client.access_token = "new_token"
+
+        monkeypatch.setattr(client, "_refresh_token", _refresh_token)
+        response = make_request(client)
+
+        assert response.status_code == 200
+        assert tokens == ["Bearer some_token"] + ["Bearer new_token"] * 2
+
+    def test_connections_are_reused(self, monkeypatch, local_server):
+        """
+        Checking whether requests reuse connection of shared client.
+        """
+        monkeypatch.setattr(client_module, "http_client", PooledHttpClient("twitch"))
+        client = TwitchAPIClient(client_id="http_id", client_secret="secret")
+        client.access_token = "some_token"
+        client.token_expires_at = datetime.now() + timedelta(days=10)
+        client.urls = {"GET_STREAMS": f"{local_server}/helix/streams"}
+
+        async def scenario():
+            try:
+                for _ in range(5):
+                    await client.make_request(url_name="GET_STREAMS", http_method="GET")
+            finally:
+                await client_module.http_client.close()
+
+        asyncio.run(scenario())
+
+        stats = client_module.http_client.stats()
+        assert stats["requests"] == 5
+        assert stats["connections"] == 1
+        assert stats["reuse_rate"] == 0.8
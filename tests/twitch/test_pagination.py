@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+from src.resources.mongo import find_page
+from src.twitch.utils import decode_cursor, encode_cursor
+
+
+class Cursor:
+    def __init__(self, items):
+        self.items = items
+
+    def sort(self, field, direction):
+        self.items = sorted(self.items, key=lambda item: item[field])
+        return self
+
+    def limit(self, limit):
+        self.items = self.items[:limit]
+        return self
+
+    async def to_list(self, length):
+        return self.items[:length]
+
+
+class Collection:
+    def __init__(self, items):
+        self.items = items
+
+    def find(self, query):
+        after = query.get("_id", {}).get("$gt")
+        return Cursor([item for item in self.items if not after or item["_id"] > after])
+
+
+class TestPagination:
+    """
+    Tests keyset pagination of Twitch collections.
+    """
+
+    def test_cursor_roundtrip(self):
+        """
+        Checking whether cursor is decoded into the same `_id`.
+        """
+        object_id = ObjectId()
+        assert decode_cursor(encode_cursor(object_id)) == object_id
+
+    @pytest.mark.parametrize("cursor", ["abc", "!!!!", str(ObjectId())])
+    def test_invalid_cursor(self, cursor):
+        """
+        Checking whether invalid cursor is raising error.
+        """
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            decode_cursor(cursor)
+
+    def test_pages_cover_collection(self):
+        """
+        Checking whether pages return every document once and the last page has no cursor.
+        """
+        items = [{"_id": ObjectId()} for _ in range(5)]
+        collection = Collection(items)
+
+        async def read_all():
+            pages, after = [], None
+            while True:
+                page, after = await find_page(collection, {}, after, limit=2)
+                pages.append(page)
+                if not after:
+                    return pages
+
+        pages = asyncio.run(read_all())
+
+        assert [len(page) for page in pages] == [2, 2, 1]
+        assert sum(pages, []) == items
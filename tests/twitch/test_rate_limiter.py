@@ -0,0 +1,140 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from src.twitch.client import TwitchAPIClient
+from src.twitch.rate_limiter import (
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    RateLimiter,
+    get_rate_limiter,
+)
+
+
+class Response:
+    def __init__(self, status_code: int, headers: dict = {}):
+        self.status_code = status_code
+        self.headers = headers
+
+
+def rate_limit_headers(limit: int, remaining: int, reset: float) -> dict:
+    return {
+        "Ratelimit-Limit": str(limit),
+        "Ratelimit-Remaining": str(remaining),
+        "Ratelimit-Reset": str(int(reset)),
+    }
+
+
+class TestRateLimiter:
+    """
+    Tests token bucket of Twitch API requests.
+    """
+
+    def test_requests_wait_for_refill(self):
+        """
+        Checking whether requests over capacity wait for refilled tokens.
+        """
+        limiter = RateLimiter(capacity=2, window=0.2)
+
+        async def scenario():
+            started_at = time.monotonic()
+            for _ in range(4):
+                await limiter.acquire()
+            return time.monotonic() - started_at
+
+        elapsed = asyncio.run(scenario())
+        assert 0.15 < elapsed < 0.5
+        assert limiter.stats()["waited"] == 2
+
+    def test_interactive_requests_go_first(self):
+        """
+        Checking whether waiting interactive requests get tokens before bulk requests.
+        """
+        limiter = RateLimiter(capacity=1, window=0.05)
+        order = []
+
+        async def request(name, priority):
+            await limiter.acquire(priority)
+            order.append(name)
+
+        async def scenario():
+            await limiter.acquire()
+            await asyncio.gather(
+                request("bulk_1", PRIORITY_BULK),
+                request("bulk_2", PRIORITY_BULK),
+                request("interactive", PRIORITY_INTERACTIVE),
+            )
+
+        asyncio.run(scenario())
+        assert order == ["interactive", "bulk_1", "bulk_2"]
+
+    def test_bucket_is_seeded_from_headers(self):
+        """
+        Checking whether limit and remaining requests are taken from headers.
+        """
+        limiter = RateLimiter(capacity=800, window=60)
+        limiter.update(rate_limit_headers(100, 10, time.time() + 60))
+
+        stats = limiter.stats()
+        assert stats["capacity"] == 100
+        assert 10 <= stats["tokens"] < 11
+
+    def test_invalid_limit_is_ignored(self):
+        """
+        Checking whether zero or broken limit in headers doesn't change capacity.
+        """
+        limiter = RateLimiter(capacity=800, window=60)
+        limiter.update(rate_limit_headers(0, 10, time.time() + 60))
+        limiter.update(
+            {**rate_limit_headers(800, 10, time.time()), "Ratelimit-Limit": "-"}
+        )
+
+        stats = limiter.stats()
+        assert stats["capacity"] == 800
+        assert 10 <= stats["tokens"] < 11
+
+    def test_no_requests_until_reset(self):
+        """
+        Checking whether throttled limiter waits for reset time.
+        """
+        limiter = RateLimiter(capacity=800, window=60)
+
+        async def scenario():
+            limiter.update(rate_limit_headers(800, 0, time.time() + 2), throttled=True)
+            started_at = time.monotonic()
+            await limiter.acquire()
+            return time.monotonic() - started_at
+
+        elapsed = asyncio.run(scenario())
+        assert elapsed > 0.9
+        assert limiter.stats()["throttled"] == 1
+
+
+class TestTwitchAPIClientThrottling:
+    """
+    Tests retries of throttled requests of Twitch API Client.
+    """
+
+    def test_throttled_request_is_retried(self):
+        """
+        Checking whether 429 response is retried after reset time.
+        """
+        client = TwitchAPIClient(client_id="throttled_id", client_secret="secret")
+        client.access_token = "some_token"
+        client.token_expires_at = datetime.now() + timedelta(days=10)
+        responses = [
+            Response(429, rate_limit_headers(800, 0, time.time())),
+            Response(200, rate_limit_headers(800, 799, time.time() + 60)),
+        ]
+
+        async def get(url, headers, params):
+            return responses.pop(0)
+
+        client.http_methods = {"GET": get}
+        response = asyncio.run(
+            client.make_request(url_name="GET_STREAMS", http_method="GET")
+        )
+
+        assert response.status_code == 200
+        assert not responses
+        assert get_rate_limiter("throttled_id").stats()["throttled"] == 1
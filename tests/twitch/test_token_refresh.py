@@ -0,0 +1,145 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import pytest
+
+import src.twitch.client as client_module
+from src.config import settings
+from src.twitch.client import TwitchAPIClient
+
+
+class Response:
+    def __init__(self, status_code: int, data: dict = {}):
+        self.status_code = status_code
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+class Redis:
+    """
+    In-memory replacement of Redis client shared by processes.
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.locks = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value.encode()
+
+    @asynccontextmanager
+    async def lock(self, name, timeout, blocking_timeout):
+        lock = self.locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            yield
+
+
+def make_client(responses: list) -> TwitchAPIClient:
+    client = TwitchAPIClient(client_id="token_id", client_secret="secret")
+    client.requests = 0
+
+    async def post(url, data):
+        client.requests += 1
+        await asyncio.sleep(0.01)
+        return responses.pop(0) if len(responses) > 1 else responses[0]
+
+    client.http_methods = {"POST": post}
+    return client
+
+
+def token_response(token: str, expires_in: int = 3600) -> Response:
+    return Response(200, {"access_token": token, "expires_in": expires_in})
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    redis = Redis()
+    monkeypatch.setattr(client_module, "redis", redis)
+    monkeypatch.setattr(settings, "twitch_token_cache", True)
+    monkeypatch.setattr(settings, "twitch_token_retry_delay", 0)
+    return redis
+
+
+class TestTokenRefresh:
+    """
+    Tests refreshing access token of Twitch API Client.
+    """
+
+    def test_concurrent_refresh_is_single_flight(self, monkeypatch):
+        """
+        Checking whether concurrent tasks share one token request.
+        """
+        monkeypatch.setattr(settings, "twitch_token_cache", False)
+        client = make_client([token_response("token")])
+
+        async def scenario():
+            await asyncio.gather(*(client._refresh_token() for _ in range(10)))
+
+        asyncio.run(scenario())
+        assert client.requests == 1
+        assert client.access_token == "token"
+
+    def test_processes_share_cached_token(self, redis):
+        """
+        Checking whether token requested by one process is used by others.
+        """
+        first = make_client([token_response("token")])
+        second = make_client([token_response("other_token")])
+
+        async def scenario():
+            await asyncio.gather(first._refresh_token(), second._refresh_token())
+
+        asyncio.run(scenario())
+        assert first.requests + second.requests == 1
+        assert first.access_token == second.access_token
+
+    def test_rejected_cached_token_is_replaced(self, redis):
+        """
+        Checking whether token rejected by Twitch isn't taken from cache again.
+        """
+        client = make_client([token_response("token"), token_response("new_token")])
+
+        async def scenario():
+            await client._refresh_token()
+            await client._refresh_token(stale_token="token")
+
+        asyncio.run(scenario())
+        assert client.requests == 2
+        assert client.access_token == "new_token"
+
+    def test_token_is_refreshed_before_expiration(self, monkeypatch):
+        """
+        Checking whether token expiring within refresh margin is treated as expired.
+        """
+        monkeypatch.setattr(settings, "twitch_token_refresh_margin", 300)
+        client = make_client([token_response("token")])
+        client.token_expires_at = datetime.now() + timedelta(seconds=60)
+
+        assert asyncio.run(client._is_token_expired())
+
+    def test_retries_are_bounded(self, redis, monkeypatch):
+        """
+        Checking whether failed token requests are retried limited times.
+        """
+        monkeypatch.setattr(settings, "twitch_token_max_retries", 2)
+        client = make_client([Response(503)])
+
+        with pytest.raises(ValueError, match="Failed to get token"):
+            asyncio.run(client._refresh_token())
+        assert client.requests == 3
+
+    def test_invalid_credentials(self, redis):
+        """
+        Checking whether invalid credentials aren't retried.
+        """
+        client = make_client([Response(400)])
+
+        with pytest.raises(ValueError, match="Invalid credentials"):
+            asyncio.run(client._refresh_token())
+        assert client.requests == 1